@@ -2,8 +2,16 @@ import sys
 
 from app.App import App
 from app.errors.MethodNotFoundError import MethodNotFoundError
+from configuration.Configuration import Configuration
+from database.Codec import Codec
 from database.Database import Database
+from database.Driver import Driver
+from database.codecs.DictionaryCodec import DictionaryCodec
+from database.codecs.GzipCodec import GzipCodec
+from database.codecs.JsonCodec import JsonCodec
+from database.codecs.LzmaCodec import LzmaCodec
 from database.drivers.JsonDriver import JsonDriver
+from database.drivers.SqliteDriver import SqliteDriver
 
 
 class ConsoleApp(App):
@@ -11,14 +19,23 @@ class ConsoleApp(App):
     Command-line application.
     """
 
+    __database: Database
+
     def __init__(self):
-        super().__init__(Database(driver=JsonDriver()))
+        config = Configuration()
+        self.__database = Database(driver=self.__create_driver(config),
+                                   cache_size=int(config.get("query_cache_size", 1024)))
+        super().__init__(self.__database)
 
     def start(self) -> None:
         try:
             command_path = sys.argv[1].split("-")
             command_args = sys.argv[2:]
-            print(str(self.execute_method(command_path, *command_args)))
+            result = self.execute_method(command_path, *command_args)
+            # Changes are saved before printing the result, so that changes conflicting with another process are
+            # reported.
+            self.__database.flush()
+            print(str(result))
         except IndexError:
             print("Error: Missing command.")
             exit(1)
@@ -28,3 +45,38 @@ class ConsoleApp(App):
         except Exception as e:
             print(f"Error: {str(e)}")
             exit(1)
+
+    @staticmethod
+    def __create_codec(config: Configuration) -> Codec:
+        """
+        Creates the codec of the JSON files selected in the configuration ('json' or 'dictionary', optionally followed
+        by '+gzip' or '+lzma', e.g. 'dictionary+gzip').
+
+        :param config: The configuration.
+        :return: The codec.
+        """
+        name, _, compression = str(config.get("codec", "json")).partition("+")
+        codec = DictionaryCodec() if name == "dictionary" else JsonCodec()
+        if compression == "gzip":
+            return GzipCodec(codec)
+        if compression == "lzma":
+            return LzmaCodec(codec)
+        return codec
+
+    @staticmethod
+    def __create_driver(config: Configuration) -> Driver:
+        """
+        Creates the driver selected in the configuration ('json', 'json_journal' or 'sqlite').
+
+        :param config: The configuration.
+        :return: The driver.
+        """
+        if config.get("driver", "json") == "sqlite":
+            return SqliteDriver(config.get("sqlite_path", "roster.db"))
+        binary_snapshots = bool(config.get("binary_snapshots", False))
+        codec = ConsoleApp.__create_codec(config)
+        if config.get("driver", "json") == "json_journal":
+            return JsonDriver(journaled=True, compaction_threshold=int(config.get("compaction_threshold", 1000)),
+                              binary_snapshots=binary_snapshots, codec=codec)
+        return JsonDriver(partition_size=int(config.get("partition_size", 0)), binary_snapshots=binary_snapshots,
+                          codec=codec)
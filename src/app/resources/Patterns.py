@@ -84,7 +84,7 @@ class Patterns(Resource):
                 raise InvalidArgumentError("number")
 
             pattern: Pattern = context.database.get_unique(Pattern, identifier=pattern_id)
-            assignments = pattern.assignments
+            assignments = dict(pattern.assignments)
             assignments[role] = int(number)
             context.database.update(pattern, assignments=assignments)
         except ValueError:
@@ -43,9 +43,7 @@ class PersonRoles(Resource):
         :return: A list of roles.
         """
         person: Person = context.database.get_unique(Person, identifier=person_id)
-        roles = person.roles
-        roles.sort()
-        return roles
+        return sorted(person.roles)
 
     @staticmethod
     def remove(context: Context, person_id: str, role: str) -> None:
@@ -36,7 +36,7 @@ class RosterAssignments(Resource):
             roster: Roster = context.database.get_unique(Roster, sequence_no=int(roster_sequence_no))
             person: Person = context.database.get_unique(Person, identifier=person_id)
 
-            assignments = roster.assignments
+            assignments = dict(roster.assignments)
             assignments[person.identifier] = role
             context.database.update(roster, assignments=assignments)
         except ValueError:
@@ -59,7 +59,7 @@ class RosterAssignments(Resource):
             if person.identifier not in roster.assignments:
                 return
 
-            assignments = roster.assignments
+            assignments = dict(roster.assignments)
             assignments.pop(person.identifier)
             context.database.update(roster, assignments=assignments)
         except ValueError:
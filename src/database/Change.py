@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from database.Dataclass import Dataclass
+
+
+class ChangeType(Enum):
+    """
+    Types of changes made to the objects of a database.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    CLEAR = "clear"
+
+
+@dataclass(frozen=True)
+class Change:
+    """
+    Represents a change made to an object, as sent to the subscribers of a data class. Created objects have no old
+    version, and deleted objects have no new version. A CLEAR change means that all the objects of the data class were
+    deleted, and has neither an old nor a new version.
+    """
+
+    type: ChangeType
+    data_class: type
+    old: Optional[Dataclass] = None
+    new: Optional[Dataclass] = None
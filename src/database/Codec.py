@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+
+class Codec(ABC):
+    """
+    Format of the files in which a driver saves the values of objects. Codecs read and write the files as streams, so
+    that compressing codecs can wrap other codecs.
+    """
+
+    @property
+    @abstractmethod
+    def extension(self) -> str:
+        """
+        Extension of the files written with this codec, including the leading dot (e.g. '.json.gz').
+        """
+        pass
+
+    @abstractmethod
+    def dump(self, object_dict_list: list[dict[str, any]], file: BinaryIO) -> None:
+        """
+        Writes the values of objects in a file.
+
+        :param object_dict_list: The values of the objects, as dictionaries.
+        :param file: The file, opened in binary mode.
+        """
+        pass
+
+    @abstractmethod
+    def load(self, file: BinaryIO) -> list[dict[str, any]]:
+        """
+        Reads the values of objects from a file.
+
+        :param file: The file, opened in binary mode.
+        :return: The values of the objects, as dictionaries.
+        """
+        pass
@@ -1,7 +1,12 @@
-from typing import Optional
+from __future__ import annotations
 
-from database.Dataclass import Dataclass, Schema
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from database.Change import Change, ChangeType
+from database.Dataclass import Dataclass
 from database.Driver import Driver
+from database.QueryCache import QueryCache
 from database.dataclass.Absence import Absence
 from database.dataclass.Pattern import Pattern
 from database.dataclass.Person import Person
@@ -17,19 +22,34 @@ from database.errors.ObjectNotFoundError import ObjectNotFoundError
 class Database:
     """
     Database class. A database manages data classes. A driver allows the database to interact with the system.
+
+    The results of get() and get_unique() can be kept in a query cache, which is invalidated each time the objects of a
+    data class are modified through the database.
+
+    Other components can subscribe to the changes made to the objects of a data class through the database. The changes
+    are sent once they are saved: right away outside of a transaction, or when the transaction is committed.
     """
 
     __driver: Driver
     __data_classes: list[type]
+    __transaction_depth: int
+    __cache: Optional[QueryCache]
+    __subscribers: dict[type, list[Callable[[Change], None]]]
+    __pending_changes: Optional[list[Change]]
 
-    def __init__(self, driver: Driver = None):
+    def __init__(self, driver: Driver = None, cache_size: int = 0):
         """
         Constructor.
 
         :param driver: The driver to use.
+        :param cache_size: Maximum number of query results kept in the query cache. If 0, the cache is disabled.
         """
         self.__driver = driver if driver else ListDriver()
         self.__data_classes = []
+        self.__transaction_depth = 0
+        self.__cache = QueryCache(cache_size) if cache_size > 0 else None
+        self.__subscribers = {}
+        self.__pending_changes = None
 
         # Register default dataclasses.
         self._dataclass(Absence)
@@ -37,6 +57,26 @@ class Database:
         self._dataclass(Person)
         self._dataclass(Roster)
 
+    @property
+    def cache(self) -> Optional[QueryCache]:
+        """
+        The query cache, or None if it is disabled.
+        """
+        return self.__cache
+
+    def count(self, data_class: type, **kwargs) -> int:
+        """
+        Counts data objects.
+
+        :param data_class: The class of objects to count.
+        :param kwargs: Search values, as in get().
+        :return: The number of data objects corresponding to the given search values.
+        """
+        if data_class not in self.__data_classes:
+            raise InvalidDataclassError(data_class)
+
+        return self.__driver.count_objects(data_class, **kwargs)
+
     def create(self, data_class: type, **kwargs) -> Dataclass:
         """
         Creates a new data object.
@@ -52,9 +92,31 @@ class Database:
         if self.__driver.exists(data_class, **data_object.key()):
             raise DuplicateKeyError()
 
+        self.__invalidate(data_class)
         self.__driver.create_object(data_object)
+        if data_class in self.__subscribers:
+            self.__publish([Change(ChangeType.CREATE, data_class, new=data_object)])
         return data_object
 
+    def create_many(self, data_class: type, values: list[dict[str, any]]) -> list[Dataclass]:
+        """
+        Creates several data objects. If one of the objects has the same key as an existing object or as another of the
+        new objects, no object is created.
+
+        :param data_class: Class of the objects.
+        :param values: Initial values of each object.
+        :return: The newly created objects.
+        """
+        if data_class not in self.__data_classes:
+            raise InvalidDataclassError(data_class)
+
+        data_objects = [data_class(**kwargs) for kwargs in values]
+        self.__invalidate(data_class)
+        self.__driver.create_many(data_objects)
+        if data_class in self.__subscribers:
+            self.__publish([Change(ChangeType.CREATE, data_class, new=o) for o in data_objects])
+        return data_objects
+
     def clear(self, data_class: Optional[type] = None) -> None:
         """
         Clears objects.
@@ -63,13 +125,18 @@ class Database:
         """
         if data_class is None:
             for current_data_class in self.__data_classes:
+                self.__invalidate(current_data_class)
                 self.__driver.clear_objects(current_data_class)
+            self.__publish([Change(ChangeType.CLEAR, c) for c in self.__data_classes if c in self.__subscribers])
             return
 
         if data_class not in self.__data_classes:
             raise InvalidDataclassError(data_class)
 
+        self.__invalidate(data_class)
         self.__driver.clear_objects(data_class)
+        if data_class in self.__subscribers:
+            self.__publish([Change(ChangeType.CLEAR, data_class)])
 
     def delete(self, data_class: type, **kwargs) -> None:
         """
@@ -80,21 +147,70 @@ class Database:
         """
         if data_class not in self.__data_classes:
             raise InvalidDataclassError(data_class)
-        else:
-            self.__driver.delete_objects(data_class, **kwargs)
 
-    def get(self, data_class: type, **kwargs) -> list[Dataclass]:
+        # The deleted objects are only looked up if they must be sent to subscribers.
+        deleted_objects = self.__driver.read_objects(data_class, **kwargs) if data_class in self.__subscribers else []
+        self.__invalidate(data_class)
+        self.__driver.delete_objects(data_class, **kwargs)
+        self.__publish([Change(ChangeType.DELETE, data_class, old=o) for o in deleted_objects])
+
+    def delete_many(self, data_objects: list[Dataclass]) -> None:
+        """
+        Deletes several data objects.
+
+        :param data_objects: The objects to delete. Objects are identified by their key.
+        """
+        for data_class in dict.fromkeys(o.__class__ for o in data_objects):
+            if data_class not in self.__data_classes:
+                raise InvalidDataclassError(data_class)
+            self.__invalidate(data_class)
+
+        deleted_objects = [o for o in map(self.__stored, data_objects) if o is not None]
+        self.__driver.delete_many(data_objects)
+        self.__publish([Change(ChangeType.DELETE, o.__class__, old=o) for o in deleted_objects])
+
+    def exists(self, data_class: type, **kwargs) -> bool:
+        """
+        Checks if data objects exist. The search stops at the first object found.
+
+        :param data_class: The class of the objects.
+        :param kwargs: Search values, as in get().
+        :return: True if at least one data object corresponds to the given search values, false otherwise.
+        """
+        if data_class not in self.__data_classes:
+            raise InvalidDataclassError(data_class)
+
+        return self.__driver.exists(data_class, **kwargs)
+
+    def flush(self) -> None:
+        """
+        Saves the changes that the driver has not saved yet. As the driver may merge changes saved by other processes,
+        the query cache is cleared.
+        """
+        try:
+            self.__driver.flush()
+        finally:
+            if self.__cache is not None:
+                self.__cache.clear()
+
+    def get(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+            **kwargs) -> list[Dataclass]:
         """
         Gets data objects.
 
         :param data_class: The class of objects to get.
-        :param kwargs: Search values. Objects having all the given values will be returned.
+        :param order_by: Name of the field used to sort the objects. Prefix it with '-' to sort in descending order
+         (e.g. '-sequence_no'). If not given, the order of the objects is not specified.
+        :param limit: Maximum number of objects to return.
+        :param kwargs: Search values. Objects having all the given values will be returned. The name of a field can be
+         suffixed with an operator (e.g. 'sequence_no__lt' or 'roles__contains').
         :return: List of data objects corresponding to the given search values.
         """
         if data_class not in self.__data_classes:
             raise InvalidDataclassError(data_class)
         else:
-            objects = self.__driver.read_objects(data_class, **kwargs)
+            objects = self.__read(data_class, ("get", order_by, limit), kwargs,
+                                  lambda: self.__driver.read_objects(data_class, order_by, limit, **kwargs))
             return objects
 
     def get_unique(self, data_class: type, **kwargs) -> Dataclass:
@@ -108,16 +224,106 @@ class Database:
         if data_class not in self.__data_classes:
             raise InvalidDataclassError(data_class)
 
-        for field_name in Schema(data_class).key_fields.keys():
+        for field_name in data_class.schema().key_fields.keys():
             if field_name not in kwargs:
                 raise IncompleteKeyError(field_name)
 
-        objects = self.__driver.read_objects(data_class, **kwargs)
+        objects = self.__read(data_class, ("get_unique",), kwargs,
+                              lambda: list(self.__driver.iter_objects(data_class, limit=1, **kwargs)))
         if not objects:
             raise ObjectNotFoundError()
 
         return objects[0]
 
+    def iter(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+             **kwargs) -> Iterator[Dataclass]:
+        """
+        Iterates over data objects. Unlike get(), the objects are found as the iterator is consumed, so stopping early
+        avoids looking for the remaining objects. The database must not be modified before the iterator is exhausted.
+
+        :param data_class: The class of objects to get.
+        :param order_by: Name of the field used to sort the objects, as in get().
+        :param limit: Maximum number of objects to return.
+        :param kwargs: Search values, as in get().
+        :return: An iterator over the data objects corresponding to the given search values.
+        """
+        if data_class not in self.__data_classes:
+            raise InvalidDataclassError(data_class)
+
+        return self.__driver.iter_objects(data_class, order_by, limit, **kwargs)
+
+    def subscribe(self, data_class: type, callback: Callable[[Change], None]) -> None:
+        """
+        Subscribes to the changes made to the objects of a data class. The callback is called with each change once it
+        is saved: right after the modification outside of a transaction, or after the transaction is committed. Changes
+        cancelled by a rollback are not sent. Exceptions raised by the callback are propagated, but do not cancel the
+        change.
+
+        Example:
+            database.subscribe(Roster, lambda change: print(change.type, change.old, change.new))
+
+        :param data_class: The data class.
+        :param callback: Function called with each change.
+        """
+        if data_class not in self.__data_classes:
+            raise InvalidDataclassError(data_class)
+
+        self.__subscribers.setdefault(data_class, []).append(callback)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Database]:
+        """
+        Groups operations in a transaction. The changes are saved when the with block ends, or cancelled if an exception
+        is raised. Transactions started inside a transaction are part of the outer transaction.
+
+        Example:
+            with database.transaction():
+                database.create(Roster, sequence_no=1)
+                database.create(Roster, sequence_no=2)
+
+        :return: A context manager returning this database.
+        """
+        if self.__transaction_depth == 0:
+            self.__driver.begin()
+            self.__pending_changes = []
+        self.__transaction_depth += 1
+
+        committed = False
+        changes = []
+        try:
+            yield self
+        except BaseException:
+            if self.__transaction_depth == 1:
+                self.__driver.rollback()
+                if self.__cache is not None:
+                    self.__cache.clear()
+            raise
+        else:
+            if self.__transaction_depth == 1:
+                self.__driver.commit()
+                committed = True
+        finally:
+            self.__transaction_depth -= 1
+            if self.__transaction_depth == 0:
+                changes, self.__pending_changes = self.__pending_changes, None
+
+        # Subscribers are notified once the transaction is over, so that they can start new transactions.
+        if committed:
+            self.__publish(changes)
+
+    def unsubscribe(self, data_class: type, callback: Callable[[Change], None]) -> None:
+        """
+        Cancels a subscription made with subscribe().
+
+        :param data_class: The data class.
+        :param callback: The callback given to subscribe().
+        """
+        callbacks = self.__subscribers.get(data_class, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self.__subscribers.pop(data_class, None)
+
     def update(self, data_object: Dataclass, **kwargs) -> Dataclass:
         """
         Updates a data object.
@@ -126,17 +332,31 @@ class Database:
         :param kwargs: New values.
         :return: An copy of the given data object with the new values.
         """
-        if data_object.__class__ not in self.__data_classes:
-            raise InvalidDataclassError(data_object.__class__)
-
-        updated_data_object = data_object.replace(**kwargs)
-        if data_object.key() != updated_data_object.key():
-            diff = list(dict(set(data_object.key().items()) ^ set(updated_data_object.key().items())).keys())
-            raise KeyModificationError(diff)
-
+        updated_data_object = self.__replace(data_object, **kwargs)
+        old_data_object = self.__stored(data_object)
+        self.__invalidate(data_object.__class__)
         self.__driver.update_object(updated_data_object)
+        if data_object.__class__ in self.__subscribers:
+            self.__publish([Change(ChangeType.UPDATE, data_object.__class__, old_data_object, updated_data_object)])
         return updated_data_object
 
+    def update_many(self, updates: list[tuple[Dataclass, dict[str, any]]]) -> list[Dataclass]:
+        """
+        Updates several data objects.
+
+        :param updates: The data objects to modify, each with its new values.
+        :return: Copies of the given data objects with the new values, in the same order.
+        """
+        updated_data_objects = [self.__replace(data_object, **kwargs) for data_object, kwargs in updates]
+        old_data_objects = [self.__stored(data_object) for data_object, _ in updates]
+        for data_class in dict.fromkeys(o.__class__ for o in updated_data_objects):
+            self.__invalidate(data_class)
+        self.__driver.update_many(updated_data_objects)
+        self.__publish([Change(ChangeType.UPDATE, new.__class__, old, new)
+                        for old, new in zip(old_data_objects, updated_data_objects)
+                        if new.__class__ in self.__subscribers])
+        return updated_data_objects
+
     def _dataclass(self, dataclass: type) -> None:
         """
         Registers a data class.
@@ -148,3 +368,80 @@ class Database:
 
         if dataclass not in self.__data_classes:
             self.__data_classes.append(dataclass)
+
+    def __invalidate(self, data_class: type) -> None:
+        """
+        Invalidates the cached query results of a data class.
+
+        :param data_class: The data class whose objects are modified.
+        """
+        if self.__cache is not None:
+            self.__cache.invalidate(data_class)
+
+    def __publish(self, changes: list[Change]) -> None:
+        """
+        Sends changes to the subscribers of their data class. During a transaction, the changes are kept until the
+        transaction is committed.
+
+        :param changes: The changes.
+        """
+        if self.__pending_changes is not None:
+            self.__pending_changes.extend(changes)
+            return
+
+        for change in changes:
+            for callback in list(self.__subscribers.get(change.data_class, [])):
+                callback(change)
+
+    def __read(self, data_class: type, query: tuple, kwargs: dict[str, any], read: callable) -> list[Dataclass]:
+        """
+        Reads objects, using the query cache if it is enabled. Queries with unhashable search values are not cached.
+
+        :param data_class: The class of the objects.
+        :param query: The method and the arguments identifying the query, without the search values.
+        :param kwargs: Search values.
+        :param read: Function reading the objects from the driver.
+        :return: The objects.
+        """
+        if self.__cache is None:
+            return read()
+
+        query = QueryCache.key(*query, **kwargs)
+        if query is None:
+            return read()
+
+        objects = self.__cache.get(data_class, query)
+        if objects is None:
+            objects = read()
+            self.__cache.put(data_class, query, objects)
+        return objects
+
+    def __replace(self, data_object: Dataclass, **kwargs) -> Dataclass:
+        """
+        Creates a modified copy of a data object, checking that its key is not modified.
+
+        :param data_object: Data object to modify.
+        :param kwargs: New values.
+        :return: A copy of the given data object with the new values.
+        """
+        if data_object.__class__ not in self.__data_classes:
+            raise InvalidDataclassError(data_object.__class__)
+
+        updated_data_object = data_object.replace(**kwargs)
+        if data_object.key() != updated_data_object.key():
+            diff = list(dict(set(data_object.key().items()) ^ set(updated_data_object.key().items())).keys())
+            raise KeyModificationError(diff)
+
+        return updated_data_object
+
+    def __stored(self, data_object: Dataclass) -> Optional[Dataclass]:
+        """
+        Gets the stored version of an object if changes to its data class must be sent to subscribers.
+
+        :param data_object: The object.
+        :return: The stored object with the same key, or None if it does not exist or there is no subscriber.
+        """
+        if data_object.__class__ not in self.__subscribers:
+            return None
+
+        return next(self.__driver.iter_objects(data_object.__class__, limit=1, **data_object.key()), None)
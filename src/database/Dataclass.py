@@ -1,22 +1,85 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from dataclasses import dataclass
 from inspect import isclass
+from sys import intern
 from typing import Optional
 
+from database.FrozenDict import FrozenDict
+from database.FrozenList import FrozenList
 from database.errors.InvalidDataclassError import InvalidDataclassError
 
 
-class Dataclass:
+@dataclass(frozen=True)
+class Field:
+    """
+    Represents a field of a data class. Indexed fields can be efficiently searched by drivers supporting indexes.
+    Drivers supporting partitions split the objects of a data class by ranges of values of its partition field, which
+    must be an integer key field.
+    """
+
+    key: bool = True
+    index: bool = False
+    partition: bool = False
+    default: Optional[any] = None
+    default_factory: Optional[callable] = None
+
+
+class _DataclassType(type):
+    """
+    Type of the data classes. Replaces the field declarations of a data class by slots when the class is created, so
+    that objects store their values without a per-object dictionary.
+    """
+
+    def __new__(mcs, name: str, bases: tuple[type, ...], namespace: dict[str, any], **kwargs):
+        annotations = namespace.get("__annotations__", {})
+        members = list(annotations.keys()) + [m for m in namespace.keys() if m not in annotations]
+
+        declarations = {}
+        for member in filter(lambda m: not m.startswith("_"), members):
+            value = namespace.get(member, None)
+            if value is None or isinstance(value, Field):
+                declarations[member] = value if isinstance(value, Field) else Field()
+                namespace.pop(member, None)
+
+        namespace["__slots__"] = tuple(declarations.keys())
+        namespace["_Dataclass__declarations"] = declarations
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class Dataclass(metaclass=_DataclassType):
     """
     Represents a data class, i.e. a type of objects managed by the database. Instances of this class represent objects
     of this type. A data class object is immutable. It is however possible to created modified copies with the replace()
     method.
+
+    The schema of a data class is computed once, when the class is created. The field values of an object are stored in
+    slots, so that reading a field is a plain attribute lookup and objects do not carry a dictionary. List, dict and set
+    values are stored as immutable copies (FrozenList, FrozenDict and frozenset), which lets modified copies share the
+    values of the fields that did not change. Strings, including the items and keys of these values, are interned, so
+    that the identifiers and role names repeated in many objects are stored once and compared by identity.
     """
 
+    __declarations: dict[str, Field]
     __schema: Schema
-    __values: dict[str, any]
+    __defaults: dict[str, any]
+    __default_factories: dict[str, callable]
+    __setters: dict[str, callable]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        Computes the schema of a new data class.
+
+        :param kwargs: Class arguments.
+        """
+        super().__init_subclass__(**kwargs)
+        schema = Schema(cls)
+
+        cls.__schema = schema
+        cls.__defaults = {name: field.default for name, field in schema.fields.items()}
+        cls.__default_factories = {name: field.default_factory for name, field in schema.fields.items()
+                                   if field.default is None and field.default_factory}
+        cls.__setters = {name: getattr(cls, name).__set__ for name in schema.fields.keys()}
 
     def __init__(self, **kwargs) -> None:
         """
@@ -24,52 +87,53 @@ class Dataclass:
 
         :param kwargs: Initial values.
         """
-        self.__schema = Schema(self.__class__)
-
-        # Initialize all fields to None.
-        fields = self.__schema.fields
-        self.__values = {field_name: None for field_name, field in fields.items()}
-
-        # Set values in kwargs.
-        for key, value in kwargs.items():
-            if key not in self.__values:
+        for key in kwargs.keys():
+            if key not in self.__defaults:
                 dataclass_name = self.__class__.__name__
                 raise AttributeError(f"'{dataclass_name}' dataclass has no field '{key}'")
-            self.__values[key] = value
 
-        # Set default values
-        for name, field in fields.items():
-            if name in kwargs:
-                continue
+        # Set default values, then values in kwargs.
+        values = self.__defaults.copy()
+        for name, default_factory in self.__default_factories.items():
+            if name not in kwargs:
+                values[name] = default_factory()
+        values.update(kwargs)
 
-            if field.default is not None:
-                self.__values[name] = field.default
-            elif field.default_factory:
-                self.__values[name] = field.default_factory()
+        self.__setstate__(values)
 
     def __str__(self):
-        return str(self.__values)
+        return str(self.to_dict())
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self is other or self.to_dict() == other.to_dict()
 
     def __hash__(self):
-        return hash(self.key().values())
-
-    def __getattribute__(self, item):
-        # Non-public attributes or methods
-        if item.startswith("_"):
-            return super(Dataclass, self).__getattribute__(item)
-
-        try:
-            # Methods or public attributes that are not fields.
-            attribute = super(Dataclass, self).__getattribute__(item)
-            if callable(attribute) or item not in self.__values:
-                return attribute
-        except AttributeError as e:
-            # Ignore attribute errors if it is a field.
-            if item not in self.__values:
-                raise e
-
-        # Get field value.
-        return self.get(item)
+        return hash(tuple(self.key().values()))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"'{self.__class__.__name__}' dataclass objects are immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError(f"'{self.__class__.__name__}' dataclass objects are immutable")
+
+    def __getstate__(self) -> dict[str, any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: dict[str, any]) -> None:
+        setters = self.__setters
+        for name, value in state.items():
+            setters[name](self, self.__freeze(value))
+
+    @classmethod
+    def schema(cls) -> Schema:
+        """
+        Returns the schema of this data class. The schema is computed once, when the data class is created.
+
+        :return: The schema.
+        """
+        return cls.__schema
 
     def get(self, field: str) -> any:
         """
@@ -78,31 +142,34 @@ class Dataclass:
         :param field: Name of the field.
         :return: The value of the field.
         """
-        if field not in self.__values:
+        if field not in self.__defaults:
             dataclass_name = self.__class__.__name__
             raise AttributeError(f"'{dataclass_name}' dataclass has no field '{field}'")
-        return self.__values.get(field, None)
+        return getattr(self, field)
 
     def key(self) -> dict[str, any]:
         """
         Returns the field values of this data class object.
         :return: A dictionary. The keys are the names of the fields, associated with their values.
         """
-        return {key: self.get(key) for key, field in self.__schema.key_fields.items()}
+        return {key: getattr(self, key) for key in self.__schema.key_fields.keys()}
 
     def replace(self, **kwargs):
         """
-        Create a modified copy of a data class object.
+        Create a modified copy of a data class object. The values of the fields that are not modified are shared with
+        this object.
         :param kwargs: The modified values.
         :return: A modified copy of this object.
         """
-        copy_obj = deepcopy(self)
+        for key in kwargs.keys():
+            if key not in self.__defaults:
+                raise AttributeError(f"'{self.__class__}' dataclass has no field '{key}'")
 
-        for key, value in kwargs.items():
-            if key not in copy_obj.__values:
-                raise AttributeError(f"'{copy_obj.__class__}' dataclass has no field '{key}'")
-            copy_obj.__values[key] = value
+        values = self.to_dict()
+        values.update(kwargs)
 
+        copy_obj = object.__new__(self.__class__)
+        copy_obj.__setstate__(values)
         return copy_obj
 
     def to_dict(self) -> dict[str, any]:
@@ -110,44 +177,64 @@ class Dataclass:
         Converts the data class object to a python dictionary.
         :return:
         """
-        return self.__values.copy()
-
+        return {name: getattr(self, name) for name in self.__defaults.keys()}
 
-@dataclass(frozen=True)
-class Field:
-    """
-    Represents a field of a data class.
-    """
+    @staticmethod
+    def __freeze(value: any) -> any:
+        """
+        Returns an immutable version of a value. Strings are interned. Other values that are already immutable are
+        returned as is.
 
-    key: bool = True
-    default: Optional[any] = None
-    default_factory: Optional[callable] = None
+        :param value: The value.
+        :return: The immutable value.
+        """
+        value_type = type(value)
+        if value_type is str:
+            return intern(value)
+        if value_type is list:
+            return FrozenList(map(Dataclass.__freeze, value))
+        if value_type is dict:
+            return FrozenDict(zip(map(Dataclass.__freeze, value.keys()), map(Dataclass.__freeze, value.values())))
+        if value_type is set:
+            return frozenset(map(Dataclass.__freeze, value))
+        return value
 
 
 class Schema:
     """
-    Represents the schema of a data class.
+    Represents the schema of a data class. Fields are listed in declaration order.
     """
 
     __fields: dict[str, Field]
+    __key_fields: dict[str, Field]
+    __indexed_fields: dict[str, Field]
+    __types: dict[str, any]
+    __partition_field: Optional[str]
 
     def __init__(self, data_class: type):
         """
-        Constructor.
+        Constructor. The schema of a data class can be obtained without recomputing it with Dataclass.schema().
 
         :param data_class: Data class.
         """
         if not isclass(data_class) or not issubclass(data_class, Dataclass):
             raise InvalidDataclassError(data_class)
 
-        all_members = set(dir(data_class) + list(data_class.__annotations__.keys()))
-        public_members = filter(lambda m: not m.startswith("_"), all_members)
+        # Include the fields declared by parent data classes.
+        self.__fields, annotations = {}, {}
+        for parent in reversed(data_class.__mro__):
+            self.__fields.update(parent.__dict__.get("_Dataclass__declarations", {}))
+            annotations.update(parent.__dict__.get("__annotations__", {}))
 
-        self.__fields = {}
-        for member in public_members:
-            value = getattr(data_class, member, None)
-            if value is None or isinstance(value, Field):
-                self.__fields[member] = value if isinstance(value, Field) else Field()
+        self.__key_fields = {name: field for name, field in self.__fields.items() if field.key}
+        self.__indexed_fields = {name: field for name, field in self.__fields.items() if field.index}
+        self.__types = {name: annotations.get(name, None) for name in self.__fields.keys()}
+
+        partition_fields = [name for name, field in self.__fields.items() if field.partition]
+        if len(partition_fields) > 1 or any(not self.__fields[name].key for name in partition_fields):
+            raise ValueError(f"'{data_class.__name__}' dataclass must have at most one partition field, which must be "
+                             f"a key field")
+        self.__partition_field = partition_fields[0] if partition_fields else None
 
     @property
     def fields(self) -> dict[str, Field]:
@@ -161,4 +248,25 @@ class Schema:
         """
         Key fields of the data class.
         """
-        return {name: field for name, field in self.__fields.items() if field.key}
+        return self.__key_fields
+
+    @property
+    def indexed_fields(self) -> dict[str, Field]:
+        """
+        Indexed fields of the data class.
+        """
+        return self.__indexed_fields
+
+    @property
+    def partition_field(self) -> Optional[str]:
+        """
+        Name of the partition field of the data class, or None if the data class is not partitioned.
+        """
+        return self.__partition_field
+
+    @property
+    def types(self) -> dict[str, any]:
+        """
+        Annotated types of the fields of the data class. Fields without annotation are associated with None.
+        """
+        return self.__types
@@ -1,30 +1,121 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
 
 from database.Dataclass import Dataclass
+from database.errors.DuplicateKeyError import DuplicateKeyError
+from database.errors.TransactionNotSupportedError import TransactionNotSupportedError
 
 
 class Driver(ABC):
 
+    def begin(self) -> None:
+        """
+        Starts a transaction. Until commit() or rollback() is called, changes may be kept in memory instead of being
+        saved. Drivers supporting transactions must override rollback(); otherwise, the transaction is refused here,
+        before any change is made, as it could not be cancelled.
+        """
+        if type(self).rollback is Driver.rollback:
+            raise TransactionNotSupportedError(self.__class__)
+
     @abstractmethod
     def clear_objects(self, data_class: type) -> None:
         pass
 
+    def commit(self) -> None:
+        """
+        Ends the current transaction and saves its changes.
+        """
+        pass
+
+    def count_objects(self, data_class: type, **kwargs) -> int:
+        """
+        Counts objects.
+
+        :param data_class: The class of the objects.
+        :param kwargs: Search values.
+        :return: The number of objects having all the given values.
+        """
+        return sum(1 for _ in self.iter_objects(data_class, **kwargs))
+
+    def create_many(self, data_objects: list[Dataclass]) -> None:
+        """
+        Creates several objects. If one of the objects has the same key as an existing object or as another of the
+        objects, no object is created.
+
+        :param data_objects: The objects to create.
+        """
+        keys = set()
+        for data_object in data_objects:
+            key = (data_object.__class__, tuple(data_object.key().values()))
+            if key in keys or self.exists(data_object.__class__, **data_object.key()):
+                raise DuplicateKeyError()
+            keys.add(key)
+
+        for data_object in data_objects:
+            self.create_object(data_object)
+
     @abstractmethod
     def create_object(self, data_object: Dataclass) -> None:
         pass
 
+    def delete_many(self, data_objects: list[Dataclass]) -> None:
+        """
+        Deletes several objects, identified by their key.
+
+        :param data_objects: The objects to delete.
+        """
+        for data_object in data_objects:
+            self.delete_objects(data_object.__class__, **data_object.key())
+
     @abstractmethod
-    def delete_objects(self, data_class: type, key: dict[str, any]) -> None:
+    def delete_objects(self, data_class: type, **kwargs) -> None:
         pass
 
     @abstractmethod
     def exists(self, data_class: type, **kwargs):
         pass
 
+    def flush(self) -> None:
+        """
+        Saves the changes that have not been saved yet.
+        """
+        pass
+
+    def iter_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> Iterator[Dataclass]:
+        """
+        Iterates over objects. Drivers that can find the objects one at a time should override this method, so that
+        callers stopping early do not pay for the objects they do not use.
+
+        :param data_class: The class of the objects.
+        :param order_by: Name of the field used to sort the objects, prefixed with '-' for descending order.
+        :param limit: Maximum number of objects.
+        :param kwargs: Search values.
+        :return: An iterator over the objects having all the given values.
+        """
+        return iter(self.read_objects(data_class, order_by, limit, **kwargs))
+
     @abstractmethod
-    def read_objects(self, data_class: type, **kwargs) -> list[Dataclass]:
+    def read_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> list[Dataclass]:
         pass
 
+    def rollback(self) -> None:
+        """
+        Ends the current transaction and cancels its changes. Never called for drivers not overriding this method, as
+        begin() refuses their transactions.
+        """
+        raise TransactionNotSupportedError(self.__class__)
+
+    def update_many(self, data_objects: list[Dataclass]) -> None:
+        """
+        Updates several objects.
+
+        :param data_objects: The modified objects.
+        """
+        for data_object in data_objects:
+            self.update_object(data_object)
+
     @abstractmethod
     def update_object(self, data_object: Dataclass) -> None:
         pass
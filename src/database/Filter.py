@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+
+from database.errors.InvalidFilterError import InvalidFilterError
+
+
+class Operator(Enum):
+    """
+    Operators that can be used in search values. The operator is given as a suffix of the name of the field, separated
+    by two underscores (e.g. 'roles__contains' or 'sequence_no__lt'). Search values without suffix use the EQ operator.
+    """
+
+    EQ = "eq"
+    LT = "lt"
+    LE = "le"
+    GT = "gt"
+    GE = "ge"
+    CONTAINS = "contains"
+    HAS_KEY = "has_key"
+
+    @property
+    def is_range(self) -> bool:
+        """
+        Indicates if the operator compares the value of a field to a bound.
+        """
+        return self in (Operator.LT, Operator.LE, Operator.GT, Operator.GE)
+
+
+@dataclass(frozen=True)
+class Filter:
+    """
+    Represents a search value, i.e. a condition on a field that objects must satisfy to be selected.
+    """
+
+    field: str
+    operator: Operator
+    value: any
+
+    @staticmethod
+    def parse(name: str, value: any) -> Filter:
+        """
+        Creates a filter from a search value.
+
+        :param name: Name of the search value (e.g. 'identifier' or 'roles__contains').
+        :param value: The value.
+        :return: The filter.
+        """
+        field, separator, operator_name = name.partition("__")
+        if not separator:
+            return Filter(field, Operator.EQ, value)
+
+        try:
+            return Filter(field, Operator(operator_name), value)
+        except ValueError:
+            raise InvalidFilterError(name)
+
+    @staticmethod
+    def parse_all(**kwargs) -> list[Filter]:
+        """
+        Creates filters from search values.
+
+        :param kwargs: Search values.
+        :return: A list of filters.
+        """
+        return [Filter.parse(name, value) for name, value in kwargs.items()]
+
+    def matches(self, data_object) -> bool:
+        """
+        Checks if an object satisfies the condition of this filter.
+
+        :param data_object: The object.
+        :return: True if the object satisfies the condition, false otherwise.
+        """
+        field_value = data_object.get(self.field)
+
+        if self.operator == Operator.EQ:
+            return field_value == self.value
+        if field_value is None:
+            return False
+        if self.operator == Operator.LT:
+            return field_value < self.value
+        if self.operator == Operator.LE:
+            return field_value <= self.value
+        if self.operator == Operator.GT:
+            return field_value > self.value
+        if self.operator == Operator.GE:
+            return field_value >= self.value
+        if self.operator == Operator.CONTAINS:
+            return self.value in field_value
+        if self.operator == Operator.HAS_KEY:
+            return isinstance(field_value, dict) and self.value in field_value
+
+        return False
@@ -0,0 +1,31 @@
+class FrozenDict(dict):
+    """
+    An immutable dictionary. Data class objects store dict values as frozen dictionaries, so that they can be shared
+    between the copies of an object. Use copy() or dict() to get a modifiable copy.
+    """
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError(f"'{self.__class__.__name__}' object is immutable")
+
+    __setitem__ = __immutable
+    __delitem__ = __immutable
+    __ior__ = __immutable
+    clear = __immutable
+    pop = __immutable
+    popitem = __immutable
+    setdefault = __immutable
+    update = __immutable
+
+    def copy(self) -> dict:
+        """
+        Returns a modifiable copy of this dictionary.
+
+        :return: A dict.
+        """
+        return dict(self)
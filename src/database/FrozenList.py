@@ -0,0 +1,35 @@
+class FrozenList(list):
+    """
+    An immutable list. Data class objects store list values as frozen lists, so that they can be shared between the
+    copies of an object. Use copy() or list() to get a modifiable copy.
+    """
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError(f"'{self.__class__.__name__}' object is immutable")
+
+    __setitem__ = __immutable
+    __delitem__ = __immutable
+    __iadd__ = __immutable
+    __imul__ = __immutable
+    append = __immutable
+    clear = __immutable
+    extend = __immutable
+    insert = __immutable
+    pop = __immutable
+    remove = __immutable
+    reverse = __immutable
+    sort = __immutable
+
+    def copy(self) -> list:
+        """
+        Returns a modifiable copy of this list.
+
+        :return: A list.
+        """
+        return list(self)
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import Optional
+
+
+class QueryCache:
+    """
+    Cache of query results. Each data class has a version number, which is incremented each time its objects are
+    modified. A result is only returned if it was stored with the current version of its data class, so that results
+    stored before a modification are never used. The least recently used results are evicted when the cache is full.
+    """
+
+    __max_size: int
+    __entries: OrderedDict[tuple, tuple[int, list[any]]]
+    __versions: dict[type, int]
+    __hits: int
+    __misses: int
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Constructor.
+
+        :param max_size: Maximum number of results kept in the cache.
+        """
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__versions = {}
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        """
+        Number of queries whose result was found in the cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Number of queries whose result was not found in the cache.
+        """
+        return self.__misses
+
+    @property
+    def size(self) -> int:
+        """
+        Number of results in the cache, including results that are no longer valid and have not been evicted yet.
+        """
+        return len(self.__entries)
+
+    def clear(self) -> None:
+        """
+        Removes all the results from the cache.
+        """
+        self.__entries.clear()
+        for data_class in self.__versions.keys():
+            self.__versions[data_class] += 1
+
+    def get(self, data_class: type, query: tuple) -> Optional[list[any]]:
+        """
+        Gets the result of a query.
+
+        :param data_class: The class of the objects returned by the query.
+        :param query: The query, as returned by key().
+        :return: A copy of the result, or None if the cache does not contain a valid result for this query.
+        """
+        entry = self.__entries.get((data_class, query), None)
+        if entry is None or entry[0] != self.__versions.get(data_class, 0):
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__entries.move_to_end((data_class, query))
+        return list(entry[1])
+
+    def invalidate(self, data_class: type) -> None:
+        """
+        Invalidates the results of the queries on a data class. Must be called each time objects of this data class are
+        modified.
+
+        :param data_class: The data class.
+        """
+        self.__versions[data_class] = self.__versions.get(data_class, 0) + 1
+
+    @staticmethod
+    def key(*args, **kwargs) -> Optional[tuple]:
+        """
+        Builds a hashable representation of the arguments of a query.
+
+        :param args: Positional arguments.
+        :param kwargs: Keyword arguments.
+        :return: A tuple, or None if some values are not hashable, in which case the result cannot be cached.
+        """
+        query = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(query)
+        except TypeError:
+            return None
+        return query
+
+    def put(self, data_class: type, query: tuple, result: list[any]) -> None:
+        """
+        Stores the result of a query.
+
+        :param data_class: The class of the objects returned by the query.
+        :param query: The query, as returned by key().
+        :param result: The result. A copy is stored, so the result can be modified afterwards.
+        """
+        if self.__max_size <= 0:
+            return
+
+        self.__entries[(data_class, query)] = (self.__versions.get(data_class, 0), list(result))
+        self.__entries.move_to_end((data_class, query))
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
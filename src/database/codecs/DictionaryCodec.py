@@ -0,0 +1,93 @@
+import io
+import json
+from itertools import repeat
+from typing import BinaryIO
+
+from database.Codec import Codec
+
+
+class DictionaryCodec(Codec):
+    """
+    Saves the values of objects as JSON, with each distinct string stored once.
+
+    The file contains the names of the fields, a table of the distinct strings, and the values of each field as a
+    column. In columns of strings, lists of strings and dictionaries of strings, strings are replaced by their index in
+    the table, so that identifiers and role names repeated in many objects are only written and decoded once. Other
+    columns contain the values as they are.
+
+    Example:
+        {"fields": ["sequence_no", "assignments"], "strings": ["p1", "a", "p2"],
+         "columns": [["json", [1, 2]], ["str_dict", [[0, 1], [2, 1, 0, 1]]]]}
+    """
+
+    __STR = "str"
+    __STR_LIST = "str_list"
+    __STR_DICT = "str_dict"
+    __JSON = "json"
+
+    @property
+    def extension(self) -> str:
+        return ".djson"
+
+    def dump(self, object_dict_list: list[dict[str, any]], file: BinaryIO) -> None:
+        fields = list(object_dict_list[0].keys()) if object_dict_list else []
+        if any(d.keys() != object_dict_list[0].keys() for d in object_dict_list):
+            raise ValueError("All the objects must have the same fields")
+
+        string_indexes = {}
+
+        def index(string: str) -> int:
+            return string_indexes.setdefault(string, len(string_indexes))
+
+        columns = []
+        for field_name in fields:
+            values = [d[field_name] for d in object_dict_list]
+            kind = self.__kind(values)
+            if kind == self.__STR:
+                values = [index(v) if v is not None else None for v in values]
+            elif kind == self.__STR_LIST:
+                values = [[index(item) for item in v] for v in values]
+            elif kind == self.__STR_DICT:
+                values = [[index(item) for pair in v.items() for item in pair] for v in values]
+            columns.append([kind, values])
+
+        text_file = io.TextIOWrapper(file, encoding="utf-8")
+        json.dump({"fields": fields, "strings": list(string_indexes.keys()), "columns": columns}, text_file)
+        text_file.flush()
+        text_file.detach()
+
+    def load(self, file: BinaryIO) -> list[dict[str, any]]:
+        content = json.load(file)
+        strings = content["strings"]
+        get_string = strings.__getitem__
+
+        columns = []
+        for kind, values in content["columns"]:
+            if kind == self.__STR:
+                columns.append([strings[v] if v is not None else None for v in values])
+            elif kind == self.__STR_LIST:
+                columns.append([list(map(get_string, v)) for v in values])
+            elif kind == self.__STR_DICT:
+                columns.append([dict(zip(map(get_string, v[::2]), map(get_string, v[1::2]))) for v in values])
+            elif kind == self.__JSON:
+                columns.append(values)
+            else:
+                raise ValueError(f"Unknown column kind '{kind}'")
+
+        return list(map(dict, map(zip, repeat(content["fields"]), zip(*columns))))
+
+    @classmethod
+    def __kind(cls, values: list[any]) -> str:
+        """
+        Chooses how a column is saved.
+
+        :param values: The values of the column.
+        :return: The kind of column.
+        """
+        if all(v is None or type(v) is str for v in values):
+            return cls.__STR
+        if all(isinstance(v, (list, tuple)) and all(type(i) is str for i in v) for v in values):
+            return cls.__STR_LIST
+        if all(isinstance(v, dict) and all(type(k) is str and type(i) is str for k, i in v.items()) for v in values):
+            return cls.__STR_DICT
+        return cls.__JSON
@@ -0,0 +1,37 @@
+import gzip
+from typing import BinaryIO, Optional
+
+from database.Codec import Codec
+from database.codecs.JsonCodec import JsonCodec
+
+
+class GzipCodec(Codec):
+    """
+    Compresses the files of another codec with gzip. The data is compressed and decompressed as it is written and read.
+    """
+
+    __codec: Codec
+    __compression_level: int
+
+    def __init__(self, codec: Optional[Codec] = None, compression_level: int = 6) -> None:
+        """
+        Constructor.
+
+        :param codec: The codec whose files are compressed. Defaults to JSON.
+        :param compression_level: Compression level, from 1 (fastest) to 9 (smallest).
+        """
+        self.__codec = codec if codec is not None else JsonCodec()
+        self.__compression_level = compression_level
+
+    @property
+    def extension(self) -> str:
+        return f"{self.__codec.extension}.gz"
+
+    def dump(self, object_dict_list: list[dict[str, any]], file: BinaryIO) -> None:
+        # The modification time is not saved, so that saving the same objects always gives the same file.
+        with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=self.__compression_level, mtime=0) as gzip_file:
+            self.__codec.dump(object_dict_list, gzip_file)
+
+    def load(self, file: BinaryIO) -> list[dict[str, any]]:
+        with gzip.GzipFile(fileobj=file, mode="rb") as gzip_file:
+            return self.__codec.load(gzip_file)
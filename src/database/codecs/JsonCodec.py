@@ -0,0 +1,24 @@
+import io
+import json
+from typing import BinaryIO
+
+from database.Codec import Codec
+
+
+class JsonCodec(Codec):
+    """
+    Saves the values of objects as a JSON list of dictionaries.
+    """
+
+    @property
+    def extension(self) -> str:
+        return ".json"
+
+    def dump(self, object_dict_list: list[dict[str, any]], file: BinaryIO) -> None:
+        text_file = io.TextIOWrapper(file, encoding="utf-8")
+        json.dump(object_dict_list, text_file)
+        text_file.flush()
+        text_file.detach()
+
+    def load(self, file: BinaryIO) -> list[dict[str, any]]:
+        return json.load(file)
@@ -0,0 +1,37 @@
+import lzma
+from typing import BinaryIO, Optional
+
+from database.Codec import Codec
+from database.codecs.JsonCodec import JsonCodec
+
+
+class LzmaCodec(Codec):
+    """
+    Compresses the files of another codec with LZMA (xz format). Files are smaller than with gzip, but slower to write.
+    The data is compressed and decompressed as it is written and read.
+    """
+
+    __codec: Codec
+    __preset: int
+
+    def __init__(self, codec: Optional[Codec] = None, preset: int = 6) -> None:
+        """
+        Constructor.
+
+        :param codec: The codec whose files are compressed. Defaults to JSON.
+        :param preset: Compression preset, from 0 (fastest) to 9 (smallest).
+        """
+        self.__codec = codec if codec is not None else JsonCodec()
+        self.__preset = preset
+
+    @property
+    def extension(self) -> str:
+        return f"{self.__codec.extension}.xz"
+
+    def dump(self, object_dict_list: list[dict[str, any]], file: BinaryIO) -> None:
+        with lzma.LZMAFile(file, mode="wb", preset=self.__preset) as lzma_file:
+            self.__codec.dump(object_dict_list, lzma_file)
+
+    def load(self, file: BinaryIO) -> list[dict[str, any]]:
+        with lzma.LZMAFile(file, mode="rb") as lzma_file:
+            return self.__codec.load(lzma_file)
@@ -1,4 +1,4 @@
-from database.Dataclass import Dataclass
+from database.Dataclass import Dataclass, Field
 
 
 class Absence(Dataclass):
@@ -6,5 +6,5 @@ class Absence(Dataclass):
     Represents an an absence of a person for a given roster.
     """
 
-    person_identifier: str
-    roster_sequence_no: int
+    person_identifier: str = Field(index=True)
+    roster_sequence_no: int = Field(index=True, partition=True)
@@ -8,7 +8,7 @@ class Pattern(Dataclass):
     """
 
     identifier: str
-    assignments: dict[str, int] = Field(key=False, default_factory=dict)
+    assignments: dict[str, int] = Field(key=False, index=True, default_factory=dict)
 
     @property
     def roles(self) -> list[str]:
@@ -9,7 +9,7 @@ class Person(Dataclass):
     identifier: str
     last_name: str = Field(key=False)
     first_name: str = Field(key=False)
-    roles: list[str] = Field(key=False, default_factory=list)
+    roles: list[str] = Field(key=False, index=True, default_factory=list)
 
     @property
     def full_name(self) -> str:
@@ -9,8 +9,8 @@ class Roster(Dataclass):
     Represents a roster. A roster indicates which persons are assigned for which roles at a given date.
     """
 
-    sequence_no: int
-    assignments: dict[str, str] = Field(key=False, default_factory=dict)
+    sequence_no: int = Field(index=True, partition=True)
+    assignments: dict[str, str] = Field(key=False, index=True, default_factory=dict)
 
     @property
     def persons(self) -> list[Person]:
@@ -26,8 +26,7 @@ class Roster(Dataclass):
         :param person: The person.
         :return: The role or None if the person is not scheduled.
         """
-        person_assignments = [a for a in self.assignments.items() if a[0] == person.identifier]
-        return person_assignments[0][1] if person_assignments else None
+        return self.assignments.get(person.identifier, None)
 
     def is_assigned(self, person: Person, role: str = None) -> bool:
         """
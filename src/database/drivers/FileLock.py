@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Locks are not available on this platform (e.g. Windows); files are then read and written without locking.
+    fcntl = None
+
+
+class FileLock:
+    """
+    Advisory lock on a lock file, shared between processes. Several processes can hold a shared lock at the same time,
+    while an exclusive lock is only held by one process.
+
+    Locks taken while the lock is already held by the same object are nested in the outer lock, which is only released
+    when the outermost block ends. An exclusive lock must not be requested while only holding a shared lock. Each
+    thread must use its own FileLock object.
+
+    Child processes do not inherit the locks: the lock files held when a process is forked (e.g. by another thread)
+    are closed in the child process.
+    """
+
+    _held_locks: set[FileLock] = set()
+
+    __path: str
+    __file: Optional[int]
+    __depth: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor.
+
+        :param path: Path to the lock file. The file is created if it does not exist.
+        """
+        self.__path = path
+        self.__file = None
+        self.__depth = 0
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Holds an exclusive lock, waiting for the other processes to release their locks.
+        """
+        with self.__lock(fcntl.LOCK_EX if fcntl is not None else 0):
+            yield
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Holds a shared lock, waiting for the other processes to release their exclusive locks.
+        """
+        with self.__lock(fcntl.LOCK_SH if fcntl is not None else 0):
+            yield
+
+    @contextmanager
+    def __lock(self, operation: int) -> Iterator[None]:
+        """
+        Holds a lock.
+
+        :param operation: The flock() operation.
+        """
+        if self.__depth == 0 and fcntl is not None:
+            self.__file = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self.__file, operation)
+            except BaseException:
+                os.close(self.__file)
+                self.__file = None
+                raise
+            FileLock._held_locks.add(self)
+
+        self.__depth += 1
+        try:
+            yield
+        finally:
+            self.__depth -= 1
+            if self.__depth == 0 and self.__file is not None:
+                # Closing the file releases the lock.
+                FileLock._held_locks.discard(self)
+                os.close(self.__file)
+                self.__file = None
+
+    @staticmethod
+    def _close_inherited_files() -> None:
+        """
+        Closes the lock files inherited from the parent process. The lock of a file is shared by all the processes
+        having it open, so the child process would otherwise keep holding the locks of the parent process.
+        """
+        for lock in FileLock._held_locks:
+            os.close(lock.__file)
+            lock.__file = None
+        FileLock._held_locks.clear()
+
+
+if fcntl is not None:
+    os.register_at_fork(after_in_child=FileLock._close_inherited_files)
@@ -0,0 +1,114 @@
+import json
+import os
+from typing import Iterator
+
+
+class Journal:
+    """
+    Append-only log of the changes made to the objects of a data class. Each change is written as one JSON line, so
+    that saving a change does not require rewriting the whole file.
+
+    During a compaction, the journal is moved aside (rotated) while a new snapshot of the objects is written, and new
+    changes are appended to a fresh journal. Replaying the rotated journal and then the current one over the latest
+    snapshot always gives the current state of the objects, even if the compaction was interrupted.
+    """
+
+    __path: str
+    __size: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor.
+
+        :param path: Path to the journal file.
+        """
+        self.__path = path
+        self.__size = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Number of changes in the current journal, i.e. the changes made since the last rotation.
+        """
+        return self.__size
+
+    @property
+    def rotated_path(self) -> str:
+        """
+        Path of the rotated journal, containing the changes being compacted.
+        """
+        return f"{self.__path}.compacting"
+
+    def append(self, changes: list[dict[str, any]]) -> None:
+        """
+        Appends changes to the journal. The changes are written with a single write and flushed to the disk.
+
+        :param changes: The changes.
+        """
+        if not changes:
+            return
+
+        lines = "".join(json.dumps(change) + "\n" for change in changes)
+        with open(self.__path, "ab") as file:
+            # Terminate a line left incomplete by an interrupted write, so that it does not corrupt the new changes.
+            if file.tell() > 0:
+                with open(self.__path, "rb") as reader:
+                    reader.seek(-1, os.SEEK_END)
+                    if reader.read(1) != b"\n":
+                        lines = "\n" + lines
+
+            file.write(lines.encode())
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.__size += len(changes)
+
+    def discard_rotated(self) -> None:
+        """
+        Removes the rotated journal. Must only be called once a snapshot containing its changes has been saved.
+        """
+        rotated_path = self.rotated_path
+        if os.path.exists(rotated_path):
+            os.remove(rotated_path)
+
+    def replay(self) -> Iterator[dict[str, any]]:
+        """
+        Reads the changes of the rotated journal and of the current journal, in the order they were made. Incomplete
+        lines, left by interrupted writes, are ignored.
+
+        :return: A generator of changes.
+        """
+        self.__size = 0
+        for path in (self.rotated_path, self.__path):
+            if not os.path.isfile(path):
+                continue
+
+            with open(path) as file:
+                for line in file:
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        continue
+                    if path == self.__path:
+                        self.__size += 1
+                    yield change
+
+    def rotate(self) -> None:
+        """
+        Moves the current journal aside so that a compaction can start. If a rotated journal already exists (e.g. after
+        an interrupted compaction), the current journal is appended to it.
+        """
+        self.__size = 0
+        if not os.path.isfile(self.__path):
+            return
+
+        rotated_path = self.rotated_path
+        if not os.path.exists(rotated_path):
+            os.replace(self.__path, rotated_path)
+            return
+
+        with open(self.__path) as source, open(rotated_path, "a") as destination:
+            destination.write(source.read())
+            destination.flush()
+            os.fsync(destination.fileno())
+        os.remove(self.__path)
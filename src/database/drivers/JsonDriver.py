@@ -1,114 +1,849 @@
-import json
+import glob
 import os
+import re
+from itertools import islice
+from threading import Thread, current_thread
+from typing import Iterable, Iterator, Mapping, Optional, Union
 
+from database.Codec import Codec
 from database.Dataclass import Dataclass
+from database.Filter import Filter, Operator
+from database.codecs.DictionaryCodec import DictionaryCodec
+from database.codecs.GzipCodec import GzipCodec
+from database.codecs.JsonCodec import JsonCodec
+from database.codecs.LzmaCodec import LzmaCodec
+from database.drivers.FileLock import FileLock
+from database.drivers.Journal import Journal
 from database.drivers.ListDriver import ListDriver
+from database.drivers.Snapshot import Snapshot
+from database.errors.ConcurrentModificationError import ConcurrentModificationError
 
 
 class JsonDriver(ListDriver):
     """
     A driver that saves data in JSON files.
+
+    By default, the objects of a data class are saved in a JSON file when the driver is destroyed. In journaled mode,
+    each change is instead appended to a journal file as soon as it is made, and the state of the objects is rebuilt
+    by replaying the journal over the JSON file (the snapshot). When the journal gets too long, it is compacted into a
+    new snapshot in a background thread.
+
+    During a transaction, changes are only applied in memory. On commit, the file (or the journal) of each modified
+    data class is written once.
+
+    If a partition size is given, the objects of the data classes having a partition field are split into several
+    files by ranges of values of this field (e.g. 'Roster.1000-1099.json' with a partition size of 100). Files are only
+    read when a query may select some of their objects, and only modified files are rewritten. Objects without a value
+    for the partition field are saved in the main file of the data class. Objects saved with another partition size, or
+    without partitions, are moved to the right files the next time they are saved.
+
+    If binary snapshots are enabled, a binary copy of each JSON file is written alongside it (e.g. 'Roster.json.bin'),
+    and read instead of the JSON file as long as the JSON file is not modified. See Snapshot.
+
+    The format of the files is given by a codec, e.g. GzipCodec to compress them ('Roster.json.gz'). Files written with
+    another of the standard codecs are read and rewritten with the current codec the next time they are saved.
+
+    Several processes can use the same files. Files are read under a shared lock and written under an exclusive lock
+    (one lock file per data class, e.g. 'Roster.lock'), so that readers never see partially saved changes. Before
+    saving a file, the driver checks whether another process saved it since it was read. If so, the changes of the
+    other process are merged with the changes of this process, unless both processes modified the same objects: the
+    changes of this process to the objects of the data class are then discarded and a ConcurrentModificationError is
+    raised. In journaled mode, the changes appended to the journal by the other processes are applied in the same way
+    before appending the changes of this process.
     """
 
-    __data_classes_to_save: list[type]
+    __files_to_save: dict[type, set[Optional[int]]]
+    __journaled: bool
+    __compaction_threshold: int
+    __journals: dict[type, Journal]
+    __compactions: dict[type, Thread]
+    __pending_changes: Optional[dict[type, list[dict[str, any]]]]
+    __partition_size: int
+    __partitions: dict[type, dict[int, bool]]
+    __obsolete_files: dict[type, list[str]]
+    __binary_snapshots: bool
+    __codec: Codec
+    __codecs: list[Codec]
+    __locks: dict[type, FileLock]
+    __versions: dict[str, Optional[tuple[int, int, int]]]
+    __base_values: dict[type, dict[tuple, Optional[Union[Dataclass, Mapping[str, any]]]]]
+    __transaction_states: Optional[dict[type, tuple[Optional[dict[int, bool]], set[Optional[int]],
+                                                    dict[tuple, Optional[Union[Dataclass, Mapping[str, any]]]],
+                                                    list[str]]]]
 
-    def __init__(self):
+    def __init__(self, journaled: bool = False, compaction_threshold: int = 1000, partition_size: int = 0,
+                 binary_snapshots: bool = False, codec: Optional[Codec] = None):
         """
         Constructor.
+
+        :param journaled: If true, changes are saved in journal files as soon as they are made.
+        :param compaction_threshold: Number of changes in a journal that triggers a compaction (journaled mode only).
+        :param partition_size: Number of values of the partition field in each file. If 0, each data class is saved in
+         a single file. Partitions cannot be used in journaled mode.
+        :param binary_snapshots: If true, binary copies of the JSON files are written and read to speed up loading.
+        :param codec: Format of the files. Defaults to plain JSON.
         """
         super(JsonDriver, self).__init__()
-        self.__data_classes_to_save = []
+        self.__files_to_save = {}
+        self.__journaled = journaled
+        self.__compaction_threshold = compaction_threshold
+        self.__journals = {}
+        self.__compactions = {}
+        self.__pending_changes = None
+        self.__partition_size = partition_size
+        self.__partitions = {}
+        self.__obsolete_files = {}
+        self.__binary_snapshots = binary_snapshots
+        self.__codec = codec if codec is not None else JsonCodec()
+        self.__locks = {}
+        self.__versions = {}
+        self.__base_values = {}
+        self.__transaction_states = None
+
+        # Codecs whose files are read, the current codec first.
+        self.__codecs = [self.__codec] + [c for c in (JsonCodec(), DictionaryCodec(), GzipCodec(), LzmaCodec(),
+                                                      GzipCodec(DictionaryCodec()), LzmaCodec(DictionaryCodec()))
+                                          if c.extension != self.__codec.extension]
+
+        if journaled and partition_size > 0:
+            raise ValueError("Partitions cannot be used in journaled mode")
 
     def __del__(self):
         """
         Destructor.
         """
-        for data_class in self.__data_classes_to_save:
-            self.__save_file(data_class)
+        self.flush()
+
+        for compaction in self.__compactions.values():
+            # The driver may be destroyed by its compaction thread, if the thread holds its last reference.
+            if compaction is not current_thread():
+                compaction.join()
+
+    def begin(self) -> None:
+        super(JsonDriver, self).begin()
+        self.__pending_changes = {}
+
+        # The objects are only copied before their first modification, so partitions read after that are missing from
+        # the copy. The state of the files is kept, so that a rollback forgets these partitions instead of saving them
+        # without their objects.
+        self.__transaction_states = {
+            data_class: (self.__partitions[data_class].copy() if data_class in self.__partitions else None,
+                         self.__files_to_save.get(data_class, set()).copy(),
+                         self.__base_values.get(data_class, {}).copy(),
+                         self.__obsolete_files.get(data_class, []).copy())
+            for data_class in self._objects.keys()
+        }
 
     def clear_objects(self, data_class: type) -> None:
+        self.__load_file(data_class)
+        self.__remember(data_class, list(self._objects[data_class].keys()))
         super(JsonDriver, self).clear_objects(data_class)
-        self.__set_dirty(data_class)
+        self.__record(data_class, [{"op": "clear"}], {None} | set(self.__partitions.get(data_class, {}).keys()))
+
+    def commit(self) -> None:
+        super(JsonDriver, self).commit()
+        self.__transaction_states = None
+        pending_changes, self.__pending_changes = self.__pending_changes, None
+        for data_class, changes in (pending_changes or {}).items():
+            self.__write_changes(data_class, changes)
+
+    def count_objects(self, data_class: type, **kwargs) -> int:
+        self.__load_file(data_class, **kwargs)
+        return super(JsonDriver, self).count_objects(data_class, **kwargs)
+
+    def create_many(self, data_objects: list[Dataclass]) -> None:
+        self.__load_files(data_objects)
+        self.__remember_objects(data_objects)
+        super(JsonDriver, self).create_many(data_objects)
+        self.__record_objects(data_objects, deleted=False)
 
     def create_object(self, data_object: Dataclass) -> None:
-        self.__load_file(data_object.__class__)
+        self.__load_files([data_object])
+        self.__remember_objects([data_object])
         super(JsonDriver, self).create_object(data_object)
-        self.__set_dirty(data_object.__class__)
+        self.__record_objects([data_object], deleted=False)
+
+    def delete_many(self, data_objects: list[Dataclass]) -> None:
+        self.__load_files(data_objects)
+        self.__remember_objects(data_objects)
+        super(JsonDriver, self).delete_many(data_objects)
+        self.__record_objects(data_objects, deleted=True)
 
     def delete_objects(self, data_class: type, **kwargs) -> None:
-        self.__load_file(data_class)
+        self.__load_file(data_class, **kwargs)
+        deleted_objects = super(JsonDriver, self).read_objects(data_class, **kwargs)
+        self.__remember_objects(deleted_objects)
         super(JsonDriver, self).delete_objects(data_class, **kwargs)
-        self.__set_dirty(data_class)
+        self.__record_objects(deleted_objects, deleted=True)
 
     def exists(self, data_class: type, **kwargs):
-        self.__load_file(data_class)
+        self.__load_file(data_class, **kwargs)
         return super(JsonDriver, self).exists(data_class, **kwargs)
 
-    def read_objects(self, data_class: type, **kwargs) -> list[Dataclass]:
-        self.__load_file(data_class)
-        return super(JsonDriver, self).read_objects(data_class, **kwargs)
+    def flush(self) -> None:
+        for data_class in list(self.__files_to_save.keys()):
+            self.__save_file(data_class)
+
+    def iter_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> Iterator[Dataclass]:
+        self.__load_main_file(data_class)
+        partition_field = data_class.schema().partition_field
+        if data_class not in self.__partitions or order_by not in (partition_field, f"-{partition_field}") \
+                or super(JsonDriver, self).exists(data_class, **{partition_field: None}):
+            self.__load_file(data_class, **kwargs)
+            return super(JsonDriver, self).iter_objects(data_class, order_by, limit, **kwargs)
+
+        # Objects are sorted by partition, so the partitions can be read one at a time, while iterating.
+        filters = Filter.parse_all(**kwargs)
+        for current_filter in filters:
+            if current_filter.field not in data_class.schema().fields:
+                raise AttributeError(f"'{data_class.__name__}' dataclass has no field '{current_filter.field}'")
+
+        return islice(self.__iter_partitions(data_class, order_by, filters), limit)
+
+    def read_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> list[Dataclass]:
+        return list(self.iter_objects(data_class, order_by, limit, **kwargs))
+
+    def rollback(self) -> None:
+        super(JsonDriver, self).rollback()
+        self.__pending_changes = None
+        transaction_states, self.__transaction_states = self.__transaction_states or {}, None
+
+        # Data classes read during the transaction are read again from the files when needed.
+        for data_class in set(self._objects.keys()) | set(self.__partitions.keys()) | set(self.__files_to_save.keys()):
+            if data_class not in transaction_states:
+                self.__unload(data_class)
+
+        for data_class, (partitions, files_to_save, base_values, obsolete_files) in transaction_states.items():
+            if partitions is not None:
+                self.__partitions[data_class] = partitions
+            for storage, value in ((self.__files_to_save, files_to_save), (self.__base_values, base_values),
+                                   (self.__obsolete_files, obsolete_files)):
+                if value:
+                    storage[data_class] = value
+                else:
+                    storage.pop(data_class, None)
+
+    def update_many(self, data_objects: list[Dataclass]) -> None:
+        self.__load_files(data_objects)
+        self.__remember_objects(data_objects)
+        super(JsonDriver, self).update_many(data_objects)
+        self.__record_objects(data_objects, deleted=False)
 
     def update_object(self, data_object: Dataclass) -> None:
-        self.__load_file(data_object.__class__)
+        self.__load_files([data_object])
+        self.__remember_objects([data_object])
         super(JsonDriver, self).update_object(data_object)
-        self.__set_dirty(data_object.__class__)
+        self.__record_objects([data_object], deleted=False)
 
-    @staticmethod
-    def __data_class_file_path(data_class: type) -> str:
+    def __apply_changes(self, data_class: type, changes: Iterable[dict[str, any]]) -> None:
+        """
+        Applies changes, as saved in a journal, to the objects of a data class.
+
+        :param data_class: The data class.
+        :param changes: The changes.
+        """
+        for change in changes:
+            if change["op"] == "store":
+                self._store_values(data_class, [change["values"]])
+            elif change["op"] == "discard":
+                self._discard(data_class, tuple(change["key"]))
+            elif change["op"] == "clear":
+                super(JsonDriver, self).clear_objects(data_class)
+
+    def __compact(self, data_class: type) -> None:
+        """
+        Starts the compaction of the journal of a data class. The journal is rotated and the current objects are
+        converted to dictionaries right away, then the snapshot is written in a background thread.
+
+        :param data_class: The data class.
+        """
+        compaction = self.__compactions.get(data_class, None)
+        if compaction is not None and compaction.is_alive():
+            return
+
+        journal = self.__journals[data_class]
+        journal.rotate()
+        rotated_version = self.__file_version(journal.rotated_path)
+        object_dict_list = self._values(data_class)
+
+        def write_snapshot() -> None:
+            file_path = self.__data_class_file_path(data_class)
+            with FileLock(self.__data_class_lock_path(data_class)).exclusive():
+                # If another process added changes to the rotated journal in the meantime, the snapshot would miss
+                # them; the compaction of the other process saves them instead.
+                if self.__file_version(journal.rotated_path) != rotated_version:
+                    return
+
+                self.__write_file(file_path, object_dict_list)
+                self.__versions[file_path] = self.__file_version(file_path)
+                journal.discard_rotated()
+
+        compaction = Thread(target=write_snapshot, name=f"compaction-{data_class.__name__}")
+        compaction.start()
+        self.__compactions[data_class] = compaction
+
+    def __data_class_file_path(self, data_class: type, partition: Optional[int] = None,
+                               codec: Optional[Codec] = None) -> str:
         """
         Returns the path to the file containing the objects of the given data class.
 
         :param data_class: The data class.
+        :param partition: The partition. If None, returns the path to the main file.
+        :param codec: The codec of the file. Defaults to the current codec.
         :return: File path.
         """
-        return f"{data_class.__name__}.json"
+        extension = (codec if codec is not None else self.__codec).extension
+        if partition is None:
+            return f"{data_class.__name__}{extension}"
+        first_value = partition * self.__partition_size
+        return f"{data_class.__name__}.{first_value}-{first_value + self.__partition_size - 1}{extension}"
+
+    @staticmethod
+    def __data_class_journal_path(data_class: type) -> str:
+        """
+        Returns the path to the journal of the given data class.
 
-    def __load_file(self, data_class: type) -> None:
+        :param data_class: The data class.
+        :return: File path.
         """
-        Reads objects from the JSON files.
+        return f"{data_class.__name__}.journal"
+
+    @staticmethod
+    def __data_class_lock_path(data_class: type) -> str:
+        """
+        Returns the path to the lock file of the given data class.
+
+        :param data_class: The data class.
+        :return: File path.
+        """
+        return f"{data_class.__name__}.lock"
+
+    @staticmethod
+    def __file_version(file_path: str) -> Optional[tuple[int, int, int]]:
+        """
+        Returns a value identifying the current version of a file. Files are replaced rather than modified in place, so
+        saving a file changes its inode number, besides its modification time and its size.
+
+        :param file_path: Path to the file.
+        :return: The inode number, modification time and size of the file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def __iter_partitions(self, data_class: type, order_by: str, filters: list[Filter]) -> Iterator[Dataclass]:
+        """
+        Iterates over objects sorted by their partition field, reading each partition only when the previous ones have
+        been visited.
+
+        :param data_class: The class of the objects.
+        :param order_by: The partition field, prefixed with '-' for descending order.
+        :param filters: The filters.
+        :return: A generator of objects.
+        """
+        partition_field = data_class.schema().partition_field
+        other_kwargs = {f"{f.field}__{f.operator.value}": f.value for f in filters
+                        if f.field != partition_field or not f.operator.is_range}
+        first, last = self.__partition_range(data_class, filters)
+        partitions = sorted((p for p in self.__partitions[data_class].keys()
+                             if (first is None or p >= first) and (last is None or p <= last)),
+                            reverse=order_by.startswith("-"))
+
+        for partition in partitions:
+            self.__load_partitions(data_class, [partition])
+
+            # Restricts the range conditions on the partition field to the values of the partition.
+            lower = max([(partition * self.__partition_size, Operator.GE)] +
+                        [(f.value, f.operator) for f in filters
+                         if f.field == partition_field and f.operator in (Operator.GT, Operator.GE)],
+                        key=lambda b: (b[0], b[1] == Operator.GT))
+            upper = min([((partition + 1) * self.__partition_size, Operator.LT)] +
+                        [(f.value, f.operator) for f in filters
+                         if f.field == partition_field and f.operator in (Operator.LT, Operator.LE)],
+                        key=lambda b: (b[0], b[1] == Operator.LE))
+            kwargs = {**other_kwargs, f"{partition_field}__{lower[1].value}": lower[0],
+                      f"{partition_field}__{upper[1].value}": upper[0]}
+
+            yield from super(JsonDriver, self).iter_objects(data_class, order_by, **kwargs)
+
+    def __load_file(self, data_class: type, **kwargs) -> None:
+        """
+        Reads objects from the JSON files. For partitioned data classes, only the partitions that may contain objects
+        having the given search values are read.
 
         :param data_class: Data class to load.
+        :param kwargs: Search values.
         :return:
         """
+        self.__load_main_file(data_class)
+        if data_class in self.__partitions:
+            first, last = self.__partition_range(data_class, Filter.parse_all(**kwargs))
+            self.__load_partitions(data_class, [p for p in self.__partitions[data_class].keys()
+                                                if (first is None or p >= first) and (last is None or p <= last)])
+
+    def __load_files(self, data_objects: list[Dataclass]) -> None:
+        """
+        Reads the objects of the data classes of the given objects from the JSON files. For partitioned data classes,
+        only the partitions of the given objects are read.
+
+        :param data_objects: The objects.
+        """
+        for data_class in dict.fromkeys(o.__class__ for o in data_objects):
+            self.__load_main_file(data_class)
+            if data_class in self.__partitions:
+                partition_field = data_class.schema().partition_field
+                self.__load_partitions(data_class, {self.__partition(data_class, o.get(partition_field))
+                                                    for o in data_objects if o.__class__ is data_class} - {None})
+
+    def __load_main_file(self, data_class: type) -> None:
+        """
+        Reads objects from the main JSON file of a data class. In journaled mode, the changes of the journal are then
+        applied. Only the values of the objects are decoded; the objects are created when they are first read.
+
+        For partitioned data classes, the partitions are listed but not read.
+
+        :param data_class: Data class to load.
+        """
         # Check if it was already loaded.
         if data_class in self._objects:
             return
 
-        # Check if the file exists.
-        file_path = self.__data_class_file_path(data_class)
-        if not os.path.isfile(file_path):
+        self._register(data_class)
+        with self.__lock(data_class).shared():
+            self.__read_main_file(data_class)
+
+    def __load_partitions(self, data_class: type, partitions: Iterable[int]) -> None:
+        """
+        Reads the partitions of a data class that were not read yet.
+
+        :param data_class: The data class.
+        :param partitions: The partitions to read.
+        """
+        loaded_partitions = self.__partitions[data_class]
+        partitions = [p for p in partitions if not loaded_partitions.get(p, False)]
+        if not partitions:
+            return
+
+        with self.__lock(data_class).shared():
+            for partition in partitions:
+                loaded_partitions[partition] = True
+                file_path = self.__data_class_file_path(data_class, partition)
+                self.__versions[file_path] = self.__file_version(file_path)
+                if os.path.isfile(file_path):
+                    self._store_values(data_class, self.__read_file(file_path))
+
+    def __lock(self, data_class: type) -> FileLock:
+        """
+        Returns the lock shared with the other processes to read and write the files of a data class.
+
+        :param data_class: The data class.
+        :return: The lock.
+        """
+        if data_class not in self.__locks:
+            self.__locks[data_class] = FileLock(self.__data_class_lock_path(data_class))
+        return self.__locks[data_class]
+
+    def __merge(self, data_class: type, partitions: set[Optional[int]]) -> None:
+        """
+        Merges the changes saved by other processes in files of a data class since they were read. Objects modified by
+        this process keep their values, and the other objects take the values saved in the files. If both processes
+        modified the same objects, the changes of this process to the objects of the data class are discarded. Must be
+        called while holding an exclusive lock.
+
+        :param data_class: The data class.
+        :param partitions: The files to check. None stands for the main file.
+        :raise ConcurrentModificationError: If both processes modified the same objects.
+        """
+        key_fields = tuple(data_class.schema().key_fields.keys())
+        modified_partitions, saved_values = set(), {}
+        for partition in partitions:
+            file_path = self.__data_class_file_path(data_class, partition)
+            if self.__file_version(file_path) == self.__versions.get(file_path, None):
+                continue
+
+            modified_partitions.add(partition)
+            if os.path.isfile(file_path):
+                saved_values.update((tuple(v.get(f) for f in key_fields), v) for v in self.__read_file(file_path))
+
+        if not modified_partitions:
             return
 
+        partition_field = data_class.schema().partition_field
+
+        def in_modified_files(values: Optional[Mapping[str, any]]) -> bool:
+            if values is None:
+                return False
+            partition_value = values.get(partition_field) if partition_field is not None else None
+            return self.__partition(data_class, partition_value) in modified_partitions
+
+        # Objects modified by this process conflict with the objects saved by the other processes since they were read.
+        base_values = self.__base_values.get(data_class, {})
+        modified_keys = self.__modified_keys(data_class)
+        conflicts = [key for key in modified_keys if (key in saved_values or in_modified_files(base_values[key]))
+                     and not self.__same(data_class, saved_values.get(key, None), base_values[key])]
+        if conflicts:
+            self.__unload(data_class)
+            raise ConcurrentModificationError(data_class, conflicts)
+
+        objects = self._objects[data_class]
+        modified_keys = set(modified_keys)
+        self._store_values(data_class, [v for k, v in saved_values.items() if k not in modified_keys])
+        for key in [k for k, o in objects.items() if k not in saved_values and k not in modified_keys
+                    and in_modified_files(o)]:
+            self._discard(data_class, key)
+
+    def __modified_keys(self, data_class: type) -> list[tuple]:
+        """
+        Returns the keys of the objects of a data class modified since the files were read. Objects whose changes were
+        cancelled are ignored.
+
+        :param data_class: The data class.
+        :return: The keys of the objects.
+        """
+        objects = self._objects.get(data_class, {})
+        return [key for key, values in self.__base_values.get(data_class, {}).items()
+                if not self.__same(data_class, objects.get(key, None), values)]
+
+    def __partition(self, data_class: type, value: any) -> Optional[int]:
+        """
+        Returns the partition containing the objects having the given value for the partition field.
+
+        :param data_class: The data class.
+        :param value: Value of the partition field.
+        :return: The partition, or None if the objects are saved in the main file of the data class.
+        """
+        if value is None or data_class not in self.__partitions:
+            return None
+        return value // self.__partition_size
+
+    def __partition_range(self, data_class: type, filters: list[Filter]) -> tuple[Optional[int], Optional[int]]:
+        """
+        Finds the partitions that may contain the objects satisfying the given filters.
+
+        :param data_class: The data class.
+        :param filters: The filters.
+        :return: The first and the last partitions, or None if the range is not limited.
+        """
+        partition_field = data_class.schema().partition_field
+        first, last = None, None
+        for current_filter in filters:
+            if current_filter.field != partition_field:
+                continue
+
+            operator, value = current_filter.operator, current_filter.value
+            if operator == Operator.EQ and value is None:
+                # Objects without value are saved in the main file.
+                return 0, -1
+
+            try:
+                partition = value // self.__partition_size
+            except TypeError:
+                continue
+
+            if operator in (Operator.EQ, Operator.GT, Operator.GE):
+                first = partition if first is None else max(first, partition)
+            if operator in (Operator.EQ, Operator.LT, Operator.LE):
+                last = partition if last is None else min(last, partition)
+
+        return first, last
+
+    def __read_file(self, file_path: str, codec: Optional[Codec] = None) -> list[Mapping[str, any]]:
+        """
+        Reads the values of objects from a file, or from its binary snapshot if it is enabled and up to date.
+
+        :param file_path: Path to the file.
+        :param codec: The codec of the file. Defaults to the current codec.
+        :return: The values of the objects.
+        """
+        if self.__binary_snapshots:
+            object_dict_list = Snapshot(file_path).read()
+            if object_dict_list is not None:
+                return object_dict_list
+
+        with open(file_path, "rb") as file:
+            return (codec if codec is not None else self.__codec).load(file)
+
+    def __read_main_file(self, data_class: type) -> None:
+        """
+        Reads the main file of a data class, the files written with other codecs or partition sizes, and the journal.
+        Must be called while holding a lock.
+
+        :param data_class: Data class to load.
+        """
         # Read the file
-        self._objects[data_class] = []
-        with open(file_path) as file:
-            for data_object in json.load(file):
-                self._objects[data_class] += [data_class(**data_object)]
+        file_path = self.__data_class_file_path(data_class)
+        object_dict_list = []
+        self.__versions[file_path] = self.__file_version(file_path)
+        if os.path.isfile(file_path):
+            object_dict_list = self.__read_file(file_path)
+
+        partition_field = data_class.schema().partition_field
+        if self.__partition_size > 0 and partition_field is not None:
+            self.__partitions[data_class] = {}
+
+        # List the files written with other codecs, and the partitions.
+        obsolete_files = []
+        for codec in self.__codecs:
+            is_current = codec is self.__codec
+            if not is_current and os.path.isfile(self.__data_class_file_path(data_class, codec=codec)):
+                obsolete_files.append((self.__data_class_file_path(data_class, codec=codec), codec))
+            if partition_field is None:
+                continue
+
+            pattern = f"{glob.escape(data_class.__name__)}.*-*{glob.escape(codec.extension)}"
+            for partition_path in glob.glob(pattern):
+                # Values may be negative, e.g. 'Roster.-10--1.json'.
+                value_range = partition_path[len(data_class.__name__) + 1:-len(codec.extension)]
+                match = re.fullmatch(r"(-?\d+)-(-?\d+)", value_range)
+                if match is None:
+                    continue
+
+                if is_current and data_class in self.__partitions:
+                    partition = int(match.group(1)) // self.__partition_size
+                    if partition_path == self.__data_class_file_path(data_class, partition):
+                        self.__partitions[data_class][partition] = False
+                        continue
+                obsolete_files.append((partition_path, codec))
+
+        # Objects saved in files that do not correspond to the current codec and partitions are moved to the right
+        # files.
+        obsolete_values = []
+        for obsolete_path, codec in obsolete_files:
+            obsolete_values.extend(self.__read_file(obsolete_path, codec))
+
+        moved_values = obsolete_values
+        if data_class in self.__partitions:
+            moved_values = moved_values + [d for d in object_dict_list
+                                           if self.__partition(data_class, d.get(partition_field)) is not None]
+        # If saving was interrupted before the obsolete files were removed, the objects of the current files are kept.
+        self._store_values(data_class, obsolete_values)
+        if moved_values or obsolete_files:
+            moved_partitions = {self.__partition(data_class, d.get(partition_field)) for d in moved_values}
+            if data_class in self.__partitions:
+                self.__load_partitions(data_class,
+                                       set(self.__partitions[data_class].keys()) | moved_partitions - {None})
+            self.__set_dirty(data_class, moved_partitions | {None})
+            self.__obsolete_files[data_class] = [obsolete_path for obsolete_path, _ in obsolete_files]
+
+        self._store_values(data_class, object_dict_list)
+
+        if not self.__journaled:
+            return
+
+        # Apply the changes saved in the journal.
+        journal_path = self.__data_class_journal_path(data_class)
+        journal = Journal(journal_path)
+        self.__versions[journal_path] = self.__file_version(journal_path)
+        self.__apply_changes(data_class, journal.replay())
+        self.__journals[data_class] = journal
+
+    def __record(self, data_class: type, changes: list[dict[str, any]], partitions: set[Optional[int]]) -> None:
+        """
+        Records changes made to the objects of a data class. During a transaction, the changes are kept until the
+        transaction is committed. In journaled mode, the changes are appended to the journal. Otherwise, the modified
+        files are marked to be saved.
+
+        :param data_class: The data class.
+        :param changes: The changes.
+        :param partitions: The modified partitions. None stands for the main file.
+        """
+        if not self.__journaled:
+            self.__set_dirty(data_class, partitions)
+
+        if self.__pending_changes is not None:
+            self.__pending_changes.setdefault(data_class, []).extend(changes)
+        elif self.__journaled:
+            self.__write_changes(data_class, changes)
+
+    def __record_objects(self, data_objects: list[Dataclass], deleted: bool) -> None:
+        """
+        Records the creation, modification or deletion of several objects. The changes are recorded once per data class.
+
+        :param data_objects: The objects.
+        :param deleted: True if the objects were deleted, false if they were created or modified.
+        """
+        changes, partitions = {}, {}
+        for data_object in data_objects:
+            data_class = data_object.__class__
+            change = {"op": "discard", "key": list(self._key(data_object))} if deleted \
+                else {"op": "store", "values": data_object.to_dict()}
+            changes.setdefault(data_class, []).append(change)
+
+            partition_field = data_class.schema().partition_field
+            partition_value = data_object.get(partition_field) if partition_field is not None else None
+            partitions.setdefault(data_class, set()).add(self.__partition(data_class, partition_value))
+
+        for data_class, data_class_changes in changes.items():
+            self.__record(data_class, data_class_changes, partitions[data_class])
+
+    def __remember(self, data_class: type, keys: list[tuple]) -> None:
+        """
+        Keeps the values that objects had when the files were read, before they are modified, so that the changes saved
+        by other processes in the meantime can be merged.
+
+        :param data_class: The class of the objects.
+        :param keys: The keys of the objects.
+        """
+        objects = self._objects[data_class]
+        base_values = self.__base_values.setdefault(data_class, {})
+        for key in keys:
+            if key not in base_values:
+                base_values[key] = objects.get(key, None)
+
+    def __remember_objects(self, data_objects: list[Dataclass]) -> None:
+        """
+        Keeps the values that objects had when the files were read, before they are modified.
+
+        :param data_objects: The objects, or their new versions.
+        """
+        keys = {}
+        for data_object in data_objects:
+            keys.setdefault(data_object.__class__, []).append(self._key(data_object))
+
+        for data_class, data_class_keys in keys.items():
+            self.__remember(data_class, data_class_keys)
+
+    @staticmethod
+    def __remove_file(file_path: str) -> None:
+        """
+        Removes a JSON file and its binary snapshot, if they exist.
+
+        :param file_path: Path to the JSON file.
+        """
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        Snapshot(file_path).remove()
+
+    @staticmethod
+    def __same(data_class: type, values: Optional[Union[Dataclass, Mapping[str, any]]],
+               other_values: Optional[Union[Dataclass, Mapping[str, any]]]) -> bool:
+        """
+        Checks whether two versions of an object are equal.
+
+        :param data_class: The class of the object.
+        :param values: The first version, as an object or its values. None if the object does not exist.
+        :param other_values: The second version, as an object or its values. None if the object does not exist.
+        :return: True if the versions are equal.
+        """
+        if values is None or other_values is None:
+            return values is other_values
+        return (values if isinstance(values, Dataclass) else data_class(**values)) == \
+            (other_values if isinstance(other_values, Dataclass) else data_class(**other_values))
 
     def __save_file(self, data_class: type) -> None:
         """
-        Saves the objects in a JSON file.
+        Saves the modified files of a data class. The changes saved by other processes since the files were read are
+        merged first.
 
         :param data_class: Data class to save.
         """
-        if data_class not in self._objects:
+        partitions = self.__files_to_save.get(data_class, set())
+        if data_class not in self._objects or not partitions:
+            self.__files_to_save.pop(data_class, None)
             return
 
-        file_path = self.__data_class_file_path(data_class)
-        if not self._objects[data_class]:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            return
+        with self.__lock(data_class).exclusive():
+            if not self.__journaled:
+                self.__merge(data_class, partitions)
+
+            partition_field = data_class.schema().partition_field
+            object_dict_lists = {}
+            for values in self._values(data_class):
+                partition = self.__partition(data_class, values[partition_field]) if partition_field is not None \
+                    else None
+                object_dict_lists.setdefault(partition, []).append(values)
+
+            for partition in partitions:
+                file_path = self.__data_class_file_path(data_class, partition)
+                if partition not in object_dict_lists:
+                    self.__remove_file(file_path)
+                else:
+                    self.__write_file(file_path, object_dict_lists[partition])
+                self.__versions[file_path] = self.__file_version(file_path)
+
+            for file_path in self.__obsolete_files.pop(data_class, []):
+                self.__remove_file(file_path)
 
-        with open(file_path, "w") as file:
-            object_dict_list = list(map(lambda d: d.to_dict(), self._objects[data_class]))
-            json.dump(object_dict_list, file)
+        del self.__files_to_save[data_class]
+        self.__base_values.pop(data_class, None)
 
-    def __set_dirty(self, data_class: type) -> None:
+    def __set_dirty(self, data_class: type, partitions: set[Optional[int]]) -> None:
         """
-        Indicates that a data class must be saved.
+        Indicates that files of a data class must be saved.
 
         :param data_class: The data class that needs to be saved.
+        :param partitions: The partitions to save. None stands for the main file.
         """
-        if data_class not in self.__data_classes_to_save:
-            self.__data_classes_to_save.append(data_class)
+        self.__files_to_save.setdefault(data_class, set()).update(partitions)
+
+    def __unload(self, data_class: type) -> None:
+        """
+        Forgets the objects of a data class and their unsaved changes, so that they are read again from the files.
+
+        :param data_class: The data class.
+        """
+        self._objects.pop(data_class, None)
+        for storage in (self.__files_to_save, self.__journals, self.__partitions, self.__obsolete_files,
+                        self.__base_values):
+            storage.pop(data_class, None)
+
+    def __write_changes(self, data_class: type, changes: list[dict[str, any]]) -> None:
+        """
+        Saves changes made to the objects of a data class. In journaled mode, the changes are appended to the journal,
+        which is compacted if it gets too long. Otherwise, the modified files are rewritten.
+
+        :param data_class: The data class.
+        :param changes: The changes.
+        """
+        if not self.__journaled:
+            self.__save_file(data_class)
+            return
+
+        journal_path = self.__data_class_journal_path(data_class)
+        with self.__lock(data_class).exclusive():
+            # The changes appended by other processes, or compacted into a new snapshot, are applied before the changes
+            # of this process, unless they modified the same objects.
+            if any(self.__file_version(file_path) != self.__versions.get(file_path, None)
+                   for file_path in (journal_path, self.__data_class_file_path(data_class))):
+                base_values = self.__base_values.get(data_class, {})
+                modified_keys = self.__modified_keys(data_class)
+                self.__unload(data_class)
+                self.__load_main_file(data_class)
+
+                objects = self._objects[data_class]
+                conflicts = [key for key in modified_keys
+                             if not self.__same(data_class, objects.get(key, None), base_values[key])]
+                if conflicts:
+                    raise ConcurrentModificationError(data_class, conflicts)
+                self.__apply_changes(data_class, changes)
+
+            journal = self.__journals[data_class]
+            journal.append(changes)
+            if journal.size >= self.__compaction_threshold:
+                self.__compact(data_class)
+            self.__versions[journal_path] = self.__file_version(journal_path)
+
+        self.__base_values.pop(data_class, None)
+
+    def __write_file(self, file_path: str, object_dict_list: list[dict[str, any]]) -> None:
+        """
+        Writes objects in a file with the current codec. The objects are first written in a temporary file, which then
+        replaces the file, so that the file is never left partially written. The binary snapshot is then written, if
+        enabled.
+
+        :param file_path: Path to the file.
+        :param object_dict_list: The objects, converted to dictionaries.
+        """
+        temp_file_path = f"{file_path}.tmp"
+        with open(temp_file_path, "wb") as file:
+            self.__codec.dump(object_dict_list, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file_path, file_path)
+
+        if self.__binary_snapshots:
+            Snapshot(file_path).write(object_dict_list)
@@ -1,13 +1,39 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator, Mapping, Optional, Union, get_origin
+
 from database.Dataclass import Dataclass
 from database.Driver import Driver
+from database.Filter import Filter, Operator
+from database.errors.DuplicateKeyError import DuplicateKeyError
 
 
 class ListDriver(Driver):
     """
-    A driver that keeps its data in memory using python lists.
+    A driver that keeps its data in memory. The objects of each data class are stored in insertion order and indexed by
+    their key, so that lookups providing all the key fields do not need to go through every object. The driver also
+    maintains a lookup table for each indexed field, mapping the values of the field to the keys of the objects. For
+    indexed fields annotated as lists or dicts, an inverted lookup table maps each element (or dict key) to the objects
+    containing it. For indexed fields annotated as integers, the distinct values are also kept sorted, so that range
+    queries and ordered reads do not need to sort the objects.
+
+    Subclasses loading objects from files can store the values of the objects (dictionaries, or other mappings decoding
+    the values on access) instead of the objects. Each object is then only created the first time it is read, and the
+    lookup tables are only built when a query needs them, so that reading a few objects by key does not pay for the
+    whole file.
+
+    During a transaction, the objects of each data class are copied before its first modification, so that a rollback
+    can restore them.
     """
 
-    _objects: dict[type, list[Dataclass]]
+    _objects: dict[type, dict[tuple, Union[Dataclass, Mapping[str, any]]]]
+    __indexes: dict[type, dict[str, dict[any, dict[tuple, None]]]]
+    __inverted_indexes: dict[type, dict[str, dict[any, dict[tuple, None]]]]
+    __sorted_values: dict[type, dict[str, list[int]]]
+    __key_fields: dict[type, tuple[str, ...]]
+    __unindexed: set[type]
+    __snapshots: Optional[dict[type, Optional[dict[tuple, Union[Dataclass, Mapping[str, any]]]]]]
 
     def __init__(self) -> None:
         """
@@ -15,42 +41,509 @@ class ListDriver(Driver):
         """
         super().__init__()
         self._objects = {}
+        self.__indexes = {}
+        self.__inverted_indexes = {}
+        self.__sorted_values = {}
+        self.__key_fields = {}
+        self.__unindexed = set()
+        self.__snapshots = None
+
+    def begin(self) -> None:
+        self.__snapshots = {}
 
     def clear_objects(self, data_class: type) -> None:
+        self.__save_snapshot(data_class)
+        self.__unindexed.discard(data_class)
         if data_class in self._objects:
             self._objects[data_class].clear()
+            for index in self.__indexes[data_class].values():
+                index.clear()
+            for index in self.__inverted_indexes[data_class].values():
+                index.clear()
+            for sorted_values in self.__sorted_values[data_class].values():
+                sorted_values.clear()
+
+    def commit(self) -> None:
+        self.__snapshots = None
+
+    def count_objects(self, data_class: type, **kwargs) -> int:
+        if not kwargs:
+            return len(self._objects.get(data_class, {}))
+        return sum(1 for _ in self.__select_keys(data_class, **kwargs))
+
+    def create_many(self, data_objects: list[Dataclass]) -> None:
+        keys = set()
+        for data_object in data_objects:
+            data_class, key = data_object.__class__, self._key(data_object)
+            if (data_class, key) in keys or key in self._objects.get(data_class, {}):
+                raise DuplicateKeyError()
+            keys.add((data_class, key))
+
+        for data_object in data_objects:
+            self.__save_snapshot(data_object.__class__)
+            self._store(data_object)
 
     def create_object(self, data_object: Dataclass) -> None:
-        if data_object.__class__ not in self._objects:
-            self._objects[data_object.__class__] = [data_object]
-        else:
-            self._objects[data_object.__class__].append(data_object)
+        self.__save_snapshot(data_object.__class__)
+        self._store(data_object)
+
+    def delete_many(self, data_objects: list[Dataclass]) -> None:
+        for data_object in data_objects:
+            self.__save_snapshot(data_object.__class__)
+            if data_object.__class__ in self._objects:
+                self._discard(data_object.__class__, self._key(data_object))
 
     def delete_objects(self, data_class: type, **kwargs) -> None:
-        if data_class in self._objects:
-            self._objects[data_class] = [o for o in self._objects[data_class] if not self.__is_selected(o, **kwargs)]
+        self.__save_snapshot(data_class)
+        for key in list(self.__select_keys(data_class, **kwargs)):
+            self._discard(data_class, key)
 
     def exists(self, data_class: type, **kwargs):
-        return len(self.read_objects(data_class, **kwargs)) > 0
+        return next(self.__select_keys(data_class, limit=1, **kwargs), None) is not None
+
+    def iter_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> Iterator[Dataclass]:
+        return map(self.__object_getter(data_class), self.__select_keys(data_class, order_by, limit, **kwargs))
+
+    def read_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> list[Dataclass]:
+        return list(map(self.__object_getter(data_class), self.__select_keys(data_class, order_by, limit, **kwargs)))
+
+    def rollback(self) -> None:
+        if self.__snapshots is None:
+            return
+
+        for data_class, objects in self.__snapshots.items():
+            if objects is None:
+                for storage in (self._objects, self.__indexes, self.__inverted_indexes, self.__sorted_values):
+                    storage.pop(data_class, None)
+                continue
+
+            self._register(data_class)
+            for key, data_object in objects.items():
+                self.__put(data_class, key, data_object)
+
+        self.__snapshots = None
 
-    def read_objects(self, data_class: type, **kwargs) -> list[Dataclass]:
-        data_objects = self._objects.get(data_class, [])
-        return list(filter(lambda o: self.__is_selected(o, **kwargs), data_objects))
+    def update_many(self, data_objects: list[Dataclass]) -> None:
+        for data_object in data_objects:
+            self.__save_snapshot(data_object.__class__)
+            self._store(data_object)
 
     def update_object(self, data_object: Dataclass) -> None:
-        self.delete_objects(data_object.__class__, **data_object.key())
-        self.create_object(data_object)
+        self.__save_snapshot(data_object.__class__)
+        self._store(data_object)
+
+    def _discard(self, data_class: type, key: tuple) -> None:
+        """
+        Removes an object from the driver.
+
+        :param data_class: Class of the object.
+        :param key: Key of the object, as returned by _key().
+        """
+        data_object = self._objects[data_class].pop(key, None)
+        if data_object is not None and data_class not in self.__unindexed:
+            self.__unindex(data_class, data_object, key)
+
+    def _key(self, data_object: Dataclass) -> tuple:
+        """
+        Returns the key of an object as a tuple that can be used to index it.
+
+        :param data_object: The object.
+        :return: The values of the key fields of the object.
+        """
+        return tuple(data_object.get(field_name) for field_name in self.__get_key_fields(data_object.__class__))
+
+    def _register(self, data_class: type) -> None:
+        """
+        Initializes the storage of a data class. Any object previously stored for this data class is removed.
+
+        :param data_class: The data class.
+        """
+        schema = data_class.schema()
+        self.__unindexed.discard(data_class)
+        collection_fields = [name for name in schema.indexed_fields.keys()
+                             if get_origin(schema.types[name]) in (list, tuple, set, dict)]
+        self._objects[data_class] = {}
+        self.__indexes[data_class] = {name: {} for name in schema.indexed_fields.keys()
+                                      if name not in collection_fields}
+        self.__inverted_indexes[data_class] = {name: {} for name in collection_fields}
+        self.__sorted_values[data_class] = {name: [] for name in schema.indexed_fields.keys()
+                                            if schema.types[name] is int}
+
+    def _store(self, data_object: Dataclass) -> None:
+        """
+        Adds an object to the driver. If an object with the same key exists, it is replaced.
+
+        :param data_object: The object to store.
+        """
+        self.__put(data_object.__class__, self._key(data_object), data_object)
+
+    def _store_values(self, data_class: type, values_list: Iterable[Mapping[str, any]]) -> None:
+        """
+        Adds objects to the driver from their values, e.g. as decoded from a file. The objects are only created when
+        they are first read. If the driver has no object of this data class yet, the lookup tables are only built when
+        a query needs them. If an object with the same key exists, it is replaced.
+
+        :param data_class: Class of the objects.
+        :param values_list: Values of each object, as dictionaries or other mappings. They must not be modified
+         afterwards.
+        """
+        if data_class not in self._objects:
+            self._register(data_class)
+
+        objects = self._objects[data_class]
+        fields = data_class.schema().fields.keys()
+        key_fields = self.__get_key_fields(data_class)
+        get_key = itemgetter(*key_fields) if len(key_fields) > 1 else lambda v: (v[key_fields[0]],)
+
+        # When loading the first objects of a data class, the lookup tables are built later rather than updated for
+        # each object.
+        if not objects and (self.__indexes[data_class] or self.__inverted_indexes[data_class]):
+            self.__unindexed.add(data_class)
+
+        unindexed = data_class in self.__unindexed
+        for values in values_list:
+            if values.keys() != fields:
+                # Missing values must be replaced by default values, and unknown fields must be reported right away.
+                data_object = data_class(**values)
+                self.__put(data_class, self._key(data_object), data_object)
+            elif unindexed:
+                objects[get_key(values)] = values
+            else:
+                self.__put(data_class, get_key(values), values)
+
+    def _values(self, data_class: type) -> list[dict[str, any]]:
+        """
+        Returns the values of all the objects of a data class, without creating the objects that were not read yet.
+
+        :param data_class: The data class.
+        :return: A list of dictionaries, associating the names of the fields with their values.
+        """
+        return [o.to_dict() if isinstance(o, Dataclass) else o if type(o) is dict else dict(o)
+                for o in self._objects.get(data_class, {}).values()]
+
+    def __build_indexes(self, data_class: type) -> None:
+        """
+        Builds the lookup tables of a data class if they were dropped when loading objects.
+
+        :param data_class: The data class.
+        """
+        if data_class not in self.__unindexed:
+            return
+
+        self.__unindexed.discard(data_class)
+        for index in list(self.__indexes[data_class].values()) + list(self.__inverted_indexes[data_class].values()):
+            index.clear()
+        for sorted_values in self.__sorted_values[data_class].values():
+            sorted_values.clear()
+
+        for key, data_object in self._objects[data_class].items():
+            self.__index(data_class, data_object, key)
+
+    def __get_key_fields(self, data_class: type) -> tuple[str, ...]:
+        """
+        Returns the names of the key fields of a data class.
+
+        :param data_class: The data class.
+        :return: A tuple containing the name of the key fields, in the order used by _key().
+        """
+        if data_class not in self.__key_fields:
+            self.__key_fields[data_class] = tuple(data_class.schema().key_fields.keys())
+        return self.__key_fields[data_class]
+
+    def __index(self, data_class: type, data_object: Union[Dataclass, Mapping[str, any]], key: tuple) -> None:
+        """
+        Adds an object to the lookup tables of the indexed fields.
+
+        :param data_class: Class of the object.
+        :param data_object: The object, or its values.
+        :param key: Key of the object.
+        """
+        for field_name, index in self.__indexes[data_class].items():
+            value = data_object.get(field_name)
+            try:
+                if value not in index:
+                    index[value] = {}
+                    sorted_values = self.__sorted_values[data_class].get(field_name, None)
+                    if sorted_values is not None and value is not None:
+                        insort(sorted_values, value)
+                index[value][key] = None
+            except TypeError:
+                # Unhashable values cannot be looked up.
+                pass
+
+        for field_name, inverted_index in self.__inverted_indexes[data_class].items():
+            for element in self.__elements(data_object.get(field_name)):
+                inverted_index.setdefault(element, {})[key] = None
+
+    def __object_getter(self, data_class: type) -> callable:
+        """
+        Returns a function getting objects by their key. Objects stored as values are created and replace their values,
+        so that they are only created once.
+
+        :param data_class: Class of the objects.
+        :return: A function taking the key of an object and returning the object.
+        """
+        objects = self._objects.get(data_class, {})
+
+        def get_object(key: tuple) -> Dataclass:
+            data_object = objects[key]
+            if not isinstance(data_object, Dataclass):
+                data_object = data_class(**data_object)
+                objects[key] = data_object
+            return data_object
+
+        return get_object
+
+    def __put(self, data_class: type, key: tuple, data_object: Union[Dataclass, Mapping[str, any]]) -> None:
+        """
+        Adds an object, or its values, to the driver. If an object with the same key exists, it is replaced.
+
+        :param data_class: Class of the object.
+        :param key: Key of the object.
+        :param data_object: The object, or its values.
+        """
+        if data_class not in self._objects:
+            self._register(data_class)
+
+        objects = self._objects[data_class]
+        if data_class in self.__unindexed:
+            objects[key] = data_object
+            return
+
+        previous_object = objects.get(key, None)
+        if previous_object is not None:
+            self.__unindex(data_class, previous_object, key)
+
+        objects[key] = data_object
+        self.__index(data_class, data_object, key)
+
+    def __unindex(self, data_class: type, data_object: Union[Dataclass, Mapping[str, any]], key: tuple) -> None:
+        """
+        Removes an object from the lookup tables of the indexed fields.
+
+        :param data_class: Class of the object.
+        :param data_object: The object, or its values.
+        :param key: Key of the object.
+        """
+        for field_name, index in self.__indexes[data_class].items():
+            value = data_object.get(field_name)
+            try:
+                removed = self.__remove_from_table(index, value, key)
+            except TypeError:
+                removed = False
+
+            sorted_values = self.__sorted_values[data_class].get(field_name, None)
+            if removed and sorted_values is not None and value is not None:
+                del sorted_values[bisect_left(sorted_values, value)]
+
+        for field_name, inverted_index in self.__inverted_indexes[data_class].items():
+            for element in self.__elements(data_object.get(field_name)):
+                self.__remove_from_table(inverted_index, element, key)
 
     @staticmethod
-    def __is_selected(data_object: Dataclass, **kwargs) -> bool:
+    def __elements(value: any) -> Iterable[any]:
+        """
+        Returns the hashable elements of a value that are stored in inverted lookup tables.
+
+        :param value: Value of a field.
+        :return: The elements of lists, tuples and sets, or the keys of dicts. Other values have no elements.
         """
-        Checks if an object is selected by the given search values.
+        if not isinstance(value, (list, tuple, set, frozenset, dict)):
+            return ()
 
-        :param data_object: Data object to check.
+        elements = []
+        for element in value:
+            try:
+                hash(element)
+                elements.append(element)
+            except TypeError:
+                continue
+        return elements
+
+    @staticmethod
+    def __remove_from_table(table: dict[any, dict[tuple, None]], value: any, key: tuple) -> bool:
+        """
+        Removes a key from a lookup table.
+
+        :param table: The lookup table.
+        :param value: The value under which the key is stored.
+        :param key: The key to remove.
+        :return: True if the value has no more keys and was removed from the table, false otherwise.
+        """
+        keys = table.get(value, None)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del table[value]
+                return True
+        return False
+
+    def __save_snapshot(self, data_class: type) -> None:
+        """
+        Copies the objects of a data class before its first modification in the current transaction. Objects are
+        immutable, so copying the dictionary containing them is enough. The lookup tables are rebuilt on rollback.
+
+        :param data_class: The data class.
+        """
+        if self.__snapshots is None or data_class in self.__snapshots:
+            return
+
+        objects = self._objects.get(data_class, None)
+        self.__snapshots[data_class] = objects.copy() if objects is not None else None
+
+    def __select_keys(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                      **kwargs) -> Iterator[tuple]:
+        """
+        Returns the keys of the objects selected by the given search values. If all the key fields are given, the
+        object is directly looked up by its key. Otherwise, if values are given for indexed fields, only the objects
+        found in the smallest matching lookup table are checked. Range conditions and orderings on fields with sorted
+        values are resolved by walking through the sorted values. As a last resort, all the objects are checked.
+
+        :param data_class: Class of the objects.
+        :param order_by: Name of the field used to sort the objects. Prefixed with '-' for descending order.
+        :param limit: Maximum number of keys to return.
         :param kwargs: Search values.
-        :return: True if the object is selected, false otherwise.
+        :return: An iterator over the keys of the selected objects. Unless the objects must be sorted in memory, the
+         keys are found as the iterator is consumed, so the objects must not be modified before it is exhausted.
+        """
+        filters = Filter.parse_all(**kwargs)
+        objects = self._objects.get(data_class, {})
+
+        order_field, descending = None, False
+        if order_by is not None:
+            descending = order_by.startswith("-")
+            order_field = order_by[1:] if descending else order_by
+
+        # Objects may be stored as values, which do not report unknown fields.
+        fields = data_class.schema().fields
+        for field_name in [f.field for f in filters] + ([order_field] if order_field is not None else []):
+            if field_name not in fields:
+                raise AttributeError(f"'{data_class.__name__}' dataclass has no field '{field_name}'")
+
+        candidates = self.__find_candidates(data_class, filters)
+        is_ordered = False
+
+        if candidates is None:
+            range_fields = [f.field for f in filters
+                            if f.operator.is_range and self.__has_sorted_values(data_class, f.field)]
+            if self.__has_sorted_values(data_class, order_field, allow_none=False):
+                candidates = self.__walk_sorted_values(data_class, order_field, descending, filters)
+                is_ordered = True
+            elif range_fields:
+                candidates = self.__walk_sorted_values(data_class, range_fields[0], False, filters)
+            else:
+                candidates = objects.keys()
+
+        selected = (key for key in candidates if all(f.matches(objects[key]) for f in filters))
+        if order_field is not None and not is_ordered:
+            # None values come first in ascending order, and last in descending order, as in SQL.
+            selected = sorted(selected, key=lambda k: self.__sort_key(objects[k].get(order_field)), reverse=descending)
+
+        return islice(selected, limit)
+
+    @staticmethod
+    def __sort_key(value: any) -> tuple[bool, any]:
+        """
+        Returns the key used to sort objects by a field value, so that None values are smaller than the other values.
+
+        :param value: The field value.
+        :return: The sort key.
+        """
+        return value is not None, value
+
+    def __find_candidates(self, data_class: type, filters: list[Filter]) -> Optional[Iterable[tuple]]:
+        """
+        Finds the keys of the objects that may satisfy the given filters using the key of the objects and the lookup
+        tables.
+
+        :param data_class: Class of the objects.
+        :param filters: The filters.
+        :return: The keys of the candidate objects, or None if no lookup table can be used.
         """
-        for key, value in kwargs.items():
-            if data_object.get(key) != value:
-                return False
-        return True
+        objects = self._objects.get(data_class, {})
+        equal_values = {f.field: f.value for f in filters if f.operator == Operator.EQ}
+        key_fields = self.__get_key_fields(data_class)
+
+        if all(field_name in equal_values for field_name in key_fields):
+            key = tuple(equal_values[field_name] for field_name in key_fields)
+            try:
+                return [key] if key in objects else []
+            except TypeError:
+                # Unhashable search values cannot match an indexed key, but are still compared to every object.
+                pass
+
+        candidates = None
+        for current_filter in filters:
+            table = self.__get_lookup_table(data_class, current_filter)
+            if table is None:
+                continue
+            try:
+                keys = table.get(current_filter.value, {})
+            except TypeError:
+                continue
+            if candidates is None or len(keys) < len(candidates):
+                candidates = keys
+
+        return candidates
+
+    def __get_lookup_table(self, data_class: type, search_filter: Filter) -> Optional[dict[any, dict[tuple, None]]]:
+        """
+        Returns the lookup table that can be used to find the objects satisfying a filter.
+
+        :param data_class: Class of the objects.
+        :param search_filter: The filter.
+        :return: A lookup table, or None if the filter cannot be resolved with a lookup table.
+        """
+        self.__build_indexes(data_class)
+        if search_filter.operator == Operator.EQ:
+            return self.__indexes.get(data_class, {}).get(search_filter.field, None)
+        if search_filter.operator in (Operator.CONTAINS, Operator.HAS_KEY):
+            return self.__inverted_indexes.get(data_class, {}).get(search_filter.field, None)
+        return None
+
+    def __has_sorted_values(self, data_class: type, field_name: Optional[str], allow_none: bool = True) -> bool:
+        """
+        Checks if the distinct values of a field are kept sorted.
+
+        :param data_class: Class of the objects.
+        :param field_name: Name of the field.
+        :param allow_none: If false, also checks that no object has None as value for this field, as such objects
+         are not part of the sorted values.
+        :return: True if the sorted values of the field can be used, false otherwise.
+        """
+        if field_name not in self.__sorted_values.get(data_class, {}):
+            return False
+        self.__build_indexes(data_class)
+        return allow_none or None not in self.__indexes[data_class][field_name]
+
+    def __walk_sorted_values(self, data_class: type, field_name: str, descending: bool,
+                             filters: list[Filter]) -> Iterable[tuple]:
+        """
+        Iterates over the keys of the objects in the order of the values of a field with sorted values. Only the
+        values satisfying the range conditions on this field are visited.
+
+        :param data_class: Class of the objects.
+        :param field_name: Name of the field.
+        :param descending: If true, the values are visited from the greatest to the smallest.
+        :param filters: The filters.
+        :return: A generator of keys.
+        """
+        sorted_values = self.__sorted_values[data_class][field_name]
+        index = self.__indexes[data_class][field_name]
+        start, stop = 0, len(sorted_values)
+
+        for current_filter in filters:
+            if current_filter.field != field_name or not current_filter.operator.is_range:
+                continue
+
+            operator, value = current_filter.operator, current_filter.value
+            if operator in (Operator.GT, Operator.GE):
+                start = max(start, (bisect_right if operator == Operator.GT else bisect_left)(sorted_values, value))
+            else:
+                stop = min(stop, (bisect_left if operator == Operator.LT else bisect_right)(sorted_values, value))
+
+        positions = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        for position in positions:
+            yield from index[sorted_values[position]]
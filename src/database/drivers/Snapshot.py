@@ -0,0 +1,319 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import repeat
+from typing import Callable, Iterable, Optional
+
+from database.drivers.SnapshotRecord import SnapshotRecord
+
+
+class Snapshot:
+    """
+    Binary copy of a JSON file, which can be read much faster than the JSON file itself.
+
+    The values of the objects are stored by columns. All strings are stored once in a string table, and the columns
+    only contain indexes in this table, so that strings repeated in many objects (roles, identifiers...) are decoded
+    once. Integers, strings, lists of strings and dictionaries of strings are stored in arrays, and other values are
+    stored as JSON. When a snapshot is read, the file is mapped in memory and the arrays are used without being copied:
+    only the string table is decoded, and the values of each object are decoded when they are accessed (see
+    SnapshotRecord).
+
+    The header contains the modification time and the size of the JSON file when the snapshot was written, and a
+    checksum of the content. A snapshot is ignored if the JSON file was modified since it was written, if it is
+    corrupted, or if it was written on a machine with a different byte order.
+    """
+
+    MAGIC = b"RSNP"
+    VERSION = 1
+
+    # Magic number, version, byte order, modification time and size of the JSON file, checksum, content length.
+    __HEADER = struct.Struct("<4sHBqqIQ")
+
+    __INT = 0
+    __STR = 1
+    __STR_LIST = 2
+    __STR_DICT = 3
+    __JSON = 4
+
+    __path: str
+    __source_path: str
+
+    def __init__(self, source_path: str) -> None:
+        """
+        Constructor.
+
+        :param source_path: Path to the JSON file. The snapshot is saved in the same directory, with the '.bin'
+         extension added.
+        """
+        self.__source_path = source_path
+        self.__path = f"{source_path}.bin"
+
+    @property
+    def path(self) -> str:
+        """
+        Path to the snapshot file.
+        """
+        return self.__path
+
+    def read(self) -> Optional[list[SnapshotRecord]]:
+        """
+        Reads the objects of the snapshot. The file is mapped in memory, and the values of the objects are decoded when
+        they are accessed, so the file stays mapped as long as some of the returned records are used.
+
+        :return: The values of the objects, or None if the snapshot does not exist or cannot be used, in which case the
+         JSON file must be read instead.
+        """
+        try:
+            source_stat = os.stat(self.__source_path)
+            with open(self.__path, "rb") as file:
+                content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self.__decode(memoryview(content), source_stat)
+        except (OSError, ValueError, IndexError, struct.error):
+            return None
+
+    def remove(self) -> None:
+        """
+        Removes the snapshot file, if it exists.
+        """
+        if os.path.exists(self.__path):
+            os.remove(self.__path)
+
+    def write(self, object_dict_list: list[dict[str, any]]) -> None:
+        """
+        Writes the values of the objects in the snapshot. Must be called after the JSON file has been written. If some
+        values cannot be saved in a snapshot, the snapshot is removed.
+
+        :param object_dict_list: The values of the objects, as saved in the JSON file.
+        """
+        content = self.__encode(object_dict_list)
+        if content is None:
+            self.remove()
+            return
+
+        source_stat = os.stat(self.__source_path)
+        header = self.__HEADER.pack(self.MAGIC, self.VERSION, sys.byteorder == "little", source_stat.st_mtime_ns,
+                                    source_stat.st_size, zlib.crc32(content), len(content))
+        temp_file_path = f"{self.__path}.tmp"
+        with open(temp_file_path, "wb") as file:
+            file.write(header)
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file_path, self.__path)
+
+    def __decode(self, view: memoryview, source_stat: os.stat_result) -> Optional[list[SnapshotRecord]]:
+        """
+        Decodes the content of a snapshot.
+
+        :param view: The content of the snapshot file.
+        :param source_stat: Status of the JSON file.
+        :return: The objects, or None if the snapshot cannot be used.
+        """
+        magic, version, little_endian, mtime, size, checksum, length = self.__HEADER.unpack_from(view)
+        if magic != self.MAGIC or version != self.VERSION or little_endian != (sys.byteorder == "little"):
+            return None
+        if mtime != source_stat.st_mtime_ns or size != source_stat.st_size:
+            return None
+
+        start = self.__HEADER.size
+        if len(view) != start + length or zlib.crc32(view[start:]) != checksum:
+            return None
+
+        position = start
+
+        def read_bytes(size: int) -> memoryview:
+            nonlocal position
+            if position + size > len(view):
+                raise ValueError("Truncated snapshot")
+            content = view[position:position + size]
+            position += size + (-size % 8)
+            return content
+
+        def read_array(type_code: str, item_count: int) -> memoryview:
+            return read_bytes(item_count * array(type_code).itemsize).cast(type_code)
+
+        record_count, field_count = read_array("Q", 2)
+        strings = str(read_bytes(read_array("Q", 1)[0]), "utf-8").split("\0")
+        columns = {}
+        for _ in range(field_count):
+            name, kind = read_array("Q", 2)
+            if kind == self.__INT:
+                columns[strings[name]] = read_array("q", record_count).__getitem__
+            elif kind == self.__STR:
+                columns[strings[name]] = self.__string_column(strings, read_array("I", record_count))
+            elif kind == self.__STR_LIST:
+                offsets = read_array("Q", record_count + 1)
+                columns[strings[name]] = self.__list_column(strings, offsets, read_array("I", offsets[-1]))
+            elif kind == self.__STR_DICT:
+                offsets = read_array("Q", record_count + 1)
+                keys = read_array("I", offsets[-1])
+                columns[strings[name]] = self.__dict_column(strings, offsets, keys, read_array("I", offsets[-1]))
+            elif kind == self.__JSON:
+                columns[strings[name]] = self.__json_column(strings, read_array("I", record_count))
+            else:
+                return None
+
+        return list(map(SnapshotRecord, repeat(columns, record_count), range(record_count)))
+
+    @staticmethod
+    def __dict_column(strings: list[str], offsets: memoryview, keys: memoryview,
+                      values: memoryview) -> Callable[[int], dict[str, str]]:
+        """
+        Returns a function decoding the values of a column of dictionaries of strings.
+
+        :param strings: The string table.
+        :param offsets: Offset of the first item of each dictionary.
+        :param keys: Indexes of the keys of the items in the string table.
+        :param values: Indexes of the values of the items in the string table.
+        :return: A function taking the index of a row and returning its value.
+        """
+        def decode(row: int) -> dict[str, str]:
+            start, end = offsets[row], offsets[row + 1]
+            return dict(zip(map(strings.__getitem__, keys[start:end]), map(strings.__getitem__, values[start:end])))
+
+        return decode
+
+    def __encode(self, object_dict_list: list[dict[str, any]]) -> Optional[bytes]:
+        """
+        Encodes the values of objects.
+
+        :param object_dict_list: The values of the objects.
+        :return: The content of the snapshot, or None if the objects do not all have the same fields, or if a string
+         contains a null character.
+        """
+        names = list(object_dict_list[0].keys()) if object_dict_list else []
+        if any(d.keys() != object_dict_list[0].keys() for d in object_dict_list):
+            return None
+
+        string_indexes = {}
+
+        def index(string: str) -> int:
+            return string_indexes.setdefault(string, len(string_indexes))
+
+        columns = bytearray()
+        for name in names:
+            values = [d[name] for d in object_dict_list]
+            kind = self.__kind(values)
+            columns += self.__pack("Q", [index(name), kind])
+            if kind == self.__INT:
+                columns += self.__pack("q", values)
+            elif kind == self.__STR:
+                columns += self.__pack("I", map(index, values))
+            elif kind == self.__STR_LIST:
+                columns += self.__pack("Q", self.__offsets(values))
+                columns += self.__pack("I", [index(item) for v in values for item in v])
+            elif kind == self.__STR_DICT:
+                columns += self.__pack("Q", self.__offsets(values))
+                columns += self.__pack("I", [index(key) for v in values for key in v.keys()])
+                columns += self.__pack("I", [index(item) for v in values for item in v.values()])
+            else:
+                columns += self.__pack("I", [index(json.dumps(v)) for v in values])
+
+        strings = "\0".join(string_indexes.keys())
+        if strings.count("\0") != max(len(string_indexes) - 1, 0):
+            return None
+
+        content = self.__pack("Q", [len(object_dict_list), len(names)])
+        content += self.__pack_bytes(strings.encode())
+        content += columns
+        return bytes(content)
+
+    @staticmethod
+    def __json_column(strings: list[str], indexes: memoryview) -> Callable[[int], any]:
+        """
+        Returns a function decoding the values of a column of values saved as JSON.
+
+        :param strings: The string table.
+        :param indexes: Indexes of the JSON strings in the string table.
+        :return: A function taking the index of a row and returning its value.
+        """
+        def decode(row: int) -> any:
+            return json.loads(strings[indexes[row]])
+
+        return decode
+
+    @classmethod
+    def __kind(cls, values: list[any]) -> int:
+        """
+        Chooses how a column is stored.
+
+        :param values: The values of the column.
+        :return: The kind of column.
+        """
+        if all(type(v) is int for v in values) and all(-2 ** 63 <= v < 2 ** 63 for v in values):
+            return cls.__INT
+        if all(type(v) is str for v in values):
+            return cls.__STR
+        if all(isinstance(v, (list, tuple)) and all(type(i) is str for i in v) for v in values):
+            return cls.__STR_LIST
+        if all(isinstance(v, dict) and all(type(k) is str and type(i) is str for k, i in v.items()) for v in values):
+            return cls.__STR_DICT
+        return cls.__JSON
+
+    @staticmethod
+    def __list_column(strings: list[str], offsets: memoryview, items: memoryview) -> Callable[[int], list[str]]:
+        """
+        Returns a function decoding the values of a column of lists of strings.
+
+        :param strings: The string table.
+        :param offsets: Offset of the first item of each list.
+        :param items: Indexes of the items in the string table.
+        :return: A function taking the index of a row and returning its value.
+        """
+        def decode(row: int) -> list[str]:
+            return list(map(strings.__getitem__, items[offsets[row]:offsets[row + 1]]))
+
+        return decode
+
+    @staticmethod
+    def __offsets(values: list[any]) -> list[int]:
+        """
+        Computes the offsets of the items of collections stored one after the other.
+
+        :param values: The collections.
+        :return: The offset of the first item of each collection, followed by the total number of items.
+        """
+        offsets = [0]
+        for value in values:
+            offsets.append(offsets[-1] + len(value))
+        return offsets
+
+    @staticmethod
+    def __pack(type_code: str, values: Iterable[int]) -> bytes:
+        """
+        Packs numbers in an array, padded to a multiple of 8 bytes.
+
+        :param type_code: The type code of the array.
+        :param values: The numbers.
+        :return: The content of the array.
+        """
+        content = array(type_code, values).tobytes()
+        return content + bytes(-len(content) % 8)
+
+    @staticmethod
+    def __pack_bytes(content: bytes) -> bytes:
+        """
+        Packs bytes, preceded by their length and padded to a multiple of 8 bytes.
+
+        :param content: The bytes.
+        :return: The packed bytes.
+        """
+        return array("Q", [len(content)]).tobytes() + content + bytes(-len(content) % 8)
+
+    @staticmethod
+    def __string_column(strings: list[str], indexes: memoryview) -> Callable[[int], str]:
+        """
+        Returns a function decoding the values of a column of strings.
+
+        :param strings: The string table.
+        :param indexes: Indexes of the strings in the string table.
+        :return: A function taking the index of a row and returning its value.
+        """
+        def decode(row: int) -> str:
+            return strings[indexes[row]]
+
+        return decode
@@ -0,0 +1,40 @@
+from collections.abc import KeysView, Mapping
+from typing import Callable, Iterator
+
+
+class SnapshotRecord(Mapping):
+    """
+    Values of an object read from a binary snapshot. The values are decoded from the columns of the snapshot each time
+    they are accessed, so that the objects of a snapshot can be stored without decoding all their values.
+    """
+
+    __slots__ = ("__columns", "__row")
+
+    __columns: dict[str, Callable[[int], any]]
+    __row: int
+
+    def __init__(self, columns: dict[str, Callable[[int], any]], row: int) -> None:
+        """
+        Constructor.
+
+        :param columns: Functions decoding the value of each field from the index of a row.
+        :param row: Index of the row of the object in the snapshot.
+        """
+        self.__columns = columns
+        self.__row = row
+
+    def __getitem__(self, field_name: str) -> any:
+        return self.__columns[field_name](self.__row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__columns)
+
+    def __len__(self) -> int:
+        return len(self.__columns)
+
+    def get(self, field_name: str, default: any = None) -> any:
+        column = self.__columns.get(field_name, None)
+        return column(self.__row) if column is not None else default
+
+    def keys(self) -> KeysView[str]:
+        return self.__columns.keys()
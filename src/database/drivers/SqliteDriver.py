@@ -0,0 +1,391 @@
+import json
+import sqlite3
+from itertools import islice
+from typing import Iterator, Optional, get_origin
+
+from database.Dataclass import Dataclass
+from database.Driver import Driver
+from database.Filter import Filter, Operator
+from database.errors.DuplicateKeyError import DuplicateKeyError
+
+
+class SqliteDriver(Driver):
+    """
+    A driver that saves data in a SQLite database. Each data class is stored in its own table, whose primary key is
+    made of the key fields of the data class. List and dict values are stored as JSON. Indexed fields get a SQL index,
+    or, for list and dict fields, an index table associating each element (or dict key) to the key of the objects
+    containing it.
+
+    Outside transactions, each operation is committed right away. Transactions are mapped to SQL transactions.
+    """
+
+    __connection: sqlite3.Connection
+    __tables: set[type]
+    __statements: dict[tuple, str]
+    __in_transaction: bool
+
+    def __init__(self, path: str = "roster.db") -> None:
+        """
+        Constructor.
+
+        :param path: Path to the database file. Use ':memory:' for a database that is not saved.
+        """
+        super().__init__()
+        self.__connection = sqlite3.connect(path)
+        self.__tables = set()
+        self.__statements = {}
+        self.__in_transaction = False
+
+    def __del__(self):
+        """
+        Destructor.
+        """
+        self.__connection.close()
+
+    def begin(self) -> None:
+        if not self.__connection.in_transaction:
+            self.__connection.execute("BEGIN")
+        self.__in_transaction = True
+
+    def clear_objects(self, data_class: type) -> None:
+        self.__create_table(data_class)
+        for table in self.__index_tables(data_class).values():
+            self.__connection.execute(f"DELETE FROM {table}")
+        self.__connection.execute(f"DELETE FROM {self.__table(data_class)}")
+        self.__commit()
+
+    def commit(self) -> None:
+        self.__in_transaction = False
+        self.__connection.commit()
+
+    def count_objects(self, data_class: type, **kwargs) -> int:
+        self.__create_table(data_class)
+
+        conditions, parameters, remaining_filters = self.__where(data_class, Filter.parse_all(**kwargs))
+        if remaining_filters:
+            return super().count_objects(data_class, **kwargs)
+
+        query = f"SELECT COUNT(*) FROM {self.__table(data_class)}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        return self.__connection.execute(query, parameters).fetchone()[0]
+
+    def create_many(self, data_objects: list[Dataclass]) -> None:
+        keys = set()
+        for data_object in data_objects:
+            key = (data_object.__class__, tuple(data_object.key().values()))
+            if key in keys or self.exists(data_object.__class__, **data_object.key()):
+                raise DuplicateKeyError()
+            keys.add(key)
+
+        for data_object in data_objects:
+            self.__insert_object(data_object)
+        self.__commit()
+
+    def create_object(self, data_object: Dataclass) -> None:
+        self.__insert_object(data_object)
+        self.__commit()
+
+    def delete_many(self, data_objects: list[Dataclass]) -> None:
+        for data_object in data_objects:
+            self.__create_table(data_object.__class__)
+            self.__delete_object(data_object)
+        self.__commit()
+
+    def delete_objects(self, data_class: type, **kwargs) -> None:
+        self.__create_table(data_class)
+        for data_object in self.read_objects(data_class, **kwargs):
+            self.__delete_object(data_object)
+        self.__commit()
+
+    def exists(self, data_class: type, **kwargs):
+        return next(self.iter_objects(data_class, limit=1, **kwargs), None) is not None
+
+    def iter_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> Iterator[Dataclass]:
+        self.__create_table(data_class)
+
+        filters = Filter.parse_all(**kwargs)
+        conditions, parameters, remaining_filters = self.__where(data_class, filters)
+        fields = list(data_class.schema().fields.keys())
+
+        query = f"SELECT {', '.join(map(self.__column, fields))} FROM {self.__table(data_class)}"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        if order_by is not None:
+            descending = order_by.startswith("-")
+            order_field = order_by[1:] if descending else order_by
+            if order_field not in data_class.schema().fields:
+                raise AttributeError(f"'{data_class.__name__}' dataclass has no field '{order_field}'")
+            query += f" ORDER BY {self.__column(order_field)} {'DESC' if descending else 'ASC'}"
+        if limit is not None and not remaining_filters:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        data_objects = (self.__object(data_class, row) for row in self.__connection.execute(query, parameters))
+        if remaining_filters:
+            data_objects = (o for o in data_objects if all(f.matches(o) for f in remaining_filters))
+        return islice(data_objects, limit)
+
+    def read_objects(self, data_class: type, order_by: Optional[str] = None, limit: Optional[int] = None,
+                     **kwargs) -> list[Dataclass]:
+        return list(self.iter_objects(data_class, order_by, limit, **kwargs))
+
+    def rollback(self) -> None:
+        self.__in_transaction = False
+        self.__connection.rollback()
+
+        # Tables created during the transaction no longer exist.
+        self.__tables.clear()
+
+    def update_many(self, data_objects: list[Dataclass]) -> None:
+        for data_object in data_objects:
+            self.__create_table(data_object.__class__)
+            self.__delete_object(data_object)
+            self.__insert_object(data_object)
+        self.__commit()
+
+    def update_object(self, data_object: Dataclass) -> None:
+        self.__create_table(data_object.__class__)
+        self.__delete_object(data_object)
+        self.__insert_object(data_object)
+        self.__commit()
+
+    @staticmethod
+    def __column(field_name: str) -> str:
+        """
+        Returns the quoted name of the column storing a field.
+
+        :param field_name: Name of the field.
+        :return: Name of the column.
+        """
+        return f'"{field_name}"'
+
+    def __commit(self) -> None:
+        """
+        Commits the changes, unless a transaction is in progress.
+        """
+        if not self.__in_transaction:
+            self.__connection.commit()
+
+    def __create_table(self, data_class: type) -> None:
+        """
+        Creates the table and the indexes of a data class if they do not exist.
+
+        :param data_class: The data class.
+        """
+        if data_class in self.__tables:
+            return
+
+        schema = data_class.schema()
+        table = self.__table(data_class)
+        key_columns = ", ".join(map(self.__column, schema.key_fields.keys()))
+
+        columns = [f"{self.__column(name)} {self.__sql_type(schema.types[name])}" for name in schema.fields.keys()]
+        columns.append(f"PRIMARY KEY ({key_columns})")
+        self.__connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+
+        for name in schema.indexed_fields.keys():
+            if self.__is_collection(schema.types[name]):
+                index_table = self.__index_tables(data_class)[name]
+                key_definitions = [f"{self.__column(k)} {self.__sql_type(schema.types[k])}" for k in schema.key_fields]
+                self.__connection.execute(f"CREATE TABLE IF NOT EXISTS {index_table} "
+                                          f"(element, {', '.join(key_definitions)})")
+                self.__connection.execute(f'CREATE INDEX IF NOT EXISTS "{data_class.__name__}_{name}_element" '
+                                          f"ON {index_table} (element)")
+            else:
+                self.__connection.execute(f'CREATE INDEX IF NOT EXISTS "{data_class.__name__}_{name}" '
+                                          f"ON {table} ({self.__column(name)})")
+
+        self.__commit()
+        self.__tables.add(data_class)
+
+    def __delete_object(self, data_object: Dataclass) -> None:
+        """
+        Deletes an object and its index rows. The changes are not committed.
+
+        :param data_object: The object to delete.
+        """
+        data_class = data_object.__class__
+        key = list(data_object.key().values())
+        key_condition = " AND ".join(f"{self.__column(name)} = ?" for name in data_class.schema().key_fields)
+
+        for table in self.__index_tables(data_class).values():
+            statement = self.__statement(("delete", table), lambda: f"DELETE FROM {table} WHERE {key_condition}")
+            self.__connection.execute(statement, key)
+
+        table = self.__table(data_class)
+        statement = self.__statement(("delete", table), lambda: f"DELETE FROM {table} WHERE {key_condition}")
+        self.__connection.execute(statement, key)
+
+    @staticmethod
+    def __elements(value: any) -> list[any]:
+        """
+        Returns the elements of a list value, or the keys of a dict value.
+
+        :param value: The value.
+        :return: A list of elements.
+        """
+        return list(value) if isinstance(value, (list, tuple, set, frozenset, dict)) else []
+
+    def __index_tables(self, data_class: type) -> dict[str, str]:
+        """
+        Returns the names of the index tables of the indexed list and dict fields of a data class.
+
+        :param data_class: The data class.
+        :return: A dictionary associating the names of the fields with the names of the tables.
+        """
+        schema = data_class.schema()
+        return {name: f'"{data_class.__name__}__{name}"' for name in schema.indexed_fields.keys()
+                if self.__is_collection(schema.types[name])}
+
+    def __insert_object(self, data_object: Dataclass) -> None:
+        """
+        Inserts an object and its index rows. The changes are not committed.
+
+        :param data_object: The object to insert.
+        """
+        data_class = data_object.__class__
+        self.__create_table(data_class)
+
+        fields = list(data_class.schema().fields.keys())
+        statement = self.__statement(("insert", self.__table(data_class)), lambda: (
+            f"INSERT INTO {self.__table(data_class)} ({', '.join(map(self.__column, fields))}) "
+            f"VALUES ({', '.join('?' * len(fields))})"))
+
+        self.__connection.execute(statement, self.__row(data_object))
+        self.__insert_index_rows(data_object)
+
+    def __insert_index_rows(self, data_object: Dataclass) -> None:
+        """
+        Adds the rows of an object to the index tables. The changes are not committed.
+
+        :param data_object: The object.
+        """
+        data_class = data_object.__class__
+        key = list(data_object.key().values())
+        key_columns = ", ".join(map(self.__column, data_class.schema().key_fields.keys()))
+
+        for name, table in self.__index_tables(data_class).items():
+            rows = [[element] + key for element in self.__elements(data_object.get(name))]
+            statement = self.__statement(("insert", table), lambda: f"INSERT INTO {table} (element, {key_columns}) "
+                                                                    f"VALUES ({', '.join('?' * (len(key) + 1))})")
+            self.__connection.executemany(statement, rows)
+
+    @staticmethod
+    def __is_collection(field_type: any) -> bool:
+        """
+        Checks if a field type is stored as JSON.
+
+        :param field_type: Annotated type of the field.
+        :return: True if values of this type are stored as JSON, false otherwise.
+        """
+        return get_origin(field_type) in (list, tuple, set, dict) or field_type in (list, tuple, set, dict)
+
+    def __object(self, data_class: type, row: tuple) -> Dataclass:
+        """
+        Creates an object from a row of its table.
+
+        :param data_class: Class of the object.
+        :param row: The row.
+        :return: The object.
+        """
+        schema = data_class.schema()
+        values = {}
+        for name, value in zip(schema.fields.keys(), row):
+            values[name] = json.loads(value) if value is not None and self.__is_collection(schema.types[name]) \
+                else value
+        return data_class(**values)
+
+    def __row(self, data_object: Dataclass) -> list[any]:
+        """
+        Converts an object to a row of its table.
+
+        :param data_object: The object.
+        :return: The values of the columns.
+        """
+        schema = data_object.__class__.schema()
+        row = []
+        for name in schema.fields.keys():
+            value = data_object.get(name)
+            row.append(json.dumps(value) if value is not None and self.__is_collection(schema.types[name]) else value)
+        return row
+
+    @staticmethod
+    def __sql_type(field_type: any) -> str:
+        """
+        Returns the SQL type of the column storing a field.
+
+        :param field_type: Annotated type of the field.
+        :return: A SQL type.
+        """
+        if field_type is int or field_type is bool:
+            return "INTEGER"
+        if field_type is float:
+            return "REAL"
+        return "TEXT"
+
+    def __statement(self, statement_id: tuple, build: callable) -> str:
+        """
+        Returns a SQL statement, building it the first time it is needed. The sqlite3 module keeps the compiled version
+        of the recently used statements, so reusing the exact same SQL text avoids preparing it again.
+
+        :param statement_id: Identifier of the statement.
+        :param build: Function building the SQL text.
+        :return: The SQL text.
+        """
+        if statement_id not in self.__statements:
+            self.__statements[statement_id] = build()
+        return self.__statements[statement_id]
+
+    @staticmethod
+    def __table(data_class: type) -> str:
+        """
+        Returns the quoted name of the table of a data class.
+
+        :param data_class: The data class.
+        :return: The name of the table.
+        """
+        return f'"{data_class.__name__}"'
+
+    def __where(self, data_class: type, filters: list[Filter]) -> tuple[list[str], list[any], list[Filter]]:
+        """
+        Converts filters into SQL conditions.
+
+        :param data_class: Class of the objects.
+        :param filters: The filters.
+        :return: The SQL conditions, their parameters, and the filters that cannot be expressed in SQL and must be
+         checked on the objects.
+        """
+        schema = data_class.schema()
+        index_tables = self.__index_tables(data_class)
+        operators = {Operator.LT: "<", Operator.LE: "<=", Operator.GT: ">", Operator.GE: ">="}
+
+        conditions, parameters, remaining_filters = [], [], []
+        for current_filter in filters:
+            field, operator, value = current_filter.field, current_filter.operator, current_filter.value
+            if field not in schema.fields:
+                raise AttributeError(f"'{data_class.__name__}' dataclass has no field '{field}'")
+
+            column = self.__column(field)
+            is_collection = self.__is_collection(schema.types[field])
+
+            if operator == Operator.EQ and not is_collection:
+                conditions.append(f"{column} IS ?")
+                parameters.append(value)
+            elif operator in operators and not is_collection:
+                conditions.append(f"{column} {operators[operator]} ?")
+                parameters.append(value)
+            elif operator in (Operator.CONTAINS, Operator.HAS_KEY) and field in index_tables:
+                key_match = " AND ".join(f"i.{self.__column(k)} = {self.__table(data_class)}.{self.__column(k)}"
+                                         for k in schema.key_fields.keys())
+                conditions.append(f"EXISTS (SELECT 1 FROM {index_tables[field]} i WHERE i.element = ? AND {key_match})")
+                parameters.append(value)
+
+                # Index tables do not distinguish list elements from dict keys.
+                if operator == Operator.HAS_KEY and dict not in (schema.types[field], get_origin(schema.types[field])):
+                    remaining_filters.append(current_filter)
+            else:
+                remaining_filters.append(current_filter)
+
+        return conditions, parameters, remaining_filters
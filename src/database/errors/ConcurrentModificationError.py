@@ -0,0 +1,15 @@
+class ConcurrentModificationError(Exception):
+    """
+    Exception thrown when objects cannot be saved because another process modified the same objects since they were
+    read.
+    """
+
+    def __init__(self, data_class: type, keys: list[tuple]):
+        """
+        Constructor.
+
+        :param data_class: The class of the objects.
+        :param keys: The keys of the objects modified by both processes.
+        """
+        super().__init__(f"{len(keys)} '{data_class.__name__}' object(s) were modified by another process: "
+                         f"{', '.join(str(k) for k in keys[:5])}{', ...' if len(keys) > 5 else ''}.")
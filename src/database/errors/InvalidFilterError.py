@@ -0,0 +1,12 @@
+class InvalidFilterError(Exception):
+    """
+    Exception indicating that a search value uses an unknown operator (e.g. 'roles__unknown').
+    """
+
+    def __init__(self, name: str):
+        """
+        Constructor.
+
+        :param name: Name of the invalid search value.
+        """
+        super().__init__(f"The search value '{name}' uses an unknown operator.")
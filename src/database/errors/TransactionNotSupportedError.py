@@ -0,0 +1,12 @@
+class TransactionNotSupportedError(Exception):
+    """
+    Exception thrown when a transaction is started with a driver that cannot roll back changes.
+    """
+
+    def __init__(self, driver_class: type):
+        """
+        Constructor.
+
+        :param driver_class: The class of the driver.
+        """
+        super().__init__(f"'{driver_class.__name__}' does not support transactions.")
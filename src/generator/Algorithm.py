@@ -1,20 +1,34 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from database.Database import Database
+from database.dataclass.Absence import Absence
+from database.dataclass.Pattern import Pattern
 from database.dataclass.Person import Person
 from database.dataclass.Roster import Roster
 from generator import Generator
+from generator.ScoreMatrix import ScoreMatrix
+from generator.errors.NotEnoughResourcesError import NotEnoughResourcesError
 
 
 class Algorithm(ABC):
     """
     Roster generation algorithm.
+
+    The assignment scores are memoized, as they only depend on the rosters preceding the generated roster. The memo
+    must be cleared before each generation.
     """
 
     __generator: Generator
+    __scores: dict[tuple[int, str, str], float]
+    __score_cache_hits: int
+    __score_cache_misses: int
 
     def __init__(self, generator: Generator) -> None:
         self.__generator = generator
+        self.__scores = {}
+        self.__score_cache_hits = 0
+        self.__score_cache_misses = 0
 
     @property
     def database(self) -> Database:
@@ -23,6 +37,20 @@ class Algorithm(ABC):
         """
         return self.__generator.database
 
+    @property
+    def score_cache_hits(self) -> int:
+        """
+        Number of assignment scores read from the memo since it was last cleared.
+        """
+        return self.__score_cache_hits
+
+    @property
+    def score_cache_misses(self) -> int:
+        """
+        Number of assignment scores computed by the evaluators since the memo was last cleared.
+        """
+        return self.__score_cache_misses
+
     def assignment_score(self, roster_sequence_no: int, person: Person, role: str) -> float:
         """
         Evaluates an assignment in a roster.
@@ -32,6 +60,13 @@ class Algorithm(ABC):
         :param role: The role of the person.
         :return: A score. The higher the score, the better the assignment.
         """
+        key = (roster_sequence_no, person.identifier, role)
+        score = self.__scores.get(key, None)
+        if score is not None:
+            self.__score_cache_hits += 1
+            return score
+
+        self.__score_cache_misses += 1
         total_weight = 0
         score = 0.0
 
@@ -40,7 +75,18 @@ class Algorithm(ABC):
             score += (evaluator.assignment_score(roster_sequence_no, person, role) * weight)
             total_weight += weight
 
-        return score / total_weight
+        score /= total_weight
+        self.__scores[key] = score
+        return score
+
+    def clear_score_cache(self) -> None:
+        """
+        Clears the memoized assignment scores and resets the hit and miss counters. Must be called when the rosters,
+        the evaluators or their weights may have changed.
+        """
+        self.__scores = {}
+        self.__score_cache_hits = 0
+        self.__score_cache_misses = 0
 
     @abstractmethod
     def generate_roster(self, roster_sequence_no: int) -> Roster:
@@ -68,3 +114,107 @@ class Algorithm(ABC):
             score += self.assignment_score(roster.sequence_no, person, role)
 
         return score / len(roster.persons)
+
+    def score_matrix(self, roster_sequence_no: int, persons: list[Person], roles: list[str]) -> ScoreMatrix:
+        """
+        Evaluates the assignments of several persons to several roles in a roster. The scores are read from the memo
+        when possible. The other ones are computed from the score matrices of the evaluators, combined with their
+        weights so that each score is the one given by assignment_score(), and added to the memo.
+
+        :param roster_sequence_no: The sequence number of the roster.
+        :param persons: The persons.
+        :param roles: The roles.
+        :return: The scores.
+        """
+        scores = [[self.__scores.get((roster_sequence_no, person.identifier, role), None) for role in roles]
+                  for person in persons]
+        missing_persons = [person for person, row in zip(persons, scores) if None in row]
+        self.__score_cache_hits += sum(score is not None for row in scores for score in row)
+
+        if len(missing_persons) > 0:
+            missing_scores = self.__evaluate_score_matrix(roster_sequence_no, missing_persons, roles)
+
+            for person, row in zip(missing_persons, missing_scores):
+                for role, score in zip(roles, row):
+                    key = (roster_sequence_no, person.identifier, role)
+                    if key not in self.__scores:
+                        self.__score_cache_misses += 1
+                        self.__scores[key] = score
+
+            scores = [[self.__scores[(roster_sequence_no, person.identifier, role)] for role in roles]
+                      for person in persons]
+
+        return ScoreMatrix(persons, roles, scores)
+
+    def __evaluate_score_matrix(self, roster_sequence_no: int, persons: list[Person],
+                                roles: list[str]) -> list[list[float]]:
+        """
+        Combines the score matrices of the evaluators with their weights, without using the memo.
+
+        :param roster_sequence_no: The sequence number of the roster.
+        :param persons: The persons.
+        :param roles: The roles.
+        :return: The scores, with one row per person and one column per role.
+        """
+        total_weight = 0
+        scores = [[0.0] * len(roles) for _ in persons]
+
+        for name, evaluator in self.__generator.evaluators.items():
+            weight = int(self.__generator.configuration.get("weight_" + name, 1))
+            evaluator_scores = evaluator.score_matrix(roster_sequence_no, persons, roles)
+            scores = [[score + evaluator_score * weight for score, evaluator_score in zip(row, evaluator_row)]
+                      for row, evaluator_row in zip(scores, evaluator_scores)]
+            total_weight += weight
+
+        return [[score / total_weight for score in row] for row in scores]
+
+    @staticmethod
+    def _generate_best_roster(patterns: list[Pattern], scores: ScoreMatrix,
+                              generate_roster_with_pattern: Callable[[Pattern], Roster]) -> Roster:
+        """
+        Generates a roster with each pattern and returns the best one.
+
+        :param patterns: The patterns.
+        :param scores: Scores of the assignments, used to compare the rosters.
+        :param generate_roster_with_pattern: Function generating a roster with a pattern. It raises
+         NotEnoughResourcesError if the pattern cannot be used, in which case the pattern is skipped.
+        :return: The roster with the best score. The first one if several rosters have the same score.
+        """
+        best_score, best_roster = None, None
+
+        for pattern in patterns:
+            try:
+                roster = generate_roster_with_pattern(pattern)
+                score = scores.roster_score(roster)
+
+                if best_score is None or score > best_score:
+                    best_score, best_roster = score, roster
+            except NotEnoughResourcesError:
+                continue
+
+        if best_roster is None:
+            raise NotEnoughResourcesError()
+
+        return best_roster
+
+    def _get_available_persons(self, roster_sequence_no: int) -> list[Person]:
+        """
+        Gets the list of all persons that are available for a roster.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        :return: A list of persons.
+        """
+        absences = self.database.get(Absence, roster_sequence_no=roster_sequence_no)
+        absent_person_ids = {absence.person_identifier for absence in absences}
+
+        return [person for person in self.database.get(Person) if person.identifier not in absent_person_ids]
+
+    @staticmethod
+    def _get_pattern_roles(patterns: list[Pattern]) -> list[str]:
+        """
+        Lists the roles of several patterns.
+
+        :param patterns: The patterns.
+        :return: The roles, without duplicates, in the order of the patterns.
+        """
+        return list(dict.fromkeys(role for pattern in patterns for role in pattern.roles))
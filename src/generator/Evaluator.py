@@ -20,3 +20,15 @@ class Evaluator(ABC):
          that it is strongly recommended.
         """
         pass
+
+    def score_matrix(self, roster_sequence_no: int, persons: list[Person], roles: list[str]) -> list[list[float]]:
+        """
+        Evaluates the assignments of several persons to several roles in a roster. Each score is the one given by
+        assignment_score(). Evaluators can override this method to compute the scores in a single pass.
+
+        :param roster_sequence_no: The sequence number of the roster.
+        :param persons: The persons.
+        :param roles: The roles.
+        :return: The scores, with one row per person and one column per role.
+        """
+        return [[self.assignment_score(roster_sequence_no, person, role) for role in roles] for person in persons]
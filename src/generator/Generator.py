@@ -4,6 +4,8 @@ from configuration.Configuration import Configuration
 from database.Database import Database
 from database.dataclass.Roster import Roster
 from generator.Evaluator import Evaluator
+from generator.HistoryIndex import HistoryIndex
+from generator.algorithms.OptimalAlgorithm import OptimalAlgorithm
 from generator.algorithms.SimpleAlgorithm import SimpleAlgorithm
 from generator.algorithms.TreeAlgorithm import TreeAlgorithm
 from generator.errors.UnknownAlgorithmError import UnknownAlgorithmError
@@ -18,6 +20,7 @@ class Generator:
 
     __database: Database
     __config: Configuration
+    __history_index: HistoryIndex
 
     def __init__(self, database: Database, config: Configuration) -> None:
         """
@@ -27,13 +30,15 @@ class Generator:
         """
         self.__database = database
         self.__config = config
+        self.__history_index = HistoryIndex(database)
 
         self._evaluators = {
-            "alternate_roles": AlternateRolesEvaluator(database),
-            "maximize_rest_time": MaximizeRestTimeEvaluator(database)
+            "alternate_roles": AlternateRolesEvaluator(self.__history_index),
+            "maximize_rest_time": MaximizeRestTimeEvaluator(self.__history_index)
         }
 
         self._algorithms = {
+            "optimal": OptimalAlgorithm(self),
             "simple": SimpleAlgorithm(self),
             "tree_fast": TreeAlgorithm(self, quality="low"),
             "tree_medium": TreeAlgorithm(self, quality="medium"),
@@ -74,4 +79,9 @@ class Generator:
         if algorithm_name not in self._algorithms:
             raise UnknownAlgorithmError()
 
-        return self._algorithms[algorithm_name].generate_roster(sequence_no)
+        # The past assignments are indexed and scored once per generation, as the rosters may have changed since the
+        # last one.
+        algorithm = self._algorithms[algorithm_name]
+        self.__history_index.clear()
+        algorithm.clear_score_cache()
+        return algorithm.generate_roster(sequence_no)
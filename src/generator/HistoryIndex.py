@@ -0,0 +1,100 @@
+from typing import Optional
+
+from database.Database import Database
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+
+
+class HistoryIndex:
+    """
+    Index of the assignments made in the rosters preceding a roster. For each person, and for each role of each person,
+    the index gives in constant time the last roster in which the person was assigned, and the rank of this roster: 0
+    for the roster right before, 1 for the one before, etc.
+
+    The index is built the first time it is queried for a roster, and kept until it is queried for another roster or
+    cleared. Rosters modified in the meantime are not taken into account.
+    """
+
+    __database: Database
+    __roster_sequence_no: Optional[int]
+    __last_assignments: dict[str, tuple[int, int]]
+    __last_roles: dict[tuple[str, str], tuple[int, int]]
+
+    def __init__(self, database: Database) -> None:
+        """
+        Constructor.
+
+        :param database: The database.
+        """
+        self.__database = database
+        self.__roster_sequence_no = None
+        self.__last_assignments = {}
+        self.__last_roles = {}
+
+    def clear(self) -> None:
+        """
+        Clears the index, so that it is built again from the rosters of the database when it is next queried.
+        """
+        self.__roster_sequence_no = None
+        self.__last_assignments = {}
+        self.__last_roles = {}
+
+    def last_sequence_no(self, roster_sequence_no: int, person: Person, role: Optional[str] = None) -> Optional[int]:
+        """
+        Returns the sequence number of the last roster preceding a roster in which a person was assigned.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        :param person: The person.
+        :param role: The role. If not given, does not consider the role assigned to the person.
+        :return: The sequence number, or None if the person was never assigned.
+        """
+        last_assignment = self.__last_assignment(roster_sequence_no, person, role)
+        return last_assignment[0] if last_assignment is not None else None
+
+    def rank(self, roster_sequence_no: int, person: Person, role: Optional[str] = None) -> Optional[int]:
+        """
+        Returns the rank of the last roster preceding a roster in which a person was assigned.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        :param person: The person.
+        :param role: The role. If not given, does not consider the role assigned to the person.
+        :return: 0 if the person was assigned in the roster right before, 1 in the one before, etc. None if the person
+         was never assigned.
+        """
+        last_assignment = self.__last_assignment(roster_sequence_no, person, role)
+        return last_assignment[1] if last_assignment is not None else None
+
+    def __build(self, roster_sequence_no: int) -> None:
+        """
+        Builds the index from the rosters preceding a roster. The rosters are read once, from the most recent one.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        """
+        self.clear()
+        sorted_rosters = self.__database.iter(Roster, sequence_no__lt=roster_sequence_no, order_by="-sequence_no")
+
+        for i, roster in enumerate(sorted_rosters):
+            for person_id, role in roster.assignments.items():
+                if role is None:
+                    continue
+                self.__last_assignments.setdefault(person_id, (roster.sequence_no, i))
+                self.__last_roles.setdefault((person_id, role), (roster.sequence_no, i))
+
+        self.__roster_sequence_no = roster_sequence_no
+
+    def __last_assignment(self, roster_sequence_no: int, person: Person,
+                          role: Optional[str]) -> Optional[tuple[int, int]]:
+        """
+        Returns the last roster preceding a roster in which a person was assigned. Builds the index if needed.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        :param person: The person.
+        :param role: The role. If not given, does not consider the role assigned to the person.
+        :return: The sequence number and the rank of the roster, or None if the person was never assigned.
+        """
+        if roster_sequence_no != self.__roster_sequence_no:
+            self.__build(roster_sequence_no)
+
+        if role is None:
+            return self.__last_assignments.get(person.identifier, None)
+        return self.__last_roles.get((person.identifier, role), None)
@@ -0,0 +1,52 @@
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+
+
+class ScoreMatrix:
+    """
+    Scores of the assignments of several persons to several roles in a roster, as combined from the scores of the
+    evaluators. The scores are kept in a list of lists, with one row per person and one column per role, so that
+    looking up a score only costs two dictionary lookups.
+    """
+
+    __rows: dict[str, int]
+    __columns: dict[str, int]
+    __scores: list[list[float]]
+
+    def __init__(self, persons: list[Person], roles: list[str], scores: list[list[float]]) -> None:
+        """
+        Constructor.
+
+        :param persons: The persons, in the order of the rows.
+        :param roles: The roles, in the order of the columns.
+        :param scores: The scores, with one row per person and one column per role.
+        """
+        self.__rows = {person.identifier: i for i, person in enumerate(persons)}
+        self.__columns = {role: j for j, role in enumerate(roles)}
+        self.__scores = scores
+
+    def assignment_score(self, person: Person, role: str) -> float:
+        """
+        Returns the score of an assignment.
+
+        :param person: The person. Must be one of the persons of the matrix.
+        :param role: The role. Must be one of the roles of the matrix.
+        :return: The score.
+        """
+        return self.__scores[self.__rows[person.identifier]][self.__columns[role]]
+
+    def roster_score(self, roster: Roster) -> float:
+        """
+        Evaluates the quality of a roster, as Algorithm.roster_score() does.
+
+        :param roster: The roster. The assigned persons and their roles must be in the matrix.
+        :return: A score. The higher the score, the better the assignment.
+        """
+        if len(roster.persons) == 0:
+            return 0.0
+
+        score = 0.0
+        for person_id, role in roster.assignments.items():
+            score += self.__scores[self.__rows[person_id]][self.__columns[role]]
+
+        return score / len(roster.persons)
@@ -0,0 +1,115 @@
+import math
+
+from database.dataclass.Pattern import Pattern
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from generator.Algorithm import Algorithm
+from generator.ScoreMatrix import ScoreMatrix
+from generator.errors.NotEnoughResourcesError import NotEnoughResourcesError
+
+
+class OptimalAlgorithm(Algorithm):
+    """
+    Optimal algorithm. For each pattern, the roles are expanded into one slot per required person, and the persons are
+    assigned to the slots with the Hungarian algorithm, which maximizes the sum of the assignment scores. The solution
+    is optimal, like the one of the tree algorithm in high quality, but is found in O(n² × m) time for n slots and m
+    persons.
+    """
+
+    def generate_roster(self, roster_sequence_no: int) -> Roster:
+        persons = self._get_available_persons(roster_sequence_no)
+        patterns = self.database.get(Pattern)
+        scores = self.score_matrix(roster_sequence_no, persons, self._get_pattern_roles(patterns))
+
+        return self._generate_best_roster(patterns, scores, lambda pattern: self.__generate_roster_with_pattern(
+            roster_sequence_no, pattern, persons, scores))
+
+    def __generate_roster_with_pattern(self, sequence_no: int, pattern: Pattern, available_persons: list[Person],
+                                       scores: ScoreMatrix) -> Roster:
+        """
+        Generates the best roster with the given pattern.
+
+        :param sequence_no: Sequence number of the roster.
+        :param pattern: Pattern to use.
+        :param available_persons: Persons available for the roster.
+        :param scores: Scores of the assignments of the available persons.
+        :return: A roster.
+        """
+        slots = [role for role in pattern.roles for _ in range(pattern.assignments[role])]
+        persons = [p for p in available_persons if any(p.has_role(role) for role in pattern.roles)]
+
+        if len(slots) > len(persons):
+            raise NotEnoughResourcesError()
+
+        costs = [[-scores.assignment_score(person, role) if person.has_role(role) else math.inf for person in persons]
+                 for role in slots]
+        columns = self.__solve_assignment_problem(costs)
+
+        assignments = {persons[column].identifier: role for role, column in zip(slots, columns)}
+        return Roster(sequence_no=sequence_no, assignments=assignments)
+
+    @staticmethod
+    def __solve_assignment_problem(costs: list[list[float]]) -> list[int]:
+        """
+        Assigns each row of a cost matrix to a distinct column, so that the sum of the costs is minimal. The rows are
+        added one by one, each time along the shortest augmenting path given by the potentials of the rows and the
+        columns (Hungarian algorithm).
+
+        :param costs: The cost matrix, with at most as many rows as columns. An infinite cost forbids an assignment.
+        :return: The column assigned to each row.
+        """
+        n, m = len(costs), len(costs[0]) if len(costs) > 0 else 0
+
+        # Index 0 is a virtual column, from which the path of the added row starts. Rows and columns are numbered
+        # from 1.
+        row_potentials = [0.0] * (n + 1)
+        column_potentials = [0.0] * (m + 1)
+        column_rows = [0] * (m + 1)
+        previous_columns = [0] * (m + 1)
+
+        for row in range(1, n + 1):
+            column_rows[0] = row
+            column = 0
+            min_reduced_costs = [math.inf] * (m + 1)
+            visited = [False] * (m + 1)
+
+            while column_rows[column] != 0:
+                visited[column] = True
+                current_row = column_rows[column]
+                row_costs = costs[current_row - 1]
+                delta, next_column = math.inf, 0
+
+                for j in range(1, m + 1):
+                    if visited[j]:
+                        continue
+                    reduced_cost = row_costs[j - 1] - row_potentials[current_row] - column_potentials[j]
+                    if reduced_cost < min_reduced_costs[j]:
+                        min_reduced_costs[j], previous_columns[j] = reduced_cost, column
+                    if min_reduced_costs[j] < delta:
+                        delta, next_column = min_reduced_costs[j], j
+
+                if delta == math.inf:
+                    # The remaining rows cannot be assigned to the free columns.
+                    raise NotEnoughResourcesError()
+
+                for j in range(m + 1):
+                    if visited[j]:
+                        row_potentials[column_rows[j]] += delta
+                        column_potentials[j] -= delta
+                    else:
+                        min_reduced_costs[j] -= delta
+
+                column = next_column
+
+            # Assigns the columns along the augmenting path.
+            while column != 0:
+                previous_column = previous_columns[column]
+                column_rows[column] = column_rows[previous_column]
+                column = previous_column
+
+        columns = [0] * n
+        for j in range(1, m + 1):
+            if column_rows[j] != 0:
+                columns[column_rows[j] - 1] = j - 1
+
+        return columns
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from typing import Optional
 
-from database.dataclass.Absence import Absence
 from database.dataclass.Pattern import Pattern
 from database.dataclass.Person import Person
 from database.dataclass.Roster import Roster
 from generator import Generator
 from generator.Algorithm import Algorithm
+from generator.ScoreMatrix import ScoreMatrix
 from generator.errors.InvalidParameterError import InvalidParameterError
 from generator.errors.NotEnoughResourcesError import NotEnoughResourcesError
 
@@ -18,85 +18,173 @@ class TreeAlgorithm(Algorithm):
     """
 
     __quality: str
+    __visited_nodes: int
+    __pruned_nodes: int
 
     def __init__(self, generator: Generator, quality: str) -> None:
         """
         Constructor.
 
         :param generator: Generator associated to this algorithm.
-        :param quality: Quality of the solution. Can either be "high", "medium" or "low". In high quality, all sequences
-         of assignments are explored, which is very slow in general. However, the obtained solution is optimal. In
-         medium, only the best branches are explored. If at a given step multiple branches seem to have the same
-         optimality, all of them are explored. The obtained solution is optimal. In low quality, only the best sequences
-         are explored. If multiple branches seem to have the same optimality, only one is chosen arbitrarily and
-         explored. The solution might not be optimal, but it is relatively fast.
+        :param quality: Quality of the solution. Can either be "high", "medium" or "low". In high quality, the tree is
+         explored with branch and bound: the branches are explored depth first, from the best assignment, and a branch
+         is pruned when even the best remaining assignments cannot give a better roster than the best one found so far.
+         This is slow in general, but the obtained solution is optimal. In medium, only the best branches are explored.
+         If at a given step multiple branches seem to have the same optimality, all of them are explored. The obtained
+         solution is optimal. In low quality, only the best sequences are explored. If multiple branches seem to have
+         the same optimality, only one is chosen arbitrarily and explored. The solution might not be optimal, but it is
+         relatively fast.
         """
         super().__init__(generator)
         self.__quality = quality
+        self.__visited_nodes = 0
+        self.__pruned_nodes = 0
 
         if quality != "high" and quality != "medium" and quality != "low":
             raise InvalidParameterError()
 
+    @property
+    def pruned_nodes(self) -> int:
+        """
+        Number of nodes pruned during the last generation. Nodes are only pruned in high quality.
+        """
+        return self.__pruned_nodes
+
+    @property
+    def visited_nodes(self) -> int:
+        """
+        Number of nodes visited during the last generation.
+        """
+        return self.__visited_nodes
+
     def generate_roster(self, roster_sequence_no: int) -> Roster:
-        persons = self.__get_available_persons(roster_sequence_no)
+        persons = self._get_available_persons(roster_sequence_no)
+        patterns = self.database.get(Pattern)
+        scores = self.score_matrix(roster_sequence_no, persons, self._get_pattern_roles(patterns))
+        self.__visited_nodes, self.__pruned_nodes = 0, 0
+
+        if self.__quality == "high":
+            return self.__generate_optimal_roster(roster_sequence_no, patterns, persons, scores)
+
         rosters = []
 
-        for pattern in self.database.get(Pattern):
+        for pattern in patterns:
             try:
                 root = _AssignmentNode.get_root_node(roster_sequence_no, pattern, persons)
 
                 node_queue = [root]
                 while len(node_queue) > 0:
                     node = node_queue.pop(0)
+                    self.__visited_nodes += 1
 
                     if node.is_leaf:
                         rosters.append(node.build_roster())
                         continue
 
-                    node_queue += self.__select_best_nodes(node.children)
+                    node_queue += self.__select_best_nodes(node.children, scores)
             except NotEnoughResourcesError:
                 continue
 
         if len(rosters) == 0:
             raise NotEnoughResourcesError()
 
-        return max(rosters, key=self.roster_score)
+        return max(rosters, key=scores.roster_score)
 
-    def __get_available_persons(self, roster_sequence_no) -> list[Person]:
+    def __generate_optimal_roster(self, roster_sequence_no: int, patterns: list[Pattern], persons: list[Person],
+                                  scores: ScoreMatrix) -> Roster:
         """
-        Gets the list of all persons that are available for a roster.
+        Generates the best roster by branch and bound. The slots of the pattern are filled in order, so that each roster
+        is only reached once, and the persons assigned to consecutive slots with the same role are in the order of the
+        list of persons.
 
         :param roster_sequence_no: Sequence number of the roster.
-        :return: A list of persons.
+        :param patterns: The patterns.
+        :param persons: Persons available for the roster.
+        :param scores: Scores of the assignments of the available persons.
+        :return: The best roster.
+        """
+        person_indices = {person.identifier: i for i, person in enumerate(persons)}
+        best_score, best_roster = None, None
+
+        # Persons able to do each role, from the best to the worst assignment.
+        candidates = {}
+        for role in self._get_pattern_roles(patterns):
+            role_persons = [person for person in persons if person.has_role(role)]
+            candidates[role] = sorted(((scores.assignment_score(p, role), p) for p in role_persons),
+                                      key=lambda candidate: candidate[0], reverse=True)
+
+        for pattern in patterns:
+            root = _AssignmentNode.get_root_node(roster_sequence_no, pattern, persons)
+            slot_count = len(root.remaining_roles)
+            node_stack = [(root, 0.0)]
+
+            while len(node_stack) > 0:
+                node, score = node_stack.pop()
+                bound = self.__optimistic_score(node, candidates)
+
+                if bound is None or (best_score is not None and
+                                     (score + bound) / max(slot_count, 1) <= best_score):
+                    self.__pruned_nodes += 1
+                    continue
+                self.__visited_nodes += 1
+
+                if len(node.remaining_roles) == 0:
+                    roster = node.build_roster()
+                    roster_score = scores.roster_score(roster)
+                    if best_score is None or roster_score > best_score:
+                        best_score, best_roster = roster_score, roster
+                    continue
+
+                role = node.remaining_roles[0]
+                children = node.get_children(role)
+                if node.role == role:
+                    children = [c for c in children
+                                if person_indices[c.person.identifier] > person_indices[node.person.identifier]]
+
+                # The best child is pushed last, to be explored first.
+                children_scores = [(scores.assignment_score(child.person, role), child) for child in children]
+                children_scores.sort(key=lambda child_score: child_score[0])
+                node_stack += [(child, score + child_score) for child_score, child in children_scores]
+
+        if best_roster is None:
+            raise NotEnoughResourcesError()
+
+        return best_roster
+
+    @staticmethod
+    def __optimistic_score(node: _AssignmentNode, candidates: dict[str, list[tuple[float, Person]]]) -> Optional[float]:
+        """
+        Computes an upper bound of the sum of the scores of the assignments remaining to be made from a node: each
+        remaining slot is given the best score among the persons not assigned yet, as if a person could fill several
+        slots.
+
+        :param node: The node.
+        :param candidates: Scores and persons able to do each role, from the best to the worst score.
+        :return: The upper bound, or None if a remaining slot cannot be filled.
         """
-        available_persons = []
-        absences = self.database.get(Absence, roster_sequence_no=roster_sequence_no)
+        assigned_person_ids = {person.identifier for person in node.get_assigned_persons() if person is not None}
+        score = 0.0
 
-        for person in self.database.get(Person):
-            is_available = True
-            for absence in absences:
-                if absence.person_identifier == person.identifier:
-                    is_available = False
-                    break
-            if is_available:
-                available_persons.append(person)
+        for role in node.remaining_roles:
+            best_score = next((s for s, p in candidates[role] if p.identifier not in assigned_person_ids), None)
+            if best_score is None:
+                return None
+            score += best_score
 
-        return available_persons
+        return score
 
-    def __select_best_nodes(self, nodes: list[_AssignmentNode]) -> list[_AssignmentNode]:
+    def __select_best_nodes(self, nodes: list[_AssignmentNode], scores: ScoreMatrix) -> list[_AssignmentNode]:
         """
         Selects the most optimal nodes from a list of nodes.
 
         :param nodes: List of nodes.
+        :param scores: Scores of the assignments.
         :return: List of best nodes. All nodes in the list are equally optimal.
         """
-        if self.__quality == "high":
-            return nodes
-
         max_score, best_nodes = None, []
 
         for node in nodes:
-            score = self.__evaluate_node(node)
+            score = self.__evaluate_node(node, scores)
             if max_score is None or score > max_score:
                 max_score, best_nodes = score, []
             if score == max_score:
@@ -107,14 +195,16 @@ class TreeAlgorithm(Algorithm):
 
         return best_nodes
 
-    def __evaluate_node(self, node: _AssignmentNode) -> float:
+    @staticmethod
+    def __evaluate_node(node: _AssignmentNode, scores: ScoreMatrix) -> float:
         """
         Computes a score indicating the optimality of a node. This function is used to compare nodes by optimality.
 
         :param node: The node.
+        :param scores: Scores of the assignments.
         :return: A score between 0 and 1. 1 is best, 0 is worst.
         """
-        return self.assignment_score(node.roster_sequence_no, node.person, node.role)
+        return scores.assignment_score(node.person, node.role)
 
 
 class _AssignmentNode:
@@ -178,12 +268,11 @@ class _AssignmentNode:
         child_nodes = []
 
         for role in self.__remaining_roles:
-            persons_with_role = list(filter(lambda p: p.has_role(role), self.__remaining_persons))
-            if len(persons_with_role) == 0:
+            role_child_nodes = self.get_children(role)
+            if len(role_child_nodes) == 0:
                 raise NotEnoughResourcesError()
 
-            for person in persons_with_role:
-                child_nodes.append(self.__init_child(person, role))
+            child_nodes += role_child_nodes
 
         self.__children = child_nodes
         return child_nodes
@@ -202,6 +291,13 @@ class _AssignmentNode:
         """
         return self.__person
 
+    @property
+    def remaining_roles(self) -> list[str]:
+        """
+        Roles remaining to be assigned, with one item per slot.
+        """
+        return self.__remaining_roles
+
     @property
     def role(self) -> Optional[str]:
         """
@@ -224,17 +320,18 @@ class _AssignmentNode:
         """
         assignments = {}
         for role in self.__pattern.roles:
-            for person in self.__get_assigned_persons(role):
+            for person in self.get_assigned_persons(role):
                 assignments[person.identifier] = role
 
         roster = Roster(sequence_no=self.__roster_sequence_no, assignments=assignments)
         return roster
 
-    def __get_assigned_persons(self, role: str = None) -> list[Person]:
+    def get_assigned_persons(self, role: str = None) -> list[Person]:
         """
         Returns the list of persons assigned so far by this node and its ancestors.
 
-        :param role: If given, only returns the persons assigned to this role.
+        :param role: If given, only returns the persons assigned to this role. Otherwise, the list also contains None
+         for the root node.
         :return: List of persons.
         """
         persons = []
@@ -251,6 +348,15 @@ class _AssignmentNode:
 
         return persons
 
+    def get_children(self, role: str) -> list[_AssignmentNode]:
+        """
+        Creates the child nodes assigning a role to each of the remaining persons having this role.
+
+        :param role: The role. Must be one of the remaining roles.
+        :return: The child nodes.
+        """
+        return [self.__init_child(person, role) for person in self.__remaining_persons if person.has_role(role)]
+
     def __init_child(self, person: Person, role: str) -> _AssignmentNode:
         """
         Initializes a child node.
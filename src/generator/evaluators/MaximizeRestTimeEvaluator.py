@@ -1,7 +1,6 @@
-from database.Database import Database
 from database.dataclass.Person import Person
-from database.dataclass.Roster import Roster
 from generator.Evaluator import Evaluator
+from generator.HistoryIndex import HistoryIndex
 
 
 class MaximizeRestTimeEvaluator(Evaluator):
@@ -9,23 +8,16 @@ class MaximizeRestTimeEvaluator(Evaluator):
     Maximizes the rest time between two assignment of a person.
     """
 
-    __database: Database
+    __history_index: HistoryIndex
 
-    def __init__(self, database: Database) -> None:
+    def __init__(self, history_index: HistoryIndex) -> None:
         """
         Constructor.
 
-        :param database: The database.
+        :param history_index: Index of the past assignments.
         """
-        self.__database = database
+        self.__history_index = history_index
 
     def assignment_score(self, roster_sequence_no: int, person: Person, role: str) -> float:
-        all_rosters = self.__database.get(Roster)
-        past_rosters = filter(lambda r: r.sequence_no < roster_sequence_no, all_rosters)
-        sorted_rosters = sorted(past_rosters, key=lambda r: r.sequence_no, reverse=True)
-
-        for i, roster in enumerate(sorted_rosters):
-            if roster.is_assigned(person):
-                return 1.0 - (1.0 / (i + 1))
-
-        return 1.0
+        rank = self.__history_index.rank(roster_sequence_no, person)
+        return 1.0 - (1.0 / (rank + 1)) if rank is not None else 1.0
@@ -0,0 +1,77 @@
+import unittest
+
+from database.Change import Change, ChangeType
+from database.Database import Database
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+
+
+class TestChanges(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """
+        Creates a database and subscribes to the changes of the rosters.
+        """
+        self.database = Database()
+        self.changes = []
+        self.database.subscribe(Roster, self.changes.append)
+
+    def test_changes(self) -> None:
+        """
+        Tests that each modification sends its changes, with the old and new objects.
+        """
+        roster = self.database.create(Roster, sequence_no=1)
+        self.database.create(Person, identifier="a")
+        updated_roster = self.database.update(roster, assignments={"a": "x"})
+        others = self.database.create_many(Roster, [{"sequence_no": 2}, {"sequence_no": 3}])
+        self.database.delete(Roster, sequence_no__ge=2)
+        self.database.delete_many([updated_roster])
+        self.database.clear()
+
+        self.assertEqual([Change(ChangeType.CREATE, Roster, new=roster),
+                          Change(ChangeType.UPDATE, Roster, old=roster, new=updated_roster),
+                          Change(ChangeType.CREATE, Roster, new=others[0]),
+                          Change(ChangeType.CREATE, Roster, new=others[1]),
+                          Change(ChangeType.DELETE, Roster, old=others[0]),
+                          Change(ChangeType.DELETE, Roster, old=others[1]),
+                          Change(ChangeType.DELETE, Roster, old=updated_roster),
+                          Change(ChangeType.CLEAR, Roster)], self.changes)
+
+    def test_stale_object(self) -> None:
+        """
+        Tests that the old object of an update is the stored object, even if an older copy is updated.
+        """
+        roster = self.database.create(Roster, sequence_no=1)
+        updated_roster = self.database.update(roster, assignments={"a": "x"})
+        self.database.update_many([(roster, {"assignments": {"b": "y"}})])
+
+        self.assertEqual(updated_roster, self.changes[-1].old)
+        self.assertEqual({"b": "y"}, self.changes[-1].new.assignments)
+
+    def test_transaction(self) -> None:
+        """
+        Tests that changes are sent when the transaction is committed, and never sent if it is cancelled.
+        """
+        with self.database.transaction():
+            self.database.create(Roster, sequence_no=1)
+            with self.database.transaction():
+                self.database.create(Roster, sequence_no=2)
+            self.assertEqual([], self.changes)
+        self.assertEqual([1, 2], [c.new.sequence_no for c in self.changes])
+
+        with self.assertRaises(ValueError):
+            with self.database.transaction():
+                self.database.delete(Roster, sequence_no=1)
+                raise ValueError()
+        self.assertEqual(2, len(self.changes))
+
+        self.database.create(Roster, sequence_no=3)
+        self.assertEqual(3, len(self.changes))
+
+    def test_unsubscribe(self) -> None:
+        """
+        Tests that changes are no longer sent after unsubscribing.
+        """
+        self.database.unsubscribe(Roster, self.changes.append)
+        self.database.create(Roster, sequence_no=1)
+        self.assertEqual([], self.changes)
@@ -0,0 +1,84 @@
+import unittest
+
+from database.Database import Database
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from database.errors.DuplicateKeyError import DuplicateKeyError
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """
+        Creates a database with a query cache.
+        """
+        self.database = Database(cache_size=16)
+
+    def test_hits_and_invalidation(self) -> None:
+        """
+        Tests that results are reused until the objects of their data class are modified.
+        """
+        cache = self.database.cache
+        person = self.database.create(Person, identifier="a", roles=["x"])
+        self.database.create(Roster, sequence_no=1)
+
+        self.assertEqual(1, len(self.database.get(Person)))
+        self.assertEqual(1, len(self.database.get(Person)))
+        self.assertEqual(person, self.database.get_unique(Person, identifier="a"))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+        # Modifying other data classes does not invalidate the results.
+        self.database.update(self.database.get_unique(Roster, sequence_no=1), assignments={"a": "x"})
+        self.assertEqual(1, len(self.database.get(Person)))
+        self.assertEqual(2, cache.hits)
+
+        self.database.update(person, first_name="A")
+        self.assertEqual("A", self.database.get(Person)[0].first_name)
+        self.database.create(Person, identifier="b")
+        self.assertEqual(2, len(self.database.get(Person)))
+        self.database.delete(Person, identifier="b")
+        self.assertEqual(1, len(self.database.get(Person)))
+        self.database.clear()
+        self.assertEqual([], self.database.get(Person))
+        self.assertEqual(2, cache.hits)
+
+    def test_returned_lists_are_copies(self) -> None:
+        """
+        Tests that modifying a returned list does not modify the cached result.
+        """
+        self.database.create(Person, identifier="a")
+        self.database.get(Person).clear()
+        self.assertEqual(1, len(self.database.get(Person)))
+
+    def test_eviction(self) -> None:
+        """
+        Tests that the least recently used results are evicted.
+        """
+        self.database = Database(cache_size=2)
+        for i in range(3):
+            self.database.create(Roster, sequence_no=i)
+
+        self.database.get(Roster, sequence_no=0)
+        self.database.get(Roster, sequence_no=1)
+        self.database.get(Roster, sequence_no=0)
+        self.database.get(Roster, sequence_no=2)
+        self.assertEqual(2, self.database.cache.size)
+
+        self.database.get(Roster, sequence_no=0)
+        self.database.get(Roster, sequence_no=1)
+        self.assertEqual((2, 4), (self.database.cache.hits, self.database.cache.misses))
+
+    def test_unhashable_values_and_rollback(self) -> None:
+        """
+        Tests that queries with unhashable values are not cached, and that results are invalidated by rollbacks.
+        """
+        self.database.create(Person, identifier="a", roles=["x"])
+        self.assertEqual(1, len(self.database.get(Person, roles=["x"])))
+        self.assertEqual(0, self.database.cache.size)
+
+        with self.assertRaises(DuplicateKeyError):
+            with self.database.transaction():
+                self.database.create(Person, identifier="b")
+                self.assertEqual(2, len(self.database.get(Person)))
+                self.database.create(Person, identifier="b")
+        self.assertEqual(1, len(self.database.get(Person)))
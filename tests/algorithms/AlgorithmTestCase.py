@@ -0,0 +1,90 @@
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from abc import ABC
+
+from configuration.Configuration import Configuration
+from database.Database import Database
+from database.dataclass.Absence import Absence
+from database.dataclass.Pattern import Pattern
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from generator.Generator import Generator
+
+
+class AlgorithmTestCase(ABC, unittest.TestCase):
+    """
+    Base test case of the algorithms, generating rosters from random data.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates the configuration of the generators.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.configuration = Configuration(os.path.join(self.directory.name, "roster_config.json"))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def create_data(self, seed: int, person_count: int, roles: list[str], restrict_roles: bool,
+                    patterns: list[dict[str, int]]) -> None:
+        """
+        Creates a generator with a new database containing persons, random past rosters, an absence and patterns.
+
+        :param seed: Seed of the random generator.
+        :param person_count: Number of persons.
+        :param roles: Roles of the persons.
+        :param restrict_roles: If true, each person only has some of the roles. Otherwise, each person has all roles.
+        :param patterns: Assignments of the patterns.
+        """
+        self.database = Database()
+        self.generator = Generator(self.database, self.configuration)
+        generator = random.Random(seed)
+        persons = []
+        for i in range(person_count):
+            person_roles = generator.sample(roles, generator.randint(1, len(roles))) if restrict_roles else roles
+            persons.append(self.database.create(Person, identifier=f"p{i}", roles=person_roles))
+
+        for sequence_no in range(1, 20):
+            assigned_persons = generator.sample(persons, 3)
+            self.database.create(Roster, sequence_no=sequence_no,
+                                 assignments={p.identifier: generator.choice(p.roles) for p in assigned_persons})
+
+        self.database.create(Absence, person_identifier=persons[0].identifier, roster_sequence_no=20)
+        for i, assignments in enumerate(patterns):
+            self.database.create(Pattern, identifier=f"pattern{i}", assignments=assignments)
+
+    def generate(self, algorithm_name: str) -> tuple[Roster, float]:
+        """
+        Generates roster 20 with an algorithm.
+
+        :param algorithm_name: Name of the algorithm.
+        :return: The roster and its score.
+        """
+        self.configuration.set("algorithm", algorithm_name)
+        roster = self.generator.generate_roster(20)
+        return roster, self.generator._algorithms[algorithm_name].roster_score(roster)
+
+    def best_score(self) -> float:
+        """
+        Finds the score of the best roster by trying all assignments of all patterns.
+
+        :return: The best score.
+        """
+        algorithm = self.generator._algorithms["optimal"]
+        persons = [p for p in self.database.get(Person) if p.identifier != "p0"]
+        best_score = None
+
+        for pattern in self.database.get(Pattern):
+            slots = [role for role in pattern.roles for _ in range(pattern.assignments[role])]
+            for assigned_persons in itertools.permutations(persons, len(slots)):
+                if all(p.has_role(role) for p, role in zip(assigned_persons, slots)):
+                    roster = Roster(sequence_no=20,
+                                    assignments={p.identifier: role for p, role in zip(assigned_persons, slots)})
+                    score = algorithm.roster_score(roster)
+                    best_score = score if best_score is None else max(best_score, score)
+
+        return best_score
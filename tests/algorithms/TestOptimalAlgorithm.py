@@ -0,0 +1,57 @@
+from algorithms.AlgorithmTestCase import AlgorithmTestCase
+from database.dataclass.Person import Person
+from generator.errors.NotEnoughResourcesError import NotEnoughResourcesError
+
+
+class TestOptimalAlgorithm(AlgorithmTestCase):
+
+    def test_same_as_tree(self) -> None:
+        """
+        Tests that the optimal algorithm finds rosters as good as the tree algorithm in high quality.
+        """
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                self.create_data(seed, 6, ["a", "b", "c"], False, [{"a": 2, "b": 1}, {"a": 1, "b": 1, "c": 1}])
+
+                _, expected_score = self.generate("tree_slow")
+                roster, score = self.generate("optimal")
+
+                self.assertAlmostEqual(expected_score, score)
+                self.assertNotIn("p0", roster.assignments)
+
+    def test_restricted_roles(self) -> None:
+        """
+        Tests that the optimal algorithm only assigns persons to their roles, and finds the best roster.
+        """
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.create_data(seed, 7, ["a", "b", "c", "d"], True, [{"a": 2, "b": 1}, {"a": 1, "c": 1, "d": 1}])
+                roster, score = self.generate("optimal")
+
+                self.assertAlmostEqual(self.best_score(), score)
+                for person_id, role in roster.assignments.items():
+                    self.assertTrue(self.database.get_unique(Person, identifier=person_id).has_role(role))
+
+    def test_not_enough_resources(self) -> None:
+        """
+        Tests that patterns which cannot be filled are skipped, and that an error is raised if none can be filled.
+        """
+        self.create_data(1, 5, ["a", "b"], False, [{"a": 2, "b": 1}, {"c": 1}])
+        roster, _ = self.generate("optimal")
+        self.assertEqual(3, len(roster.assignments))
+
+        self.create_data(1, 5, ["a", "b"], False, [{"a": 3, "b": 2}, {"c": 1}])
+        self.assertRaises(NotEnoughResourcesError, self.generate, "optimal")
+
+    def test_large_roster(self) -> None:
+        """
+        Tests that the optimal algorithm fills large patterns with many persons.
+        """
+        roles = [f"r{i}" for i in range(10)]
+        self.create_data(1, 300, roles, True, [{role: 4 for role in roles}])
+
+        roster, _ = self.generate("optimal")
+
+        self.assertEqual(40, len(roster.assignments))
+        for role in roles:
+            self.assertEqual(4, list(roster.assignments.values()).count(role))
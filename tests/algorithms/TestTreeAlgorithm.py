@@ -0,0 +1,33 @@
+import math
+
+from algorithms.AlgorithmTestCase import AlgorithmTestCase
+from database.dataclass.Person import Person
+
+
+class TestTreeAlgorithm(AlgorithmTestCase):
+
+    def test_branch_and_bound(self) -> None:
+        """
+        Tests that the tree algorithm in high quality finds the best roster, including when some branches cannot be
+        completed.
+        """
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.create_data(seed, 7, ["a", "b", "c", "d"], True, [{"a": 2, "b": 1}, {"a": 1, "c": 1, "d": 1}])
+                roster, score = self.generate("tree_slow")
+
+                self.assertAlmostEqual(self.best_score(), score)
+                for person_id, role in roster.assignments.items():
+                    self.assertTrue(self.database.get_unique(Person, identifier=person_id).has_role(role))
+
+    def test_pruned_nodes(self) -> None:
+        """
+        Tests that the tree algorithm in high quality prunes branches, and visits fewer nodes than there are rosters.
+        """
+        self.create_data(1, 12, ["a", "b", "c"], False, [{"a": 2, "b": 2, "c": 2}])
+        _, score = self.generate("tree_slow")
+        algorithm = self.generator._algorithms["tree_slow"]
+
+        self.assertAlmostEqual(self.generate("optimal")[1], score)
+        self.assertGreater(algorithm.pruned_nodes, 0)
+        self.assertLess(algorithm.visited_nodes, math.comb(11, 2) * math.comb(9, 2) * math.comb(7, 2))
@@ -0,0 +1,89 @@
+"""
+Compares the size of the files and the time needed to write and load them with each codec of the JSON driver.
+
+Usage (from the root of the repository):
+    PYTHONPATH=src python tests/benchmarks/codec_benchmark.py [number of rosters]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.Codec import Codec
+from database.Database import Database
+from database.codecs.DictionaryCodec import DictionaryCodec
+from database.codecs.GzipCodec import GzipCodec
+from database.codecs.JsonCodec import JsonCodec
+from database.codecs.LzmaCodec import LzmaCodec
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from database.drivers.JsonDriver import JsonDriver
+
+
+def create_history(roster_count: int) -> tuple[list[dict[str, any]], list[dict[str, any]]]:
+    """
+    Creates a history of rosters, in which the same persons and roles are assigned again and again.
+
+    :param roster_count: Number of rosters.
+    :return: The values of the persons and of the rosters.
+    """
+    random.seed(0)
+    roles = [f"role-{i}" for i in range(6)]
+    identifiers = [f"person-{i:03}" for i in range(80)]
+
+    persons = [{"identifier": identifier, "first_name": identifier.title(), "last_name": "Example",
+                "roles": random.sample(roles, 3)} for identifier in identifiers]
+    rosters = [{"sequence_no": sequence_no, "assignments": dict(zip(random.sample(identifiers, len(roles)), roles))}
+               for sequence_no in range(roster_count)]
+    return persons, rosters
+
+
+def measure(codec: Codec, history: tuple[list[dict[str, any]], list[dict[str, any]]]) -> tuple[int, float, float]:
+    """
+    Saves the history with a codec, then loads it again.
+
+    :param codec: The codec.
+    :param history: The values of the persons and of the rosters to save.
+    :return: The size of the files in bytes, the time to write them and the time to load them, in seconds.
+    """
+    for file_name in os.listdir():
+        os.remove(file_name)
+
+    database = Database(driver=JsonDriver(codec=codec))
+    start = time.perf_counter()
+    database.create_many(Person, history[0])
+    database.create_many(Roster, history[1])
+    database.flush()
+    write_time = time.perf_counter() - start
+    size = sum(os.path.getsize(file_name) for file_name in os.listdir())
+
+    start = time.perf_counter()
+    database = Database(driver=JsonDriver(codec=codec))
+    database.count(Person)
+    database.count(Roster)
+    load_time = time.perf_counter() - start
+    return size, write_time, load_time
+
+
+def main() -> None:
+    roster_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    history = create_history(roster_count)
+    codecs = [JsonCodec(), GzipCodec(), LzmaCodec(), DictionaryCodec(), GzipCodec(DictionaryCodec()),
+              LzmaCodec(DictionaryCodec())]
+
+    previous_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            print(f"{roster_count} rosters")
+            print(f"{'codec':<14}{'size (kB)':>12}{'write (s)':>12}{'load (s)':>12}")
+            for codec in codecs:
+                size, write_time, load_time = measure(codec, history)
+                print(f"{codec.extension:<14}{size / 1000:>12.1f}{write_time:>12.3f}{load_time:>12.3f}")
+        finally:
+            os.chdir(previous_directory)
+
+
+if __name__ == "__main__":
+    main()
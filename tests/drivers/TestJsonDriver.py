@@ -0,0 +1,432 @@
+import json
+import os
+import tempfile
+import unittest
+
+from database.Database import Database
+from database.codecs.DictionaryCodec import DictionaryCodec
+from database.codecs.GzipCodec import GzipCodec
+from database.codecs.JsonCodec import JsonCodec
+from database.codecs.LzmaCodec import LzmaCodec
+from database.dataclass.Pattern import Pattern
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from database.drivers.JsonDriver import JsonDriver
+from database.errors.ConcurrentModificationError import ConcurrentModificationError
+from database.errors.DuplicateKeyError import DuplicateKeyError
+
+
+class TestJsonDriver(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """
+        Moves to a temporary directory, where the JSON files are saved.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.previous_directory = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self) -> None:
+        """
+        Goes back to the previous directory and removes the temporary directory.
+        """
+        os.chdir(self.previous_directory)
+        self.directory.cleanup()
+
+    def test_save_file(self) -> None:
+        """
+        Tests that objects are saved when the driver is destroyed.
+        """
+        driver = JsonDriver()
+        Database(driver=driver).create(Person, identifier="a", first_name="A")
+        del driver
+
+        self.assertTrue(os.path.isfile("Person.json"))
+        self.assertEqual("A", Database(driver=JsonDriver()).get_unique(Person, identifier="a").first_name)
+
+    def test_lazy_loading(self) -> None:
+        """
+        Tests that objects loaded from a file can be searched before and after being read, and that missing values are
+        replaced by default values.
+        """
+        with open("Person.json", "w") as file:
+            json.dump([{"identifier": "a", "first_name": "A", "last_name": "", "roles": ["x"]},
+                       {"identifier": "b", "first_name": "B", "last_name": "", "roles": ["x", "y"]},
+                       {"identifier": "c"}], file)
+
+        database = Database(driver=JsonDriver())
+        self.assertEqual("A", database.get_unique(Person, identifier="a").first_name)
+        self.assertEqual([], database.get_unique(Person, identifier="c").roles)
+        self.assertEqual(["b"], [p.identifier for p in database.get(Person, roles__contains="y")])
+        self.assertEqual(["a", "b"], [p.identifier for p in database.get(Person, roles__contains="x",
+                                                                          order_by="identifier")])
+        with self.assertRaises(AttributeError):
+            database.get(Person, nickname="a")
+
+        database.update(database.get_unique(Person, identifier="b"), roles=["z"])
+        self.assertEqual(["a"], [p.identifier for p in database.get(Person, roles__contains="x")])
+        self.assertEqual(["b"], [p.identifier for p in database.get(Person, roles__contains="z")])
+
+    def test_transaction(self) -> None:
+        """
+        Tests that the files are written when a transaction is committed, and not when it is cancelled.
+        """
+        database = Database(driver=JsonDriver())
+        with database.transaction():
+            database.create(Person, identifier="a")
+            database.create(Person, identifier="b")
+            self.assertFalse(os.path.exists("Person.json"))
+        self.assertTrue(os.path.isfile("Person.json"))
+
+        with self.assertRaises(ValueError):
+            with database.transaction():
+                database.delete(Person, identifier="a")
+                raise ValueError()
+        self.assertEqual(["a", "b"], [p.identifier for p in database.get(Person, order_by="identifier")])
+
+        database.create(Person, identifier="c")
+        database.flush()
+        self.assertEqual(["a", "b", "c"], [p.identifier for p in Database(driver=JsonDriver()).get(
+            Person, order_by="identifier")])
+
+    def test_journal_transaction(self) -> None:
+        """
+        Tests that the changes made in a transaction are appended to the journal when the transaction is committed.
+        """
+        database = Database(driver=JsonDriver(journaled=True))
+        with database.transaction():
+            database.create(Person, identifier="a")
+            database.create(Person, identifier="b")
+            self.assertFalse(os.path.exists("Person.journal"))
+
+        with self.assertRaises(ValueError):
+            with database.transaction():
+                database.create(Person, identifier="c")
+                raise ValueError()
+
+        with open("Person.journal") as file:
+            self.assertEqual(2, len(file.readlines()))
+        self.assertEqual(["a", "b"], [p.identifier for p in Database(driver=JsonDriver(journaled=True)).get(
+            Person, order_by="identifier")])
+
+    def test_journal_create_many(self) -> None:
+        """
+        Tests that batch operations are appended to the journal.
+        """
+        database = Database(driver=JsonDriver(journaled=True))
+        persons = database.create_many(Person, [{"identifier": f"{i}"} for i in range(5)])
+        database.update_many([(persons[0], {"first_name": "A"})])
+        database.delete_many(persons[1:3])
+
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual(["0", "3", "4"], [p.identifier for p in database.get(Person, order_by="identifier")])
+        self.assertEqual("A", database.get_unique(Person, identifier="0").first_name)
+
+    def test_journal_replay(self) -> None:
+        """
+        Tests that the changes saved in the journal are applied when the objects are loaded.
+        """
+        database = Database(driver=JsonDriver(journaled=True))
+        person = database.create(Person, identifier="a", first_name="A", roles=["r"])
+        database.create(Person, identifier="b", first_name="B")
+        database.create(Person, identifier="c", first_name="C")
+        database.update(person, roles=["r", "s"])
+        database.delete(Person, identifier="b")
+
+        # Changes are saved without waiting for the driver to be destroyed.
+        self.assertFalse(os.path.exists("Person.json"))
+        self.assertTrue(os.path.isfile("Person.journal"))
+
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual(["a", "c"], [p.identifier for p in database.get(Person, order_by="identifier")])
+        self.assertEqual(["r", "s"], database.get_unique(Person, identifier="a").roles)
+        self.assertEqual(["a"], [p.identifier for p in database.get(Person, roles__contains="s")])
+
+        database.clear(Person)
+        database.create(Person, identifier="d")
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual(["d"], [p.identifier for p in database.get(Person)])
+
+    def test_journal_incomplete_line(self) -> None:
+        """
+        Tests that a change left incomplete by an interrupted write is ignored.
+        """
+        database = Database(driver=JsonDriver(journaled=True))
+        database.create(Person, identifier="a")
+        with open("Person.journal", "a") as file:
+            file.write('{"op": "store", "val')
+
+        database = Database(driver=JsonDriver(journaled=True))
+        database.create(Person, identifier="b")
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual(["a", "b"], [p.identifier for p in database.get(Person, order_by="identifier")])
+
+    def test_compaction(self) -> None:
+        """
+        Tests that the journal is compacted into a new snapshot when it gets too long.
+        """
+        driver = JsonDriver(journaled=True, compaction_threshold=5)
+        database = Database(driver=driver)
+        for i in range(12):
+            database.create(Person, identifier=f"{i:02}")
+        database.delete(Person, identifier="00")
+        del database, driver
+
+        self.assertTrue(os.path.isfile("Person.json"))
+        self.assertFalse(os.path.exists("Person.journal.compacting"))
+        with open("Person.journal") as file:
+            self.assertLess(len(file.readlines()), 5)
+
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual([f"{i:02}" for i in range(1, 12)],
+                         [p.identifier for p in database.get(Person, order_by="identifier")])
+
+    def test_partitions(self) -> None:
+        """
+        Tests that partitioned objects are saved in one file per range of values, and that only the partitions needed by
+        a query are read.
+        """
+        database = Database(driver=JsonDriver(partition_size=10))
+        database.create_many(Roster, [{"sequence_no": i} for i in range(30)])
+        database.flush()
+        self.assertEqual(["Roster.0-9.json", "Roster.10-19.json", "Roster.20-29.json"],
+                         sorted((f for f in os.listdir() if f.startswith("Roster") and not f.endswith(".lock")),
+                                key=lambda f: int(f.split(".")[1].split("-")[0])))
+
+        # An unreadable partition is never read by queries that do not need it.
+        with open("Roster.0-9.json", "w") as file:
+            file.write("invalid")
+        database = Database(driver=JsonDriver(partition_size=10))
+        self.assertEqual([20, 21], [r.sequence_no for r in database.get(Roster, sequence_no__ge=20, limit=2,
+                                                                          order_by="sequence_no")])
+        self.assertEqual([29, 28], [r.sequence_no for r in database.iter(Roster, order_by="-sequence_no", limit=2)])
+        self.assertEqual(15, database.get_unique(Roster, sequence_no=15).sequence_no)
+
+        # Only the modified partitions are written.
+        database.create(Roster, sequence_no=30)
+        database.delete(Roster, sequence_no=15)
+        database.flush()
+        with open("Roster.0-9.json") as file:
+            self.assertEqual("invalid", file.read())
+        self.assertTrue(os.path.isfile("Roster.30-39.json"))
+        self.assertEqual(9, Database(driver=JsonDriver(partition_size=10)).count(Roster, sequence_no__ge=10,
+                                                                                     sequence_no__lt=20))
+
+        # Partitions read during a rolled back transaction, after its first change, are neither lost nor saved.
+        database = Database(driver=JsonDriver(partition_size=10))
+        with self.assertRaises(ValueError):
+            with database.transaction():
+                database.update(database.get_unique(Roster, sequence_no=25), assignments={"a": "b"})
+                database.update(database.get_unique(Roster, sequence_no=12), assignments={"a": "b"})
+                database.delete(Roster, sequence_no=30)
+                raise ValueError()
+        database.flush()
+        self.assertTrue(os.path.isfile("Roster.10-19.json"))
+        self.assertEqual({}, database.get_unique(Roster, sequence_no=12).assignments)
+        self.assertEqual(9, database.count(Roster, sequence_no__ge=10, sequence_no__lt=20))
+
+        database = Database(driver=JsonDriver(partition_size=10))
+        self.assertEqual(9, database.count(Roster, sequence_no__ge=10, sequence_no__lt=20))
+        self.assertEqual({}, database.get_unique(Roster, sequence_no=25).assignments)
+        self.assertTrue(database.exists(Roster, sequence_no=30))
+
+    def test_partitions_negative_values(self) -> None:
+        """
+        Tests that objects with negative values of the partition field are saved and read back.
+        """
+        database = Database(driver=JsonDriver(partition_size=10))
+        database.create_many(Roster, [{"sequence_no": i} for i in (-11, -5, 3)])
+        database.flush()
+        self.assertTrue(os.path.isfile("Roster.-10--1.json"))
+        self.assertTrue(os.path.isfile("Roster.-20--11.json"))
+
+        database = Database(driver=JsonDriver(partition_size=10))
+        self.assertEqual([-11, -5, 3], [r.sequence_no for r in database.get(Roster, order_by="sequence_no")])
+        self.assertEqual([-5], [r.sequence_no for r in database.get(Roster, sequence_no__ge=-10, sequence_no__lt=0)])
+        with self.assertRaises(DuplicateKeyError):
+            database.create(Roster, sequence_no=-5)
+
+        # With another partition size, the objects are moved to the new partitions.
+        database = Database(driver=JsonDriver(partition_size=5))
+        self.assertEqual([-11, -5, 3], [r.sequence_no for r in database.get(Roster, order_by="sequence_no")])
+        database.flush()
+        self.assertFalse(os.path.exists("Roster.-10--1.json"))
+        self.assertTrue(os.path.isfile("Roster.-5--1.json"))
+
+    def test_partitions_migration(self) -> None:
+        """
+        Tests that objects saved without partitions or with another partition size are moved to the new partitions.
+        """
+        database = Database(driver=JsonDriver())
+        database.create_many(Roster, [{"sequence_no": i} for i in range(25)])
+        database.flush()
+
+        database = Database(driver=JsonDriver(partition_size=10))
+        self.assertEqual(25, database.count(Roster))
+        database.flush()
+        self.assertFalse(os.path.exists("Roster.json"))
+        self.assertTrue(os.path.isfile("Roster.20-29.json"))
+
+        database = Database(driver=JsonDriver(partition_size=20))
+        self.assertEqual(list(range(25)), [r.sequence_no for r in database.get(Roster, order_by="sequence_no")])
+        database.flush()
+        self.assertEqual(["Roster.0-19.json", "Roster.20-39.json"],
+                         sorted(f for f in os.listdir() if f.startswith("Roster") and not f.endswith(".lock")))
+
+    def test_partitions_journaled(self) -> None:
+        """
+        Tests that partitions cannot be used with a journal.
+        """
+        with self.assertRaises(ValueError):
+            JsonDriver(journaled=True, partition_size=10)
+
+    def test_binary_snapshots(self) -> None:
+        """
+        Tests that binary snapshots are written with the JSON files and give the same objects.
+        """
+        database = Database(driver=JsonDriver(binary_snapshots=True))
+        database.create_many(Person, [{"identifier": "a", "first_name": "Ä", "roles": ["x", "y"]},
+                                      {"identifier": "b", "roles": []}])
+        database.create(Pattern, identifier="p", assignments={"x": 2})
+        database.create_many(Roster, [{"sequence_no": 1, "assignments": {"a": "x"}}, {"sequence_no": 2}])
+        database.flush()
+        self.assertTrue(os.path.isfile("Person.json.bin"))
+
+        database = Database(driver=JsonDriver(binary_snapshots=True))
+        self.assertEqual(Person(identifier="a", first_name="Ä", roles=["x", "y"]),
+                         database.get_unique(Person, identifier="a"))
+        self.assertEqual(["a"], [p.identifier for p in database.get(Person, roles__contains="y")])
+        self.assertEqual(["b"], [p.identifier for p in database.get(Person, first_name=None)])
+        self.assertEqual({"x": 2}, database.get_unique(Pattern, identifier="p").assignments)
+        self.assertEqual([1], [r.sequence_no for r in database.get(Roster, assignments__has_key="a")])
+
+        # Objects which were not read are saved with their values.
+        database.update(database.get_unique(Roster, sequence_no=2), assignments={"b": "y"})
+        database.flush()
+        database = Database(driver=JsonDriver())
+        self.assertEqual(["a", "b"], [p.identifier for p in database.get(Person, order_by="identifier")])
+        self.assertEqual({"b": "y"}, database.get_unique(Roster, sequence_no=2).assignments)
+
+    def test_binary_snapshots_invalid(self) -> None:
+        """
+        Tests that the JSON file is read when the binary snapshot is outdated or corrupted.
+        """
+        database = Database(driver=JsonDriver(binary_snapshots=True))
+        database.create(Person, identifier="a")
+        database.flush()
+
+        with open("Person.json", "w") as file:
+            json.dump([{"identifier": "b"}], file)
+        self.assertEqual(["b"], [p.identifier for p in Database(driver=JsonDriver(binary_snapshots=True)).get(Person)])
+
+        database = Database(driver=JsonDriver(binary_snapshots=True))
+        database.create(Person, identifier="c")
+        database.flush()
+        with open("Person.json.bin", "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            last_byte = file.read(1)
+            file.seek(-1, os.SEEK_END)
+            file.write(bytes([last_byte[0] ^ 0xFF]))
+        self.assertEqual(["b", "c"], [p.identifier for p in Database(driver=JsonDriver(binary_snapshots=True)).get(
+            Person, order_by="identifier")])
+
+    def test_codecs(self) -> None:
+        """
+        Tests that objects saved with each codec are read back identically.
+        """
+        for codec in (JsonCodec(), DictionaryCodec(), GzipCodec(), LzmaCodec(), GzipCodec(DictionaryCodec())):
+            with self.subTest(codec=codec.extension):
+                database = Database(driver=JsonDriver(codec=codec))
+                database.clear()
+                persons = database.create_many(Person, [{"identifier": "a", "first_name": "Ä", "roles": ["x", "y"]},
+                                                        {"identifier": "b", "roles": []}])
+                patterns = [database.create(Pattern, identifier="p", assignments={"x": 2})]
+                rosters = database.create_many(Roster, [{"sequence_no": 1, "assignments": {"a": "x"}},
+                                                        {"sequence_no": 2}])
+                database.flush()
+                self.assertTrue(os.path.isfile(f"Person{codec.extension}"))
+
+                database = Database(driver=JsonDriver(codec=codec))
+                self.assertEqual(persons, database.get(Person, order_by="identifier"))
+                self.assertEqual(patterns, database.get(Pattern))
+                self.assertEqual(rosters, database.get(Roster, order_by="sequence_no"))
+
+    def test_codec_migration(self) -> None:
+        """
+        Tests that files written with another codec are read, and replaced by files written with the current codec.
+        """
+        database = Database(driver=JsonDriver(partition_size=10))
+        database.create_many(Roster, [{"sequence_no": i, "assignments": {"a": "x"}} for i in range(15)])
+        database.create(Person, identifier="a")
+        database.flush()
+
+        database = Database(driver=JsonDriver(codec=GzipCodec(DictionaryCodec())))
+        self.assertEqual(15, database.count(Roster, assignments__has_key="a"))
+        self.assertEqual(["a"], [p.identifier for p in database.get(Person)])
+        database.flush()
+        self.assertEqual(["Person.djson.gz", "Roster.djson.gz"],
+                         sorted(f for f in os.listdir() if not f.endswith(".lock")))
+
+        database = Database(driver=JsonDriver(codec=LzmaCodec(), partition_size=10))
+        self.assertEqual(list(range(15)), [r.sequence_no for r in database.get(Roster, order_by="sequence_no")])
+
+    def test_concurrent_changes(self) -> None:
+        """
+        Tests that the changes saved by another process since the files were read are merged.
+        """
+        Database(driver=JsonDriver()).create_many(Person, [{"identifier": i} for i in "abc"])
+        first, second = Database(driver=JsonDriver()), Database(driver=JsonDriver())
+        self.assertEqual(3, first.count(Person))
+        self.assertEqual(3, second.count(Person))
+
+        first.update(first.get_unique(Person, identifier="a"), first_name="A")
+        first.delete(Person, identifier="c")
+        second.update(second.get_unique(Person, identifier="b"), first_name="B")
+        second.create(Person, identifier="d")
+        first.flush()
+        second.flush()
+
+        expected = [("a", "A"), ("b", "B"), ("d", None)]
+        self.assertEqual(expected, [(p.identifier, p.first_name) for p in second.get(Person, order_by="identifier")])
+        database = Database(driver=JsonDriver())
+        self.assertEqual(expected, [(p.identifier, p.first_name) for p in database.get(Person, order_by="identifier")])
+
+    def test_concurrent_conflict(self) -> None:
+        """
+        Tests that changes made to objects modified by another process are rejected, and that the objects are then read
+        again.
+        """
+        Database(driver=JsonDriver(partition_size=10)).create_many(Roster, [{"sequence_no": i} for i in range(20)])
+        first, second = Database(driver=JsonDriver(partition_size=10)), Database(driver=JsonDriver(partition_size=10))
+        first.update(first.get_unique(Roster, sequence_no=1), assignments={"a": "x"})
+        second.update(second.get_unique(Roster, sequence_no=1), assignments={"a": "y"})
+        second.create(Roster, sequence_no=20)
+        first.flush()
+
+        with self.assertRaises(ConcurrentModificationError):
+            second.flush()
+        self.assertEqual({"a": "x"}, second.get_unique(Roster, sequence_no=1).assignments)
+        self.assertEqual(20, second.count(Roster))
+        second.flush()
+
+        self.assertEqual({"a": "x"}, Database(driver=JsonDriver()).get_unique(Roster, sequence_no=1).assignments)
+
+    def test_concurrent_journal(self) -> None:
+        """
+        Tests that the changes appended to the journal by another process are applied before the changes of the
+        process, and that compactions keep them.
+        """
+        first = Database(driver=JsonDriver(journaled=True, compaction_threshold=3))
+        second = Database(driver=JsonDriver(journaled=True, compaction_threshold=3))
+        self.assertEqual(0, first.count(Person))
+        self.assertEqual(0, second.count(Person))
+
+        for identifier in "abcdef":
+            database = first if identifier in "ace" else second
+            database.create(Person, identifier=identifier, first_name=identifier.upper())
+        second.update(second.get_unique(Person, identifier="a"), first_name="X")
+        del first, second
+
+        database = Database(driver=JsonDriver(journaled=True))
+        self.assertEqual([("a", "X"), ("b", "B"), ("c", "C"), ("d", "D"), ("e", "E"), ("f", "F")],
+                         [(p.identifier, p.first_name) for p in database.get(Person, order_by="identifier")])
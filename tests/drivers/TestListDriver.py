@@ -0,0 +1,278 @@
+from TestCase import TestCase
+from database.Database import Database
+from database.Driver import Driver
+from database.dataclass.Absence import Absence
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from database.drivers.ListDriver import ListDriver
+from database.errors.DuplicateKeyError import DuplicateKeyError
+from database.errors.InvalidFilterError import InvalidFilterError
+from database.errors.ObjectNotFoundError import ObjectNotFoundError
+from database.errors.TransactionNotSupportedError import TransactionNotSupportedError
+
+
+class TestListDriver(TestCase):
+
+    def test_key_lookup(self) -> None:
+        """
+        Tests that objects can be found by their complete key.
+        """
+        database = self.context.database
+        for i in range(10):
+            database.create(Absence, person_identifier=f"id{i}", roster_sequence_no=i)
+
+        absence = database.get_unique(Absence, person_identifier="id4", roster_sequence_no=4)
+        self.assertEqual(4, absence.roster_sequence_no)
+
+        with self.assertRaises(ObjectNotFoundError):
+            database.get_unique(Absence, person_identifier="id4", roster_sequence_no=5)
+
+        with self.assertRaises(DuplicateKeyError):
+            database.create(Absence, person_identifier="id4", roster_sequence_no=4)
+
+    def test_key_lookup_after_update_and_delete(self) -> None:
+        """
+        Tests that the key index is kept up to date when objects are updated or deleted.
+        """
+        database = self.context.database
+        person = database.create(Person, identifier="id", first_name="abc", last_name="def")
+
+        database.update(person, first_name="ghi")
+        self.assertEqual("ghi", database.get_unique(Person, identifier="id").first_name)
+        self.assertEqual(1, len(database.get(Person)))
+
+        database.delete(Person, identifier="id")
+        with self.assertRaises(ObjectNotFoundError):
+            database.get_unique(Person, identifier="id")
+
+        database.create(Person, identifier="id", first_name="abc", last_name="def")
+        database.clear(Person)
+        self.assertEqual([], database.get(Person, identifier="id"))
+
+    def test_key_lookup_with_other_values(self) -> None:
+        """
+        Tests that a key lookup still checks the other search values.
+        """
+        database = self.context.database
+        database.create(Person, identifier="id", first_name="abc", last_name="def")
+
+        self.assertEqual(1, len(database.get(Person, identifier="id", first_name="abc")))
+        self.assertEqual(0, len(database.get(Person, identifier="id", first_name="xyz")))
+
+    def test_indexed_lookup(self) -> None:
+        """
+        Tests that objects can be found by the values of their indexed fields, and that the lookup tables are kept up
+        to date.
+        """
+        database = self.context.database
+        for i in range(10):
+            database.create(Absence, person_identifier=f"id{i % 2}", roster_sequence_no=i)
+
+        self.assertEqual([3], [a.roster_sequence_no for a in database.get(Absence, roster_sequence_no=3)])
+        self.assertEqual(5, len(database.get(Absence, person_identifier="id1")))
+        self.assertEqual([], database.get(Absence, person_identifier="id1", roster_sequence_no=2))
+
+        database.delete(Absence, person_identifier="id1")
+        self.assertEqual([], database.get(Absence, person_identifier="id1"))
+        self.assertEqual([], database.get(Absence, roster_sequence_no=3))
+        self.assertEqual(5, len(database.get(Absence, person_identifier="id0")))
+
+        database.clear(Absence)
+        self.assertEqual([], database.get(Absence, person_identifier="id0"))
+
+    def test_contains_lookup(self) -> None:
+        """
+        Tests that objects can be found by an element of a list field or a key of a dict field.
+        """
+        database = self.context.database
+        person1 = database.create(Person, identifier="id1", first_name="abc", last_name="def", roles=["a", "b"])
+        database.create(Person, identifier="id2", first_name="abc", last_name="def", roles=["b"])
+        database.create(Roster, sequence_no=1, assignments={"id1": "a"})
+        database.create(Roster, sequence_no=2, assignments={"id2": "b"})
+
+        self.assertEqual(["id1"], [p.identifier for p in database.get(Person, roles__contains="a")])
+        self.assertCountEqual(["id1", "id2"], [p.identifier for p in database.get(Person, roles__contains="b")])
+        self.assertEqual([1], [r.sequence_no for r in database.get(Roster, assignments__has_key="id1")])
+        self.assertEqual([], database.get(Roster, assignments__has_key="a"))
+
+        # The inverted lookup table follows updates.
+        database.update(person1, roles=["c"])
+        self.assertEqual([], database.get(Person, roles__contains="a"))
+        self.assertEqual(["id1"], [p.identifier for p in database.get(Person, roles__contains="c")])
+
+    def test_invalid_operator(self) -> None:
+        """
+        Tests that unknown operators are rejected.
+        """
+        with self.assertRaises(InvalidFilterError):
+            self.context.database.get(Person, roles__unknown="a")
+
+    def test_range_order_and_limit(self) -> None:
+        """
+        Tests range conditions, ordering and limits on a field with sorted values.
+        """
+        database = self.context.database
+        for sequence_no in [5, 1, 9, 3, 7]:
+            database.create(Roster, sequence_no=sequence_no)
+
+        rosters = database.get(Roster, sequence_no__lt=7, order_by="-sequence_no")
+        self.assertEqual([5, 3, 1], [r.sequence_no for r in rosters])
+
+        rosters = database.get(Roster, sequence_no__ge=3, sequence_no__le=7, order_by="sequence_no")
+        self.assertEqual([3, 5, 7], [r.sequence_no for r in rosters])
+
+        rosters = database.get(Roster, sequence_no__gt=1, order_by="sequence_no", limit=2)
+        self.assertEqual([3, 5], [r.sequence_no for r in rosters])
+
+        # The sorted values follow deletions.
+        database.delete(Roster, sequence_no__lt=5)
+        rosters = database.get(Roster, order_by="-sequence_no")
+        self.assertEqual([9, 7, 5], [r.sequence_no for r in rosters])
+
+    def test_order_without_sorted_values(self) -> None:
+        """
+        Tests ordering and limits on a field without sorted values.
+        """
+        database = self.context.database
+        for identifier in ["b", "c", "a"]:
+            database.create(Person, identifier=identifier, first_name="abc", last_name=identifier.upper())
+
+        persons = database.get(Person, order_by="last_name")
+        self.assertEqual(["a", "b", "c"], [p.identifier for p in persons])
+
+        persons = database.get(Person, order_by="-last_name", limit=1)
+        self.assertEqual(["c"], [p.identifier for p in persons])
+
+        persons = database.get(Person, last_name__gt="A", order_by="identifier")
+        self.assertEqual(["b", "c"], [p.identifier for p in persons])
+
+        # Objects without value come first in ascending order, and last in descending order.
+        database.create(Person, identifier="d", first_name="abc")
+        self.assertEqual(["d", "a", "b", "c"], [p.identifier for p in database.get(Person, order_by="last_name")])
+        self.assertEqual(["c", "b", "a", "d"], [p.identifier for p in database.get(Person, order_by="-last_name")])
+
+        database.create(Absence, person_identifier="a", roster_sequence_no=2)
+        database.create(Absence, person_identifier="b")
+        absences = database.get(Absence, order_by="roster_sequence_no")
+        self.assertEqual(["b", "a"], [a.person_identifier for a in absences])
+
+    def test_update_does_not_modify_original(self) -> None:
+        """
+        Tests that updating an object leaves the original object unchanged, and that field values cannot be modified in
+        place.
+        """
+        database = self.context.database
+        roster = database.create(Roster, sequence_no=1, assignments={"id1": "a"})
+
+        with self.assertRaises(TypeError):
+            roster.assignments["id2"] = "b"
+
+        updated_roster = database.update(roster, assignments={"id2": "b"})
+        self.assertEqual({"id1": "a"}, roster.assignments)
+        self.assertEqual({"id2": "b"}, updated_roster.assignments)
+        self.assertEqual({"id2": "b"}, database.get_unique(Roster, sequence_no=1).assignments)
+
+    def test_transaction_rollback(self) -> None:
+        """
+        Tests that the changes made in a transaction are cancelled when an exception is raised.
+        """
+        database = self.context.database
+        database.create(Roster, sequence_no=1, assignments={"id1": "a"})
+
+        with self.assertRaises(DuplicateKeyError):
+            with database.transaction():
+                database.create(Roster, sequence_no=2)
+                database.update(database.get_unique(Roster, sequence_no=1), assignments={"id2": "b"})
+                database.delete(Roster, sequence_no=1)
+                database.create(Roster, sequence_no=2)
+
+        self.assertEqual([1], [r.sequence_no for r in database.get(Roster)])
+        self.assertEqual([1], [r.sequence_no for r in database.get(Roster, sequence_no__lt=5)])
+        self.assertEqual(1, len(database.get(Roster, assignments__has_key="id1")))
+        self.assertEqual([], database.get(Roster, assignments__has_key="id2"))
+
+        with database.transaction():
+            database.create(Roster, sequence_no=2)
+        self.assertEqual([1, 2], [r.sequence_no for r in database.get(Roster, order_by="sequence_no")])
+
+    def test_transaction_without_rollback(self) -> None:
+        """
+        Tests that transactions are refused before running when the driver cannot roll them back.
+        """
+        class NoRollbackDriver(ListDriver):
+            begin = Driver.begin
+            rollback = Driver.rollback
+
+        database = Database(driver=NoRollbackDriver())
+        started = False
+        with self.assertRaises(TransactionNotSupportedError):
+            with database.transaction():
+                started = True
+                database.create(Roster, sequence_no=1)
+                raise ValueError()
+
+        self.assertFalse(started)
+        self.assertEqual([], database.get(Roster))
+        database.create(Roster, sequence_no=1)
+        self.assertEqual([1], [r.sequence_no for r in database.get(Roster)])
+
+    def test_create_update_delete_many(self) -> None:
+        """
+        Tests the batch operations.
+        """
+        database = self.context.database
+        absences = database.create_many(Absence, [{"person_identifier": p, "roster_sequence_no": s}
+                                                  for p in ("a", "b") for s in range(3)])
+        self.assertEqual(6, len(database.get(Absence)))
+        self.assertEqual(3, len(database.get(Absence, person_identifier="a")))
+
+        with self.assertRaises(DuplicateKeyError):
+            database.create_many(Absence, [{"person_identifier": "c", "roster_sequence_no": 1},
+                                           {"person_identifier": "a", "roster_sequence_no": 1}])
+        with self.assertRaises(DuplicateKeyError):
+            database.create_many(Absence, [{"person_identifier": "c", "roster_sequence_no": 1},
+                                           {"person_identifier": "c", "roster_sequence_no": 1}])
+        self.assertEqual([], database.get(Absence, person_identifier="c"))
+
+        database.delete_many([a for a in absences if a.roster_sequence_no > 0])
+        self.assertEqual(["a", "b"], [a.person_identifier for a in database.get(Absence, order_by="person_identifier")])
+
+        persons = database.create_many(Person, [{"identifier": "a"}, {"identifier": "b"}])
+        database.update_many([(persons[0], {"roles": ["x"]}), (persons[1], {"roles": ["x", "y"]})])
+        self.assertEqual(["a", "b"], [p.identifier for p in database.get(Person, roles__contains="x")])
+        self.assertEqual(["b"], [p.identifier for p in database.get(Person, roles__contains="y")])
+
+    def test_iter_count_exists(self) -> None:
+        """
+        Tests the iterator, count and existence check.
+        """
+        database = self.context.database
+        database.create_many(Roster, [{"sequence_no": i} for i in range(10)])
+
+        iterator = database.iter(Roster, sequence_no__ge=5, order_by="sequence_no")
+        self.assertEqual(5, next(iterator).sequence_no)
+        self.assertEqual([6, 7, 8, 9], [r.sequence_no for r in iterator])
+        self.assertEqual([9, 8], [r.sequence_no for r in database.iter(Roster, order_by="-sequence_no", limit=2)])
+
+        self.assertEqual(10, database.count(Roster))
+        self.assertEqual(3, database.count(Roster, sequence_no__lt=3))
+        self.assertTrue(database.exists(Roster, sequence_no=3))
+        self.assertFalse(database.exists(Roster, sequence_no__gt=9))
+
+        with self.assertRaises(InvalidFilterError):
+            database.iter(Roster, sequence_no__between=1)
+
+    def test_interned_strings(self) -> None:
+        """
+        Tests that equal strings stored in different objects are the same object.
+        """
+        database = self.context.database
+        person = database.create(Person, identifier="".join(["p", "1"]), roles=["".join(["r", "1"])])
+        roster = database.create(Roster, sequence_no=1, assignments={"".join(["p", "1"]): "".join(["r", "1"])})
+        roster = database.update(roster, assignments={**roster.assignments, "p2": "r2"})
+
+        identifier, role = list(roster.assignments.items())[0]
+        self.assertIs(person.identifier, identifier)
+        self.assertIs(person.roles[0], role)
+        self.assertEqual("r1", roster.get_role(person))
+        self.assertIsNone(roster.get_role(Person(identifier="p3")))
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+
+from database.Database import Database
+from database.dataclass.Absence import Absence
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from database.drivers.SqliteDriver import SqliteDriver
+from database.errors.DuplicateKeyError import DuplicateKeyError
+from database.errors.ObjectNotFoundError import ObjectNotFoundError
+
+
+class TestSqliteDriver(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """
+        Creates a database using an in-memory SQLite database.
+        """
+        self.database = Database(driver=SqliteDriver(":memory:"))
+
+    def test_create_get_update_delete(self) -> None:
+        """
+        Tests the basic operations on objects.
+        """
+        person = self.database.create(Person, identifier="id", first_name="abc", last_name="def", roles=["a"])
+        self.assertEqual(["a"], self.database.get_unique(Person, identifier="id").roles)
+
+        with self.assertRaises(DuplicateKeyError):
+            self.database.create(Person, identifier="id")
+
+        self.database.update(person, roles=["b", "c"])
+        self.assertEqual(["b", "c"], self.database.get_unique(Person, identifier="id").roles)
+        self.assertEqual("abc", self.database.get_unique(Person, identifier="id").first_name)
+
+        self.database.delete(Person, identifier="id")
+        with self.assertRaises(ObjectNotFoundError):
+            self.database.get_unique(Person, identifier="id")
+
+    def test_search_values(self) -> None:
+        """
+        Tests searches using operators, orderings and limits.
+        """
+        for i in range(10):
+            self.database.create(Absence, person_identifier=f"id{i % 2}", roster_sequence_no=i)
+            self.database.create(Roster, sequence_no=i, assignments={f"id{i % 3}": "role"})
+
+        self.assertEqual(5, len(self.database.get(Absence, person_identifier="id1")))
+
+        rosters = self.database.get(Roster, sequence_no__lt=7, order_by="-sequence_no", limit=2)
+        self.assertEqual([6, 5], [r.sequence_no for r in rosters])
+
+        rosters = self.database.get(Roster, assignments__has_key="id0", order_by="sequence_no")
+        self.assertEqual([0, 3, 6, 9], [r.sequence_no for r in rosters])
+
+        self.database.delete(Roster, sequence_no__ge=3)
+        self.assertEqual([0], [r.sequence_no for r in self.database.get(Roster, assignments__has_key="id0")])
+
+    def test_contains(self) -> None:
+        """
+        Tests that list fields can be searched by element, and that the index tables follow updates.
+        """
+        person = self.database.create(Person, identifier="id1", roles=["a", "b"])
+        self.database.create(Person, identifier="id2", roles=["b"])
+
+        self.assertEqual(["id1"], [p.identifier for p in self.database.get(Person, roles__contains="a")])
+        self.assertEqual(2, len(self.database.get(Person, roles__contains="b")))
+        self.assertEqual([], self.database.get(Person, roles__has_key="a"))
+
+        self.database.update(person, roles=["c"])
+        self.assertEqual([], self.database.get(Person, roles__contains="a"))
+        self.assertEqual(1, len(self.database.get(Person, roles__contains="b")))
+
+    def test_transaction(self) -> None:
+        """
+        Tests that the changes made in a transaction are committed together, or cancelled when an exception is raised.
+        """
+        with self.assertRaises(DuplicateKeyError):
+            with self.database.transaction():
+                self.database.create(Person, identifier="a")
+                self.database.create(Absence, person_identifier="a", roster_sequence_no=1)
+                self.database.create(Person, identifier="a")
+
+        self.assertEqual([], self.database.get(Person))
+        self.assertEqual([], self.database.get(Absence))
+
+        with self.database.transaction():
+            self.database.create(Person, identifier="a")
+            self.database.create(Absence, person_identifier="a", roster_sequence_no=1)
+        self.assertEqual(1, len(self.database.get(Person)))
+        self.assertEqual(1, len(self.database.get(Absence)))
+
+    def test_create_update_delete_many(self) -> None:
+        """
+        Tests the batch operations.
+        """
+        persons = self.database.create_many(Person, [{"identifier": "a"}, {"identifier": "b", "roles": ["x"]}])
+        with self.assertRaises(DuplicateKeyError):
+            self.database.create_many(Person, [{"identifier": "c"}, {"identifier": "a"}])
+        self.assertEqual(2, len(self.database.get(Person)))
+
+        self.database.update_many([(p, {"roles": ["y"]}) for p in persons])
+        self.assertEqual(2, len(self.database.get(Person, roles__contains="y")))
+        self.assertEqual([], self.database.get(Person, roles__contains="x"))
+
+        self.database.delete_many(persons[:1])
+        self.assertEqual(["b"], [p.identifier for p in self.database.get(Person)])
+
+    def test_iter_count_exists(self) -> None:
+        """
+        Tests the iterator, count and existence check.
+        """
+        self.database.create_many(Person, [{"identifier": f"{i}", "roles": ["a"] if i % 2 else []} for i in range(6)])
+
+        self.assertEqual(["5", "4"], [p.identifier for p in self.database.iter(Person, order_by="-identifier",
+                                                                              limit=2)])
+        self.assertEqual(6, self.database.count(Person))
+        self.assertEqual(3, self.database.count(Person, roles__contains="a"))
+        self.assertEqual(0, self.database.count(Person, roles__has_key="a"))
+        self.assertTrue(self.database.exists(Person, identifier="1"))
+        self.assertFalse(self.database.exists(Person, identifier="6"))
+
+    def test_persistence(self) -> None:
+        """
+        Tests that objects are saved in the database file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "roster.db")
+
+            database = Database(driver=SqliteDriver(path))
+            database.create(Roster, sequence_no=1, assignments={"id": "role"})
+            del database
+
+            database = Database(driver=SqliteDriver(path))
+            self.assertEqual({"id": "role"}, database.get_unique(Roster, sequence_no=1).assignments)
+            del database
@@ -0,0 +1,162 @@
+import os
+import random
+import tempfile
+import unittest
+
+from configuration.Configuration import Configuration
+from database.Database import Database
+from database.dataclass.Pattern import Pattern
+from database.dataclass.Person import Person
+from database.dataclass.Roster import Roster
+from generator.Generator import Generator
+from generator.HistoryIndex import HistoryIndex
+from generator.evaluators.AlternateRolesEvaluator import AlternateRolesEvaluator
+from generator.evaluators.MaximizeRestTimeEvaluator import MaximizeRestTimeEvaluator
+
+
+class TestEvaluators(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """
+        Creates rosters assigning random persons to random roles.
+        """
+        self.database = Database()
+        self.persons = [Person(identifier=f"p{i}") for i in range(10)]
+        self.roles = ["a", "b", "c"]
+
+        generator = random.Random(1)
+        for sequence_no in generator.sample(range(1, 50), 30):
+            persons = generator.sample(self.persons, 4)
+            self.database.create(Roster, sequence_no=sequence_no,
+                                 assignments={p.identifier: generator.choice(self.roles) for p in persons})
+
+    def create_generator(self, directory: str) -> Generator:
+        """
+        Creates a generator using the persons and the rosters of the test, with a weight of 3 for the alternate roles
+        evaluator.
+
+        :param directory: Directory in which the configuration file is written.
+        :return: The generator.
+        """
+        for person in self.persons:
+            self.database.create(Person, identifier=person.identifier, roles=self.roles)
+
+        configuration = Configuration(os.path.join(directory, "roster_config.json"))
+        configuration.set("weight_alternate_roles", 3)
+        return Generator(self.database, configuration)
+
+    def expected_score(self, roster_sequence_no: int, person: Person, role: str = None) -> float:
+        """
+        Computes the score of an assignment by going through the previous rosters, from the most recent one.
+
+        :param roster_sequence_no: Sequence number of the roster.
+        :param person: The person.
+        :param role: The role. If not given, does not consider the role assigned to the person.
+        :return: The expected score.
+        """
+        sorted_rosters = self.database.iter(Roster, sequence_no__lt=roster_sequence_no, order_by="-sequence_no")
+        for i, roster in enumerate(sorted_rosters):
+            if roster.is_assigned(person, role):
+                return 1.0 - (1.0 / (i + 1))
+        return 1.0
+
+    def test_scores(self) -> None:
+        """
+        Tests that the evaluators give the same scores as a search through the previous rosters.
+        """
+        history_index = HistoryIndex(self.database)
+        alternate_roles = AlternateRolesEvaluator(history_index)
+        maximize_rest_time = MaximizeRestTimeEvaluator(history_index)
+
+        for sequence_no in (1, 10, 25, 50):
+            for person in self.persons:
+                for role in self.roles:
+                    self.assertEqual(self.expected_score(sequence_no, person, role),
+                                     alternate_roles.assignment_score(sequence_no, person, role))
+                    self.assertEqual(self.expected_score(sequence_no, person),
+                                     maximize_rest_time.assignment_score(sequence_no, person, role))
+
+    def test_score_matrix(self) -> None:
+        """
+        Tests that the score matrices of the evaluators and of the algorithms give the same scores as the single
+        assignment scores.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            generator = self.create_generator(directory)
+            algorithm = generator._algorithms["simple"]
+
+            for sequence_no in (1, 10, 25, 50):
+                for evaluator in generator.evaluators.values():
+                    self.assertEqual([[evaluator.assignment_score(sequence_no, p, r) for r in self.roles]
+                                      for p in self.persons],
+                                     evaluator.score_matrix(sequence_no, self.persons, self.roles))
+
+                scores = algorithm.score_matrix(sequence_no, self.persons, self.roles)
+                for person in self.persons:
+                    for role in self.roles:
+                        self.assertAlmostEqual(algorithm.assignment_score(sequence_no, person, role),
+                                               scores.assignment_score(person, role))
+
+                roster = Roster(sequence_no=sequence_no, assignments={"p1": "a", "p4": "c", "p7": "c"})
+                self.assertAlmostEqual(algorithm.roster_score(roster), scores.roster_score(roster))
+
+    def test_score_cache(self) -> None:
+        """
+        Tests that the assignment scores are memoized until the next generation.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            generator = self.create_generator(directory)
+            generator.configuration.set("algorithm", "simple")
+            algorithm = generator._algorithms["simple"]
+            person = self.persons[0]
+
+            score = algorithm.assignment_score(50, person, "a")
+            self.assertEqual(score, algorithm.assignment_score(50, person, "a"))
+            algorithm.assignment_score(50, person, "b")
+            self.assertEqual(1, algorithm.score_cache_hits)
+            self.assertEqual(2, algorithm.score_cache_misses)
+
+            roster = Roster(sequence_no=50, assignments={"p0": "a", "p1": "b"})
+            algorithm.roster_score(roster)
+            self.assertEqual(2, algorithm.score_cache_hits)
+            self.assertEqual(3, algorithm.score_cache_misses)
+
+            new_person = Person(identifier="p10")
+            self.assertEqual(1.0, algorithm.assignment_score(50, new_person, "a"))
+            self.database.create(Roster, sequence_no=49, assignments={"p10": "a"})
+            self.assertEqual(1.0, algorithm.assignment_score(50, new_person, "a"))
+            self.database.create(Pattern, identifier="pattern", assignments={"a": 1})
+            roster = generator.generate_roster(50)
+            self.assertEqual(0, algorithm.score_cache_hits)
+            self.assertEqual(len(self.persons), algorithm.score_cache_misses)
+
+            scores = algorithm.score_matrix(50, self.persons, ["a", "b"])
+            self.assertEqual(len(self.persons), algorithm.score_cache_hits)
+            self.assertEqual(2 * len(self.persons), algorithm.score_cache_misses)
+            self.assertEqual(algorithm.roster_score(roster), scores.roster_score(roster))
+            self.assertEqual(len(self.persons) + 1, algorithm.score_cache_hits)
+            self.assertEqual(0.0, algorithm.assignment_score(50, new_person, "a"))
+
+    def test_history_index(self) -> None:
+        """
+        Tests that the index gives the last roster in which a person was assigned, and that it is only updated when
+        cleared or queried for another roster.
+        """
+        database = Database()
+        database.create(Roster, sequence_no=1, assignments={"p0": "a", "p1": "b"})
+        database.create(Roster, sequence_no=3, assignments={"p0": "b"})
+        history_index = HistoryIndex(database)
+        person = self.persons[0]
+
+        self.assertEqual(3, history_index.last_sequence_no(4, person))
+        self.assertEqual(0, history_index.rank(4, person))
+        self.assertEqual(1, history_index.last_sequence_no(4, person, "a"))
+        self.assertEqual(1, history_index.rank(4, person, "a"))
+        self.assertIsNone(history_index.rank(4, person, "c"))
+
+        database.create(Roster, sequence_no=2, assignments={"p0": "a"})
+        self.assertEqual(1, history_index.last_sequence_no(4, person, "a"))
+        history_index.clear()
+        self.assertEqual(2, history_index.last_sequence_no(4, person, "a"))
+        self.assertEqual(1, history_index.rank(4, person, "a"))
+        self.assertIsNone(history_index.rank(1, person))
@@ -19,9 +19,11 @@ class TestRosterAssignments(TestCase):
         self.assertEqual({}, roster.assignments)
 
         RosterAssignments.create(self.context, roster.sequence_no, person1.identifier, "role")
+        roster = Rosters.get(self.context, roster.sequence_no)
         self.assertEqual({person1.identifier: "role"}, roster.assignments)
 
         RosterAssignments.create(self.context, roster.sequence_no, person2.identifier, "role")
+        roster = Rosters.get(self.context, roster.sequence_no)
         self.assertEqual({person1.identifier: "role", person2.identifier: "role"}, roster.assignments)
 
     def test_create_error_invalid_roster(self) -> None:
@@ -74,9 +76,11 @@ class TestRosterAssignments(TestCase):
         person = Persons.create(self.context, "id", "abc", "def")
         RosterAssignments.create(self.context, roster.sequence_no, person.identifier, "role")
 
+        roster = Rosters.get(self.context, roster.sequence_no)
         self.assertEqual({person.identifier: "role"}, roster.assignments)
 
         RosterAssignments.delete(self.context, roster.sequence_no, person.identifier)
+        roster = Rosters.get(self.context, roster.sequence_no)
         self.assertEqual({}, roster.assignments)
 
     def test_delete_error_invalid_roster(self) -> None: